@@ -1,7 +1,78 @@
+import importlib
 import streamlit as st
+from typing import List
 
-st.title("🇮🇳 AI Government Job Prep")
-st.write("Testing deployment...")
+from utils.language_manager import LanguageManager
+from utils.services import get_data_manager, get_language_manager
 
-if st.button("Test"):
-    st.success("Working!")
+st.set_page_config(page_title="AI Government Job Prep", page_icon="🇮🇳", layout="wide")
+
+# Page key -> (module, view function, session state the page owns).
+# Owned state is dropped when the user navigates away; entries ending in '_' are key prefixes.
+# Quiz, interview and mock exam progress is kept server-side, so those pages resume on return.
+PAGES = {
+    'home': ('modules.home', 'show_home_page', []),
+    'quiz': ('modules.quiz', 'show_quiz_page', ['quiz_session']),
+    'study_plan': ('modules.study_plan', 'show_study_plan_page', []),
+    'analytics': ('modules.analytics', 'show_analytics_page', []),
+    'mock_interview': ('modules.mock_interview', 'show_mock_interview_page',
+                       ['interview_session', 'transcription_', 'transcript_', 'transcribed_clip_']),
+    'current_affairs': ('modules.current_affairs', 'show_current_affairs_page',
+                        ['ca_quiz_session', 'ca_page', 'ca_filters']),
+    'leaderboard': ('modules.leaderboard', 'show_leaderboard_page', []),
+    'mock_exam': ('modules.mock_exam', 'show_mock_exam_page', ['mock_exam'])
+}
+
+LANGUAGES = {'en': 'English', 'hi': 'हिंदी'}
+
+def owned_keys(page: str) -> List[str]:
+    """Session state keys currently held by a page"""
+    owned = PAGES[page][2]
+    prefixes = tuple(entry for entry in owned if entry.endswith('_'))
+    return [key for key in st.session_state.keys() if key in owned or (prefixes and key.startswith(prefixes))]
+
+def release_page_state(page: str):
+    """Free the state a page keeps across reruns"""
+    for key in owned_keys(page):
+        del st.session_state[key]
+
+def select_page(language: str, lang_manager: LanguageManager) -> str:
+    """Sidebar navigation; pages request a switch by setting st.session_state.page (e.g. 'Analytics')"""
+    requested = str(st.session_state.pop('page', '') or '').lower()
+    if requested in PAGES:
+        # Set before the radio is drawn, which is when Streamlit allows it
+        st.session_state.nav_page = requested
+    
+    labels = {page: label for label, page in lang_manager.get_menu_options(language).items()}
+    return st.sidebar.radio(
+        "Navigation" if language == 'en' else "नेविगेशन",
+        options=list(PAGES),
+        format_func=lambda page: labels.get(page, page),
+        key='nav_page',
+        label_visibility='collapsed'
+    )
+
+def render_page(page: str, language: str, lang_manager: LanguageManager):
+    """Run the active page only; page modules are imported on first visit"""
+    module_name, view, _ = PAGES[page]
+    getattr(importlib.import_module(module_name), view)(language, lang_manager)
+
+def main():
+    lang_manager = get_language_manager()
+    
+    # User state is app-wide, so it exists before (and outlives) any page's own state
+    get_data_manager()
+    
+    language = st.sidebar.radio("Language / भाषा", options=list(LANGUAGES), format_func=LANGUAGES.get,
+                                key='language', horizontal=True)
+    st.sidebar.markdown(f"## 🇮🇳 {lang_manager.get_text('app_title', language)}")
+    page = select_page(language, lang_manager)
+    
+    previous = st.session_state.get('active_page')
+    if previous in PAGES and previous != page:
+        release_page_state(previous)
+    st.session_state.active_page = page
+    
+    render_page(page, language, lang_manager)
+
+main()
@@ -0,0 +1,240 @@
+"""Bulk import and export of user histories for institute deployments.
+
+Examples:
+    python cohort_cli.py import exports/ --db data/app.db --workers 8
+    python cohort_cli.py export backup/ --db data/app.db --compression gzip
+    python cohort_cli.py rollups --db data/app.db
+
+Files use the NDJSON export schema from DataManager.export_user_data_stream, one user per file.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Iterable, Optional
+
+from utils.achievements import AchievementEngine
+from utils.cohort_analytics import CohortAnalytics
+from utils.data_io import ImportMerger, RecordValidationError, iter_import_records, iter_export_records, iter_ndjson
+from utils.event_store import EventStore, DEFAULT_DB_PATH, make_event, apply_event, BADGE_AWARDED, STATE_IMPORTED
+from utils.leaderboard import Leaderboard
+
+EXPORT_SUFFIXES = ('.ndjson', '.ndjson.gz', '.ndjson.zst', '.jsonl', '.jsonl.gz', '.jsonl.zst')
+FILE_SUFFIXES = {None: '.ndjson', 'gzip': '.ndjson.gz', 'zstd': '.ndjson.zst'}
+
+# Per-process store used by pool workers (read-only use: rebuilding existing state)
+_worker_store = None
+
+def _init_worker(db_path: str):
+    global _worker_store
+    _worker_store = EventStore(db_path)
+
+class Progress:
+    """Single-line progress and throughput report on stderr"""
+    
+    def __init__(self, label: str, total: int):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.records = 0
+        self.started = time.perf_counter()
+        self._last_print = 0.0
+    
+    def update(self, users: int = 1, records: int = 0):
+        self.done += users
+        self.records += records
+        now = time.perf_counter()
+        if now - self._last_print >= 0.5 or self.done == self.total:
+            self._last_print = now
+            self._print(now)
+    
+    def _print(self, now: float, end: str = ''):
+        elapsed = max(now - self.started, 1e-9)
+        sys.stderr.write(
+            f"\r[{self.label}] {self.done}/{self.total} users  "
+            f"{self.done / elapsed:,.0f} users/s  {self.records / elapsed:,.0f} records/s{end}"
+        )
+        sys.stderr.flush()
+    
+    def finish(self):
+        self._print(time.perf_counter(), end='\n')
+
+def find_export_files(paths: Iterable[str]) -> List[str]:
+    """Expand directories into the export files they contain"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(EXPORT_SUFFIXES):
+                    files.append(os.path.join(path, name))
+        else:
+            files.append(path)
+    return files
+
+def _user_id_from_filename(path: str) -> str:
+    name = os.path.basename(path)
+    for suffix in sorted(EXPORT_SUFFIXES, key=len, reverse=True):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+def prepare_import(path: str) -> Dict[str, Any]:
+    """Parse, validate and merge one user's export (runs in a pool worker)"""
+    try:
+        with open(path, 'rb') as f:
+            records = iter_import_records(f, include_header=True)
+            header = next(records, None)
+            if header is None:
+                raise RecordValidationError("Empty export")
+            user_id = header.get('user_id') or _user_id_from_filename(path)
+            
+            state, _, _ = _worker_store.rebuild(user_id)
+            badge_set = set(state['user_data']['badges'])
+            merger = ImportMerger(state, badge_set)
+            events = []
+            count = 0
+            
+            for record in records:
+                count += 1
+                merged = merger.merge(record)
+                if merged:
+                    event = make_event(*merged)
+                    apply_event(state, event)
+                    events.append(event)
+        
+        engine = AchievementEngine()
+        for rule in engine.evaluate(state['user_data'], engine.changed_counters(STATE_IMPORTED), badge_set):
+            event = make_event(BADGE_AWARDED, {'badge': rule['badge']})
+            apply_event(state, event)
+            events.append(event)
+        
+        return {'path': path, 'user_id': user_id, 'events': events, 'state': state,
+                'records': count, 'summary': merger.summary, 'error': None}
+    except (RecordValidationError, ValueError, OSError) as e:
+        return {'path': path, 'user_id': None, 'events': [], 'state': None, 'records': 0,
+                'summary': None, 'error': str(e)}
+
+def export_user(args) -> Dict[str, Any]:
+    """Rebuild one user's state and stream it to a file (runs in a pool worker)"""
+    user_id, out_dir, compression = args
+    state, _, _ = _worker_store.rebuild(user_id)
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', user_id)
+    path = os.path.join(out_dir, safe_name + FILE_SUFFIXES[compression])
+    footer = {}
+    
+    def records():
+        for record in iter_export_records(state, user_id=user_id):
+            if record['record'] == 'footer':
+                footer.update(record)
+            yield record
+    
+    with open(path, 'wb') as f:
+        for chunk in iter_ndjson(records(), compression):
+            f.write(chunk)
+    
+    return {'user_id': user_id, 'path': path, 'records': footer.get('records', 0)}
+
+def run_import(paths: List[str], db_path: str, workers: int, batch_size: int) -> int:
+    """Bulk-load export files into the event store"""
+    files = find_export_files(paths)
+    if not files:
+        print("No export files found", file=sys.stderr)
+        return 1
+    
+    store = EventStore(db_path)
+    rollups = CohortAnalytics(db_path)
+    leaderboard = Leaderboard(db_path)
+    progress = Progress('import', len(files))
+    seen_users = set()
+    errors = []
+    batch = []
+    written = 0
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(db_path,)) as pool:
+        for result in pool.map(prepare_import, files, chunksize=max(1, min(32, len(files) // (workers * 4) or 1))):
+            if result['error']:
+                errors.append(f"{result['path']}: {result['error']}")
+            elif result['user_id'] in seen_users:
+                # Workers merge against the stored state, so a second file for the same user would duplicate it
+                errors.append(f"{result['path']}: duplicate user id {result['user_id']} in this run, skipped")
+            else:
+                seen_users.add(result['user_id'])
+                if result['events']:
+                    batch.append((result['user_id'], result['events'], result['state']))
+            
+            if len(batch) >= batch_size:
+                written += store.bulk_write(batch)
+                rollups.record_many(batch)
+                leaderboard.record_many(batch)
+                batch = []
+            progress.update(records=result['records'])
+    
+    if batch:
+        written += store.bulk_write(batch)
+        rollups.record_many(batch)
+        leaderboard.record_many(batch)
+    progress.finish()
+    
+    print(f"Imported {len(seen_users)} users, {written} events written, {len(errors)} errors", file=sys.stderr)
+    for error in errors:
+        print(f"  {error}", file=sys.stderr)
+    return 1 if errors else 0
+
+def run_export(out_dir: str, db_path: str, workers: int, compression: Optional[str],
+               user_ids: Optional[List[str]] = None) -> int:
+    """Bulk-dump users from the event store into one export file each"""
+    store = EventStore(db_path)
+    user_ids = user_ids or store.user_ids()
+    os.makedirs(out_dir, exist_ok=True)
+    progress = Progress('export', len(user_ids))
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(db_path,)) as pool:
+        jobs = [(user_id, out_dir, compression) for user_id in user_ids]
+        for result in pool.map(export_user, jobs, chunksize=max(1, min(32, len(jobs) // (workers * 4) or 1))):
+            progress.update(records=result['records'])
+    
+    progress.finish()
+    print(f"Exported {len(user_ids)} users to {out_dir}", file=sys.stderr)
+    return 0
+
+def run_rollups(db_path: str) -> int:
+    """Recompute the cohort analytics rollups from the event store"""
+    started = time.perf_counter()
+    users = CohortAnalytics(db_path).rebuild(EventStore(db_path))
+    print(f"Rebuilt cohort rollups for {users} users in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import/export of user histories")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite event store path")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="Parser/validator processes")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    import_parser = subparsers.add_parser('import', help="Load export files (or directories of them)")
+    import_parser.add_argument('paths', nargs='+')
+    import_parser.add_argument('--batch-size', type=int, default=200, help="Users per write transaction")
+    
+    export_parser = subparsers.add_parser('export', help="Dump every user to OUT_DIR")
+    export_parser.add_argument('out_dir')
+    export_parser.add_argument('--compression', choices=['gzip', 'zstd'], default=None)
+    export_parser.add_argument('--users', help="File with one user id per line (default: all users)")
+    
+    subparsers.add_parser('rollups', help="Recompute cohort analytics rollups from the event store")
+    
+    args = parser.parse_args(argv)
+    
+    if args.command == 'import':
+        return run_import(args.paths, args.db, args.workers, args.batch_size)
+    if args.command == 'rollups':
+        return run_rollups(args.db)
+    
+    user_ids = None
+    if args.users:
+        with open(args.users, encoding='utf-8') as f:
+            user_ids = [line.strip() for line in f if line.strip()]
+    return run_export(args.out_dir, args.db, args.workers, args.compression, user_ids)
+
+if __name__ == '__main__':
+    sys.exit(main())
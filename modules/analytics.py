@@ -1,6 +1,7 @@
 import streamlit as st
 from utils.data_manager import DataManager
 from utils.language_manager import LanguageManager
+from utils.services import get_data_manager
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
@@ -9,7 +10,7 @@ from datetime import datetime, timedelta
 def show_analytics_page(language: str, lang_manager: LanguageManager):
     """Display comprehensive performance analytics"""
     
-    data_manager = DataManager()
+    data_manager = get_data_manager()
     
     st.markdown(f"## 📊 {lang_manager.get_text('performance_analytics', language)}")
     
@@ -20,6 +21,7 @@ def show_analytics_page(language: str, lang_manager: LanguageManager):
     if not quiz_history:
         st.info("No quiz data available. Take some quizzes to see your analytics!" if language == 'en'
                else "कोई क्विज़ डेटा उपलब्ध नहीं है। अपने विश्लेषण देखने के लिए कुछ क्विज़ लें!")
+        display_interview_analytics(data_manager, language, lang_manager)
         return
     
     # Overview metrics
@@ -37,6 +39,9 @@ def show_analytics_page(language: str, lang_manager: LanguageManager):
     # Detailed analytics
     display_difficulty_analysis(quiz_history, language, lang_manager)
     display_time_based_analysis(quiz_history, language, lang_manager)
+    display_activity_heatmap(data_manager, language, lang_manager)
+    display_cohort_comparison(data_manager, language, lang_manager)
+    display_interview_analytics(data_manager, language, lang_manager)
     display_achievement_progress(stats, language, lang_manager)
 
 def display_overview_metrics(stats: dict, language: str, lang_manager: LanguageManager):
@@ -329,6 +334,226 @@ def display_time_based_analysis(quiz_history: list, language: str, lang_manager:
             
             st.plotly_chart(fig, use_container_width=True)
 
+def display_activity_heatmap(data_manager: DataManager, language: str, lang_manager: LanguageManager, weeks: int = 26):
+    """Display a GitHub-style calendar heatmap of daily study activity"""
+    
+    st.markdown("### 🗓️ Activity Calendar" if language == 'en' else "### 🗓️ गतिविधि कैलेंडर")
+    
+    calendar = data_manager.get_activity_calendar()
+    today = datetime.now().date()
+    # Start on a Monday so each heatmap column is one calendar week
+    start = today - timedelta(days=today.weekday() + 7 * (weeks - 1))
+    
+    kinds = calendar.KINDS + [calendar.ANY]
+    flags = {kind: calendar.get_heatmap(start, today, kind) for kind in kinds}
+    num_days = len(flags[calendar.ANY])
+    
+    # Cell value = number of activity kinds done that day (0-3)
+    grid = [[None] * weeks for _ in range(7)]
+    hover = [[''] * weeks for _ in range(7)]
+    for i in range(num_days):
+        day = start + timedelta(days=i)
+        week, weekday = divmod(i, 7)
+        done = [kind for kind in calendar.KINDS if flags[kind][i]]
+        grid[weekday][week] = len(done)
+        hover[weekday][week] = f"{day.isoformat()}: {', '.join(done) if done else '-'}"
+    
+    weekday_labels = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'] if language == 'en' \
+        else ['सोम', 'मंगल', 'बुध', 'गुरु', 'शुक्र', 'शनि', 'रवि']
+    
+    fig = go.Figure(go.Heatmap(
+        z=grid,
+        x=[(start + timedelta(weeks=w)).strftime('%d %b') for w in range(weeks)],
+        y=weekday_labels,
+        text=hover,
+        hoverinfo='text',
+        colorscale=[[0, '#EBEDF0'], [0.34, '#FFD1A3'], [0.67, '#FF9933'], [1, '#138808']],
+        zmin=0,
+        zmax=len(calendar.KINDS),
+        xgap=3,
+        ygap=3,
+        showscale=False
+    ))
+    
+    fig.update_layout(
+        height=250,
+        yaxis=dict(autorange='reversed'),
+        margin=dict(l=40, r=10, t=10, b=30)
+    )
+    
+    st.plotly_chart(fig, use_container_width=True)
+    
+    summary = calendar.get_summary()
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric(
+            lang_manager.get_text('study_streak', language),
+            f"{summary[calendar.ANY]['current_streak']} {lang_manager.get_text('days', language)}"
+        )
+    
+    with col2:
+        st.metric(
+            "Longest Streak" if language == 'en' else "सबसे लंबी श्रृंखला",
+            f"{summary[calendar.ANY]['longest_streak']} {lang_manager.get_text('days', language)}"
+        )
+    
+    with col3:
+        st.metric(
+            "Active Days" if language == 'en' else "सक्रिय दिन",
+            summary[calendar.ANY]['active_days']
+        )
+
+def display_cohort_comparison(data_manager: DataManager, language: str, lang_manager: LanguageManager):
+    """Display how the user ranks against other aspirants for the same exam"""
+    
+    st.markdown("### 👥 Compare with Other Aspirants" if language == 'en' else "### 👥 अन्य उम्मीदवारों से तुलना")
+    
+    cohort = data_manager.get_cohort_comparison()
+    if cohort['cohort_size'] < 2:
+        st.info("Not enough other students yet for a comparison." if language == 'en'
+               else "तुलना के लिए अभी पर्याप्त अन्य छात्र नहीं हैं।")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        rank = cohort['percentile_rank']
+        st.metric("Percentile" if language == 'en' else "प्रतिशतक", f"{rank:.0f}" if rank is not None else "-")
+    
+    with col2:
+        st.metric("Students" if language == 'en' else "छात्र", cohort['cohort_size'])
+    
+    with col3:
+        median = cohort['score_percentiles'].get(50)
+        st.metric("Cohort Median" if language == 'en' else "समूह माध्यिका", f"{median}%" if median is not None else "-")
+    
+    if cohort['topics']:
+        df = pd.DataFrame(cohort['topics'])
+        fig = go.Figure()
+        fig.add_trace(go.Bar(x=df['topic'], y=df['user_average'], name="You" if language == 'en' else "आप",
+                             marker_color='#FF9933'))
+        fig.add_trace(go.Bar(x=df['topic'], y=df['cohort_average'], name="Cohort" if language == 'en' else "समूह",
+                             marker_color='#138808'))
+        fig.update_layout(
+            barmode='group',
+            yaxis_title=lang_manager.get_text('average_score', language),
+            height=350
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    if cohort['leaderboard']:
+        st.markdown("#### 🏅 Top Students" if language == 'en' else "#### 🏅 शीर्ष छात्र")
+        leaderboard = pd.DataFrame(cohort['leaderboard'])[['rank', 'name', 'total_points', 'quizzes']]
+        st.dataframe(leaderboard, use_container_width=True, hide_index=True)
+
+DIMENSION_LABELS = {
+    'length': ('Length', 'लंबाई'),
+    'structure': ('Structure', 'संरचना'),
+    'coverage': ('Key points', 'मुख्य बिंदु'),
+    'relevance': ('Relevance', 'प्रासंगिकता'),
+    'readability': ('Readability', 'पठनीयता')
+}
+
+def display_interview_analytics(data_manager: DataManager, language: str, lang_manager: LanguageManager):
+    """Display interview score trends, answer dimensions, recurring improvement themes and answer times"""
+    
+    st.markdown("### 🎙️ Interview Analytics" if language == 'en' else "### 🎙️ साक्षात्कार विश्लेषण")
+    
+    stats = data_manager.get_interview_stats()
+    trends = stats.topic_trends()
+    if not trends:
+        st.info("Complete a mock interview to see interview analytics." if language == 'en'
+               else "साक्षात्कार विश्लेषण देखने के लिए एक मॉक साक्षात्कार पूरा करें।")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Interviews" if language == 'en' else "साक्षात्कार", sum(len(points) for points in trends.values()))
+    with col2:
+        st.metric("Answers Timed" if language == 'en' else "समयबद्ध उत्तर", stats.stats['answers'])
+    with col3:
+        average_seconds = stats.average_answer_seconds()
+        st.metric("Avg. Time per Answer" if language == 'en' else "प्रति उत्तर औसत समय",
+                  f"{average_seconds:.0f}s" if average_seconds is not None else "-")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Score trend per topic
+        fig = go.Figure()
+        for topic, points in trends.items():
+            fig.add_trace(go.Scatter(
+                x=[datetime.fromisoformat(day) for day, _ in points],
+                y=[score for _, score in points],
+                mode='lines+markers',
+                name=topic
+            ))
+        fig.update_layout(
+            title="Interview Score by Topic" if language == 'en' else "विषयवार साक्षात्कार स्कोर",
+            yaxis_title="Score" if language == 'en' else "स्कोर",
+            yaxis_range=[0, 100],
+            height=350
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        # Per-dimension score time series
+        dimensions = stats.dimension_series()
+        if dimensions:
+            fig = go.Figure()
+            for name, points in dimensions.items():
+                labels = DIMENSION_LABELS.get(name, (name, name))
+                fig.add_trace(go.Scatter(
+                    x=[datetime.fromisoformat(day) for day, _ in points],
+                    y=[value for _, value in points],
+                    mode='lines+markers',
+                    name=labels[0] if language == 'en' else labels[1]
+                ))
+            fig.update_layout(
+                title="Answer Dimensions" if language == 'en' else "उत्तर के आयाम",
+                yaxis_range=[0, 100],
+                height=350
+            )
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("Dimension scores appear for interviews answered from now on." if language == 'en'
+                   else "आयाम स्कोर अब से दिए गए साक्षात्कारों के लिए दिखेंगे।")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        themes = stats.top_themes()
+        st.markdown("#### 🔁 Recurring Improvement Areas" if language == 'en' else "#### 🔁 बार-बार सुधार के क्षेत्र")
+        if themes:
+            fig = go.Figure(go.Bar(
+                x=[count for _, count in themes][::-1],
+                y=[label for label, _ in themes][::-1],
+                orientation='h',
+                marker_color='#FF9933'
+            ))
+            fig.update_layout(height=350, margin=dict(l=10, r=10, t=10, b=10))
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.success("No recurring improvement areas yet." if language == 'en' else "अभी कोई बार-बार सुधार क्षेत्र नहीं।")
+    
+    with col2:
+        timings = stats.answer_time_series()
+        st.markdown("#### ⏱️ Time per Answer" if language == 'en' else "#### ⏱️ प्रति उत्तर समय")
+        if timings:
+            fig = go.Figure(go.Scatter(
+                x=[datetime.fromisoformat(day) for day, _ in timings],
+                y=[seconds for _, seconds in timings],
+                mode='lines+markers',
+                line=dict(color='#138808')
+            ))
+            fig.update_layout(yaxis_title="Seconds" if language == 'en' else "सेकंड", height=350,
+                              margin=dict(l=10, r=10, t=10, b=10))
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("Answer times appear for interviews answered from now on." if language == 'en'
+                   else "उत्तर समय अब से दिए गए साक्षात्कारों के लिए दिखेंगे।")
+
 def display_achievement_progress(stats: dict, language: str, lang_manager: LanguageManager):
     """Display achievement progress and goals"""
     
@@ -340,6 +565,11 @@ def display_achievement_progress(stats: dict, language: str, lang_manager: Langu
     with col1:
         st.markdown("#### 🎯 Achievement Progress")
         
+        # Next badge per counter from the achievement rule table
+        for badge in stats.get('next_badges', []):
+            st.progress(badge['progress'])
+            st.markdown(f"**{badge['badge']}** ({badge['description']}): {badge['current']}/{badge['threshold']}")
+        
         # Points progress
         points_milestones = [100, 500, 1000, 2500, 5000]
         current_points = stats['total_points']
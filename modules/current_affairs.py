@@ -1,39 +1,58 @@
 import streamlit as st
-from utils.ai_services import AIServices
 from utils.data_manager import DataManager
 from utils.language_manager import LanguageManager
+from utils.services import get_ai_services, get_data_manager
+from utils.news_store import get_news_store, get_feed_ingestor, ensure_ingestion_worker
+from utils.search_index import get_search_index, ARTICLE, QUESTION
+from utils.ca_questions import CAQuestionGenerator, get_ca_question_bank
+from utils.daily_digest import DigestBuilder, get_digest_store, ALL_CATEGORIES
 from datetime import datetime, timedelta
 import requests
 import json
+import time
+
+NEWS_PAGE_SIZE = 10
+SEARCH_LIMIT = 20
+# A new quiz skips up to this many of the questions the user was served most recently
+SEEN_QUESTIONS_WINDOW = 200
 
 def show_current_affairs_page(language: str, lang_manager: LanguageManager):
     """Display the current affairs tracker page"""
     
-    ai_services = AIServices()
-    data_manager = DataManager()
+    ai_services = get_ai_services()
+    data_manager = get_data_manager()
     
     st.markdown(f"## 📰 {lang_manager.get_text('current_affairs_tracker', language)}")
     
+    # Keep the article store, the question pool and the daily digests filling in the background
+    question_generator = CAQuestionGenerator(get_news_store(), get_ca_question_bank(), ai_services, get_search_index())
+    digest_builder = DigestBuilder(get_news_store(), get_ca_question_bank(), get_digest_store(), get_search_index())
+    ensure_ingestion_worker(after_pass=[question_generator.run_once, digest_builder.run])
+    
     # Current affairs categories
     categories = lang_manager.get_current_affairs_categories(language)
     
     # Tab layout for different sections
-    tab1, tab2, tab3 = st.tabs([
+    tab1, tab2, tab3, tab4 = st.tabs([
         "Latest Updates" if language == 'en' else "नवीनतम अपडेट",
         "Practice Questions" if language == 'en' else "अभ्यास प्रश्न",
-        "My Progress" if language == 'en' else "मेरी प्रगति"
+        "My Progress" if language == 'en' else "मेरी प्रगति",
+        "Search" if language == 'en' else "खोजें"
     ])
     
     with tab1:
-        display_latest_updates(categories, language, lang_manager)
+        display_latest_updates(categories, language, lang_manager, data_manager)
     
     with tab2:
-        display_practice_questions(categories, language, ai_services, data_manager, lang_manager)
+        display_practice_questions(categories, language, data_manager, lang_manager)
     
     with tab3:
         display_current_affairs_progress(data_manager, language, lang_manager)
+    
+    with tab4:
+        display_search(language)
 
-def display_latest_updates(categories: dict, language: str, lang_manager: LanguageManager):
+def display_latest_updates(categories: dict, language: str, lang_manager: LanguageManager, data_manager: DataManager):
     """Display latest current affairs updates"""
     
     st.markdown(f"### 🌟 {lang_manager.get_text('latest_updates', language)}")
@@ -42,6 +61,7 @@ def display_latest_updates(categories: dict, language: str, lang_manager: Langua
     selected_category = st.selectbox(
         "Select Category" if language == 'en' else "श्रेणी चुनें",
         options=list(categories.keys()),
+        format_func=lambda key: categories[key],
         key="ca_category_filter"
     )
     
@@ -61,25 +81,135 @@ def display_latest_updates(categories: dict, language: str, lang_manager: Langua
             key="ca_end_date"
         )
     
-    # Refresh button
+    display_daily_digest(selected_category, language)
+    
+    # Refresh button pulls the feeds now instead of waiting for the background worker
     if st.button("🔄 Refresh Updates" if language == 'en' else "🔄 अपडेट रीफ्रेश करें"):
         with st.spinner("Fetching latest updates..." if language == 'en' else "नवीनतम अपडेट प्राप्त कर रहे हैं..."):
-            updates = fetch_current_affairs_updates(selected_category, start_date, end_date, language)
-            display_news_updates(updates, language)
+            stats = get_feed_ingestor().run_once()
+        if stats['new']:
+            st.success(f"{stats['new']} new articles added" if language == 'en' else f"{stats['new']} नए लेख जोड़े गए")
+        for error in stats['errors']:
+            st.warning(error)
+    
+    # Start from the first page whenever the filters change
+    filters = (selected_category, start_date, end_date, language)
+    if st.session_state.get('ca_filters') != filters:
+        st.session_state.ca_filters = filters
+        st.session_state.ca_page = 1
+    
+    updates, total = fetch_current_affairs_updates(selected_category, start_date, end_date, language,
+                                                   page=st.session_state.ca_page)
+    display_news_updates(updates, language)
+    if updates:
+        # Reading the day's articles counts towards the current affairs streak (once per day)
+        data_manager.record_activity('current_affairs')
+    if total > NEWS_PAGE_SIZE:
+        display_news_pagination(total, language)
+    
+    if not total:
+        st.markdown("---")
+        st.markdown("#### 📋 Recent Important Updates" if language == 'en' else "#### 📋 हाल के महत्वपूर्ण अपडेट")
+        
+        # Educational framework for current affairs structure until the feeds have articles for this filter
+        display_current_affairs_framework(selected_category, language)
+
+def display_daily_digest(category: str, language: str):
+    """Show the day's precomputed digest for a category"""
     
-    # Display sample/cached updates when API is not available
-    st.markdown("---")
-    st.markdown("#### 📋 Recent Important Updates" if language == 'en' else "#### 📋 हाल के महत्वपूर्ण अपडेट")
+    digest = get_digest_store().latest(category, language)
+    if not digest or not digest['headlines']:
+        return
+    
+    with st.expander(f"📅 Daily Digest · {digest['date']}" if language == 'en' else f"📅 दैनिक सारांश · {digest['date']}",
+                     expanded=True):
+        for headline in digest['headlines']:
+            st.markdown(f"**{headline['title']}**")
+            if headline['gist']:
+                st.markdown(headline['gist'])
+            st.caption(f"{headline['date']} · {headline['source']}")
+
+def display_news_pagination(total: int, language: str):
+    """Previous/next controls for the news list"""
     
-    # Note: In a real implementation, this would fetch from news APIs
-    st.info("Note: Connect news APIs for live updates. Currently showing educational framework." if language == 'en'
-           else "नोट: लाइव अपडेट के लिए न्यूज API कनेक्ट करें। वर्तमान में शैक्षणिक ढांचा दिखाया जा रहा है।")
+    pages = (total + NEWS_PAGE_SIZE - 1) // NEWS_PAGE_SIZE
+    page = st.session_state.ca_page
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("⬅️ Previous" if language == 'en' else "⬅️ पिछला", disabled=page <= 1, key="ca_prev_page"):
+            st.session_state.ca_page = page - 1
+            st.rerun()
     
-    # Educational framework for current affairs structure
-    display_current_affairs_framework(selected_category, language)
+    with col2:
+        st.caption(f"Page {page} of {pages} ({total} articles)" if language == 'en'
+                   else f"पृष्ठ {page} / {pages} ({total} लेख)")
+    
+    with col3:
+        if st.button("Next ➡️" if language == 'en' else "अगला ➡️", disabled=page >= pages, key="ca_next_page"):
+            st.session_state.ca_page = page + 1
+            st.rerun()
 
-def display_practice_questions(categories: dict, language: str, ai_services: AIServices, 
-                             data_manager: DataManager, lang_manager: LanguageManager):
+def display_search(language: str):
+    """Full-text search over ingested news and previously generated questions"""
+    
+    st.markdown("### 🔍 Search News & Questions" if language == 'en' else "### 🔍 समाचार और प्रश्न खोजें")
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        query = st.text_input(
+            "Search" if language == 'en' else "खोजें",
+            placeholder="e.g., RBI repo rate" if language == 'en' else "जैसे, रिज़र्व बैंक रेपो दर",
+            key="ca_search_query"
+        )
+    
+    with col2:
+        scope_labels = {
+            None: "All" if language == 'en' else "सभी",
+            ARTICLE: "News" if language == 'en' else "समाचार",
+            QUESTION: "Questions" if language == 'en' else "प्रश्न"
+        }
+        scope = st.selectbox(
+            "Look in" if language == 'en' else "कहां खोजें",
+            options=list(scope_labels.keys()),
+            format_func=lambda key: scope_labels[key],
+            key="ca_search_scope"
+        )
+    
+    if not query.strip():
+        return
+    
+    started = time.perf_counter()
+    results = get_search_index().search(query, kind=scope, limit=SEARCH_LIMIT)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    st.caption(f"{len(results)} results in {elapsed_ms:.0f} ms" if language == 'en'
+               else f"{len(results)} परिणाम ({elapsed_ms:.0f} ms)")
+    
+    if not results:
+        st.info("No matches. Try fewer or different words." if language == 'en'
+                else "कोई परिणाम नहीं मिला। कम या अलग शब्दों से खोजें।")
+        return
+    
+    for result in results:
+        payload = result['payload']
+        if result['kind'] == ARTICLE:
+            st.markdown(f"📰 **{result['title']}**")
+            st.caption(f"{result['date']} · {result['topic']} · {payload.get('source', '')}")
+            st.markdown(result['body'])
+            if payload.get('url'):
+                st.markdown(f"[{'Read more' if language == 'en' else 'और पढ़ें'}]({payload['url']})")
+        else:
+            with st.expander(f"❓ {result['title']}"):
+                for i, option in enumerate(payload.get('options', [])):
+                    marker = "✅" if i == payload.get('correct_answer') else "▫️"
+                    st.markdown(f"{marker} {option}")
+                if payload.get('explanation'):
+                    st.info(payload['explanation'])
+                st.caption(result['topic'])
+        st.divider()
+
+def display_practice_questions(categories: dict, language: str, data_manager: DataManager,
+                               lang_manager: LanguageManager):
     """Display current affairs practice questions"""
     
     st.markdown(f"### 📝 {lang_manager.get_text('generate_questions', language)}")
@@ -104,21 +234,22 @@ def display_practice_questions(categories: dict, language: str, ai_services: AIS
         # Number of questions
         num_questions = st.selectbox(
             "Number of Questions" if language == 'en' else "प्रश्नों की संख्या",
-            options=[3, 5, 10],
+            options=[3, 5, 10, 15, 20],
             index=1,
             key="ca_num_questions"
         )
     
     with col2:
         # Time period selection
+        period_options = [
+            "Last 30 days" if language == 'en' else "पिछले 30 दिन",
+            "Last 3 months" if language == 'en' else "पिछले 3 महीने",
+            "Last 6 months" if language == 'en' else "पिछले 6 महीने",
+            "Current Year" if language == 'en' else "वर्तमान वर्ष"
+        ]
         time_period = st.selectbox(
             "Time Period" if language == 'en' else "समय अवधि",
-            options=[
-                "Last 30 days" if language == 'en' else "पिछले 30 दिन",
-                "Last 3 months" if language == 'en' else "पिछले 3 महीने",
-                "Last 6 months" if language == 'en' else "पिछले 6 महीने",
-                "Current Year" if language == 'en' else "वर्तमान वर्ष"
-            ],
+            options=period_options,
             key="ca_time_period"
         )
         
@@ -131,45 +262,78 @@ def display_practice_questions(categories: dict, language: str, ai_services: AIS
             key="ca_difficulty"
         )
     
+    since = period_start(period_options.index(time_period))
+    
     # Generate questions button
     if st.button(f"🚀 {lang_manager.get_text('generate_questions', language)}", use_container_width=True):
-        generate_current_affairs_quiz(selected_category, specific_topic, num_questions, difficulty, 
-                                    language, ai_services, data_manager, lang_manager)
+        generate_current_affairs_quiz(selected_category, specific_topic, num_questions, difficulty, since, language)
+    
+    # The day's shared practice set for this category, if the digest has one
+    digest = get_digest_store().latest(selected_category, language)
+    if digest and digest['questions']:
+        label = (f"📅 Daily Practice Set ({len(digest['questions'])} questions)" if language == 'en'
+                 else f"📅 दैनिक अभ्यास सेट ({len(digest['questions'])} प्रश्न)")
+        if st.button(label, use_container_width=True, key="ca_daily_set"):
+            start_ca_quiz(digest['questions'], selected_category, language)
+    elif digest:
+        st.caption(f"No daily practice set for {digest['date']}: no questions were ready when it was built."
+                   if language == 'en' else
+                   f"{digest['date']} के लिए कोई दैनिक अभ्यास सेट नहीं है: उस समय कोई प्रश्न तैयार नहीं थे।")
+    
+    # The quiz stays on screen across reruns until it is finished or reset
+    if 'ca_quiz_session' in st.session_state:
+        display_ca_quiz(st.session_state.ca_quiz_session, data_manager, lang_manager)
 
-def generate_current_affairs_quiz(category: str, specific_topic: str, num_questions: int, 
-                                difficulty: int, language: str, ai_services: AIServices,
-                                data_manager: DataManager, lang_manager: LanguageManager):
-    """Generate and display current affairs quiz"""
-    
-    # Prepare topic for AI
-    topic_for_ai = f"{category}"
-    if specific_topic:
-        topic_for_ai += f" - {specific_topic}"
-    
-    with st.spinner(lang_manager.get_text('loading', language)):
-        questions = ai_services.generate_current_affairs_questions(topic_for_ai, language)
+def period_start(period_index: int):
+    """First day of the selected time period"""
+    today = datetime.now().date()
+    if period_index == 3:
+        return today.replace(month=1, day=1)
+    return today - timedelta(days=[30, 90, 180][period_index])
+
+def generate_current_affairs_quiz(category: str, specific_topic: str, num_questions: int, difficulty: int,
+                                  since, language: str):
+    """Start a current affairs quiz drawn from the pre-generated question pool"""
+    
+    # A specific topic narrows the pool to questions from articles that match it
+    article_ids = None
+    if specific_topic.strip():
+        matches = get_search_index().search(specific_topic, kind=ARTICLE, language=language, limit=200)
+        article_ids = [match['ref'] for match in matches]
+    
+    seen = st.session_state.setdefault('ca_seen_questions', [])
+    bank = get_ca_question_bank()
+    questions = bank.sample(num_questions, language, category, since, difficulty, article_ids, exclude=seen)
+    if len(questions) < num_questions:
+        # Top up with questions this user has already seen rather than serving a short quiz
+        questions += bank.sample(num_questions - len(questions), language, category, since, difficulty, article_ids,
+                                 exclude=[q['id'] for q in questions])
     
     if not questions:
-        st.error("Unable to generate current affairs questions. Please check your OpenAI API key or try again later." 
-                if language == 'en' else "समसामयिकी प्रश्न जेनरेट करने में असमर्थ। कृपया अपनी OpenAI API key जांचें या बाद में पुनः प्रयास करें।")
+        st.info("No questions are ready for this selection yet. Questions are prepared in the background as news arrives; "
+                "try a wider time period or another category." if language == 'en'
+                else "इस चयन के लिए अभी कोई प्रश्न तैयार नहीं है। समाचार आने पर प्रश्न पृष्ठभूमि में तैयार किए जाते हैं; "
+                "लंबी समय अवधि या दूसरी श्रेणी आज़माएं।")
         return
     
-    # Limit to requested number
-    questions = questions[:num_questions]
-    
-    # Initialize quiz session for current affairs
-    if 'ca_quiz_session' not in st.session_state:
-        st.session_state.ca_quiz_session = {
-            'questions': questions,
-            'current_question': 0,
-            'answers': [],
-            'score': 0,
-            'category': category,
-            'language': language
-        }
+    if len(questions) < num_questions:
+        st.caption(f"Only {len(questions)} questions are available for this selection." if language == 'en'
+                   else f"इस चयन के लिए केवल {len(questions)} प्रश्न उपलब्ध हैं।")
     
-    # Display current affairs quiz
-    display_ca_quiz(st.session_state.ca_quiz_session, data_manager, lang_manager)
+    seen.extend(q['id'] for q in questions if q['id'] not in seen)
+    del seen[:-SEEN_QUESTIONS_WINDOW]
+    start_ca_quiz(questions, category, language)
+
+def start_ca_quiz(questions: list, category: str, language: str):
+    """Replace any running current affairs quiz with a new one"""
+    st.session_state.ca_quiz_session = {
+        'questions': questions,
+        'current_question': 0,
+        'answers': [],
+        'score': 0,
+        'category': category,
+        'language': language
+    }
 
 def display_ca_quiz(session: dict, data_manager: DataManager, lang_manager: LanguageManager):
     """Display current affairs quiz interface"""
@@ -191,6 +355,8 @@ def display_ca_quiz(session: dict, data_manager: DataManager, lang_manager: Lang
         # Date relevance if available
         if question.get('date_relevance'):
             st.caption(f"**Relevant Time Period:** {question['date_relevance']}")
+        if question.get('source_title'):
+            st.caption(f"Source: {question['source_title']}" if language == 'en' else f"स्रोत: {question['source_title']}")
         
         # Answer options
         user_answer = st.radio(
@@ -268,16 +434,15 @@ def display_ca_quiz_results(session: dict, data_manager: DataManager, lang_manag
     with col2:
         st.metric("Percentage", f"{percentage:.1f}%")
     
-    with col3:
-        points_earned = score * 10  # 10 points per correct answer
-        st.metric("Points Earned" if language == 'en' else "अर्जित अंक", points_earned)
-    
-    # Update user progress
-    if 'current_affairs_score' not in st.session_state.user_data:
-        st.session_state.user_data['current_affairs_score'] = 0
+    # Update user progress once per session (results re-render on every rerun)
+    if not session.get('saved'):
+        session['points_earned'] = data_manager.save_current_affairs_result(
+            score, total, session['category'], language
+        )
+        session['saved'] = True
     
-    st.session_state.user_data['current_affairs_score'] += points_earned
-    st.session_state.user_data['total_points'] += points_earned
+    with col3:
+        st.metric("Points Earned" if language == 'en' else "अर्जित अंक", session['points_earned'])
     
     # Performance feedback
     if percentage >= 80:
@@ -349,8 +514,7 @@ def display_current_affairs_progress(data_manager: DataManager, language: str, l
         )
     
     with col2:
-        # Calculate reading streak (simplified)
-        reading_streak = calculate_reading_streak()
+        reading_streak = calculate_reading_streak(data_manager)
         st.metric(
             "Reading Streak" if language == 'en' else "पठन श्रृंखला",
             f"{reading_streak} days" if language == 'en' else f"{reading_streak} दिन"
@@ -375,24 +539,27 @@ def display_current_affairs_progress(data_manager: DataManager, language: str, l
     # Important topics to focus on
     st.markdown("### 🎯 Important Topics to Focus" if language == 'en' else "### 🎯 महत्वपूर्ण विषय")
     
-    important_topics = get_important_current_affairs_topics(language)
+    # Mined daily from recent headlines; the static list covers a fresh install with no news yet
+    digest = get_digest_store().latest(ALL_CATEGORIES, language)
+    if digest and digest['important_topics']:
+        important_topics = [
+            f"{item['topic']} ({item['articles']} {'articles' if language == 'en' else 'लेख'})"
+            for item in digest['important_topics']
+        ]
+    else:
+        important_topics = get_important_current_affairs_topics(language)
     
     cols = st.columns(2)
     for i, topic in enumerate(important_topics):
         with cols[i % 2]:
             st.markdown(f"🔸 {topic}")
 
-def fetch_current_affairs_updates(category: str, start_date, end_date, language: str):
-    """Fetch current affairs updates from news sources"""
-    
-    # Note: In a real implementation, this would integrate with news APIs like:
-    # - NewsAPI
-    # - Hindu API
-    # - PIB (Press Information Bureau) RSS feeds
-    # - Government websites RSS
+def fetch_current_affairs_updates(category: str, start_date, end_date, language: str, page: int = 1):
+    """One page of stored articles for a category and date range, plus the total count"""
     
-    # For now, return empty list as we don't want to mock data
-    return []
+    # Articles come from the RSS/Atom ingestion worker (utils/news_store.py)
+    return get_news_store().query(category=category, start_date=start_date, end_date=end_date,
+                                  language=language, page=page, page_size=NEWS_PAGE_SIZE)
 
 def display_news_updates(updates: list, language: str):
     """Display fetched news updates"""
@@ -407,6 +574,8 @@ def display_news_updates(updates: list, language: str):
             st.markdown(f"### {update.get('title', '')}")
             st.markdown(f"**Date:** {update.get('date', '')}")
             st.markdown(update.get('summary', ''))
+            if update.get('url'):
+                st.markdown(f"[{'Read more' if language == 'en' else 'और पढ़ें'}]({update['url']})")
             if update.get('source'):
                 st.caption(f"Source: {update['source']}")
             st.divider()
@@ -477,11 +646,9 @@ def display_current_affairs_framework(category: str, language: str):
     for item in framework_items:
         st.markdown(f"• {item}")
 
-def calculate_reading_streak():
-    """Calculate user's reading streak (simplified implementation)"""
-    # In a real implementation, this would track daily reading activity
-    # For now, return a placeholder value
-    return 1
+def calculate_reading_streak(data_manager: DataManager) -> int:
+    """Calculate user's current affairs reading streak from the activity calendar"""
+    return data_manager.get_activity_calendar().current_streak('current_affairs')
 
 def get_current_affairs_recommendations(language: str, ca_score: int) -> list:
     """Get personalized current affairs study recommendations"""
@@ -518,7 +685,7 @@ def get_current_affairs_recommendations(language: str, ca_score: int) -> list:
             ]
 
 def get_important_current_affairs_topics(language: str) -> list:
-    """Get list of important current affairs topics"""
+    """Default important topics, shown until the daily digest has topics from ingested news"""
     
     if language == 'hi':
         return [
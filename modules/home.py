@@ -0,0 +1,83 @@
+import streamlit as st
+from utils.data_manager import DataManager
+from utils.language_manager import LanguageManager
+from utils.services import get_data_manager
+from datetime import datetime, timedelta
+
+def show_home_page(language: str, lang_manager: LanguageManager):
+    """Display the home page: profile setup, quick stats and shortcuts to the main features"""
+    
+    data_manager = get_data_manager()
+    user_data = st.session_state.user_data
+    
+    st.markdown(f"## 🇮🇳 {lang_manager.get_text('welcome_message', language)}")
+    st.markdown(lang_manager.get_text('app_description', language))
+    
+    col1, col2 = st.columns([3, 2])
+    
+    with col1:
+        display_profile_form(data_manager, user_data, language, lang_manager)
+    
+    with col2:
+        display_quick_stats(data_manager, user_data, language, lang_manager)
+    
+    # Quick actions switch pages through the router
+    st.markdown(f"### ⚡ {lang_manager.get_text('quick_actions', language)}")
+    actions = [
+        ('quiz', f"📝 {lang_manager.get_text('take_quiz', language)}"),
+        ('analytics', f"📊 {lang_manager.get_text('view_progress', language)}"),
+        ('mock_interview', f"🎙️ {lang_manager.get_text('mock_interview', language)}")
+    ]
+    for column, (page, label) in zip(st.columns(len(actions)), actions):
+        with column:
+            if st.button(label, use_container_width=True, key=f"home_action_{page}"):
+                st.session_state.page = page
+                st.rerun()
+
+def display_profile_form(data_manager: DataManager, user_data: dict, language: str, lang_manager: LanguageManager):
+    """Profile form; the target exam drives question pools and study plans"""
+    
+    st.markdown(f"### 👤 {lang_manager.get_text('profile_setup', language)}")
+    
+    exam_types = lang_manager.get_exam_types(language)
+    exam_keys = list(exam_types.keys())
+    current_exam = user_data.get('exam_type')
+    
+    with st.form("profile_form"):
+        name = st.text_input(lang_manager.get_text('your_name', language), value=user_data.get('name') or '')
+        exam_type = st.selectbox(
+            lang_manager.get_text('target_exam', language),
+            options=exam_keys,
+            index=exam_keys.index(current_exam) if current_exam in exam_keys else 0,
+            format_func=lambda key: exam_types[key]
+        )
+        target_date = st.date_input(
+            lang_manager.get_text('target_date', language),
+            value=user_data.get('target_date') or datetime.now().date() + timedelta(days=180)
+        )
+        study_hours = st.slider(lang_manager.get_text('daily_study_hours', language), 1, 12,
+                                int(user_data.get('study_hours_per_day') or 2))
+        
+        if st.form_submit_button(lang_manager.get_text('save_profile', language), use_container_width=True):
+            data_manager.update_profile(name.strip(), exam_type, target_date, study_hours)
+            st.success(lang_manager.get_text('profile_saved', language))
+
+def display_quick_stats(data_manager: DataManager, user_data: dict, language: str, lang_manager: LanguageManager):
+    """Points, streak, quizzes and badges at a glance"""
+    
+    st.markdown(f"### 📈 {lang_manager.get_text('quick_stats', language)}")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.metric(lang_manager.get_text('total_points', language), user_data['total_points'])
+        st.metric(lang_manager.get_text('quizzes_completed', language), len(user_data['quiz_scores']))
+    
+    with col2:
+        streak = data_manager.get_activity_calendar().current_streak()
+        st.metric(lang_manager.get_text('study_streak', language),
+                  f"{streak} {lang_manager.get_text('days', language)}")
+        st.metric(lang_manager.get_text('achievements', language), len(user_data['badges']))
+    
+    if user_data['badges']:
+        st.markdown(" ".join(user_data['badges'][-3:]))
@@ -0,0 +1,57 @@
+import streamlit as st
+from utils.language_manager import LanguageManager
+from utils.services import get_data_manager
+import pandas as pd
+
+def show_leaderboard_page(language: str, lang_manager: LanguageManager):
+    """Display daily, weekly and all-time points leaderboards"""
+    
+    data_manager = get_data_manager()
+    
+    st.markdown(f"## 🏅 {lang_manager.get_text('leaderboard', language)}")
+    
+    windows = {
+        'daily': "Today" if language == 'en' else "आज",
+        'weekly': "This Week" if language == 'en' else "इस सप्ताह",
+        'all_time': "All Time" if language == 'en' else "सर्वकालिक"
+    }
+    
+    tabs = st.tabs(list(windows.values()))
+    for tab, window in zip(tabs, windows):
+        with tab:
+            display_leaderboard(data_manager.get_leaderboard_standing(window, k=20), language, lang_manager)
+
+def display_leaderboard(standing: dict, language: str, lang_manager: LanguageManager):
+    """Display one leaderboard window with the user's own position"""
+    
+    if not standing['top']:
+        st.info("No points earned in this period yet. Take a quiz to get on the board!" if language == 'en'
+               else "इस अवधि में अभी तक कोई अंक नहीं। बोर्ड पर आने के लिए क्विज़ लें!")
+        return
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.metric("Your Rank" if language == 'en' else "आपकी रैंक",
+                  f"#{standing['rank']}" if standing['rank'] else "-")
+    
+    with col2:
+        st.metric("Students" if language == 'en' else "छात्र", standing['size'])
+    
+    columns = {
+        'rank': "Rank" if language == 'en' else "रैंक",
+        'name': "Name" if language == 'en' else "नाम",
+        'points': lang_manager.get_text('total_points', language)
+    }
+    
+    def to_frame(entries: list) -> pd.DataFrame:
+        df = pd.DataFrame(entries)
+        # Users without a profile name are shown anonymously
+        df['name'] = [name or f"Student {user_id[:6]}" for name, user_id in zip(df['name'], df['user_id'])]
+        return df[list(columns)].rename(columns=columns)
+    
+    st.dataframe(to_frame(standing['top']), use_container_width=True, hide_index=True)
+    
+    if standing['around'] and standing['rank'] and standing['rank'] > len(standing['top']):
+        st.markdown("#### 📍 Around You" if language == 'en' else "#### 📍 आपके आसपास")
+        st.dataframe(to_frame(standing['around']), use_container_width=True, hide_index=True)
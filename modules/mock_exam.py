@@ -0,0 +1,311 @@
+import streamlit as st
+from utils.data_manager import DataManager
+from utils.language_manager import LanguageManager
+from utils.services import get_ai_services, get_data_manager
+from utils.exam_sessions import get_exam_sessions, time_left, MOCK_EXAM
+from utils.mock_exam import MockExamEngine, BLUEPRINTS, UNANSWERED, blueprint_size, new_answer_sheet, index_paper, paper_state
+from utils.search_index import get_search_index
+import pandas as pd
+import math
+
+QUESTIONS_PER_PAGE = 10
+
+def show_mock_exam_page(language: str, lang_manager: LanguageManager):
+    """Display the full-length timed mock exam page"""
+    
+    data_manager = get_data_manager()
+    
+    st.markdown(f"## 🧾 {lang_manager.get_text('mock_exam', language)}")
+    
+    exam = st.session_state.get('mock_exam') or resume_exam(language)
+    if exam is None:
+        display_exam_setup(language, lang_manager)
+    elif exam['result'] is None:
+        display_exam_runner(exam, language, lang_manager)
+    else:
+        display_exam_results(exam, data_manager, language, lang_manager)
+
+def display_exam_setup(language: str, lang_manager: LanguageManager):
+    """Choose an exam pattern and start a paper"""
+    
+    blueprint_id = st.selectbox(
+        "Exam Pattern" if language == 'en' else "परीक्षा पैटर्न",
+        options=list(BLUEPRINTS.keys()),
+        format_func=lambda key: BLUEPRINTS[key]['name'][language if language == 'hi' else 'en'],
+        key="mock_exam_blueprint"
+    )
+    blueprint = BLUEPRINTS[blueprint_id]
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Questions" if language == 'en' else "प्रश्न", blueprint_size(blueprint_id))
+    with col2:
+        st.metric("Time" if language == 'en' else "समय", f"{blueprint['minutes']} min")
+    with col3:
+        st.metric("Marking" if language == 'en' else "अंकन",
+                  f"+{blueprint['marks_correct']:g} / −{blueprint['negative']:.2f}")
+    
+    topics = lang_manager.get_quiz_topics(language)
+    st.dataframe(
+        pd.DataFrame([{
+            "Section" if language == 'en' else "खंड": topics.get(topic, topic),
+            "Questions" if language == 'en' else "प्रश्न": count
+        } for topic, count in blueprint['sections']]),
+        use_container_width=True, hide_index=True
+    )
+    
+    if st.button("🚀 Start Exam" if language == 'en' else "🚀 परीक्षा शुरू करें", use_container_width=True):
+        engine = MockExamEngine(get_search_index(), get_ai_services())
+        seen = st.session_state.setdefault('mock_exam_seen', [])
+        with st.spinner("Assembling your paper..." if language == 'en' else "आपका प्रश्नपत्र तैयार हो रहा है..."):
+            paper = engine.assemble(blueprint_id, language, exclude=seen)
+        
+        if not paper['questions']:
+            st.error("The question bank has no questions for this exam yet. Take some AI quizzes on these topics first."
+                     if language == 'en' else "प्रश्न बैंक में अभी इस परीक्षा के लिए प्रश्न नहीं हैं। पहले इन विषयों पर कुछ AI क्विज़ लें।")
+            return
+        
+        seen.extend(q['ref'] for q in paper['questions'])
+        session = get_exam_sessions().start(st.session_state.user_id, MOCK_EXAM, paper_state(paper),
+                                            time_limit=paper['minutes'] * 60)
+        st.session_state.mock_exam = {
+            'paper': paper,
+            'answers': new_answer_sheet(paper),
+            'session': session,
+            'pages': {},
+            'result': None
+        }
+        st.rerun()
+
+def resume_exam(language: str):
+    """Pick up the user's unfinished exam after a reconnect, with every autosaved answer"""
+    
+    session = get_exam_sessions().resume(st.session_state.user_id, MOCK_EXAM)
+    if session is None:
+        return None
+    
+    paper = index_paper(session['state'])
+    answers = new_answer_sheet(paper)
+    for item, answer in session['answers'].items():
+        answers[item] = answer
+    exam = st.session_state.mock_exam = {
+        'paper': paper,
+        'answers': answers,
+        'session': session,
+        'pages': {},
+        'result': None
+    }
+    st.toast("Resumed your unfinished exam" if language == 'en' else "आपकी अधूरी परीक्षा फिर से शुरू की गई")
+    return exam
+
+def display_exam_runner(exam: dict, language: str, lang_manager: LanguageManager):
+    """Header, timer, question blocks and submit button of a running exam"""
+    
+    paper = exam['paper']
+    blueprint = BLUEPRINTS[paper['blueprint']]
+    
+    if time_left(exam['session']) <= 0:
+        submit_exam(exam)
+        st.rerun()
+    
+    st.markdown(f"### {blueprint['name'][language if language == 'hi' else 'en']}")
+    
+    planned = blueprint_size(paper['blueprint'])
+    if len(paper['questions']) < planned:
+        st.caption(f"The question bank had {len(paper['questions'])} of {planned} questions for this pattern."
+                   if language == 'en' else f"प्रश्न बैंक में इस पैटर्न के {planned} में से {len(paper['questions'])} प्रश्न थे।")
+    
+    display_exam_timer(exam, language)
+    display_question_block(exam, language, lang_manager)
+    
+    st.markdown("---")
+    if st.button("✅ Submit Exam" if language == 'en' else "✅ परीक्षा जमा करें", use_container_width=True,
+                 key="mock_exam_submit"):
+        submit_exam(exam)
+        st.rerun()
+
+@st.fragment(run_every=5)
+def display_exam_timer(exam: dict, language: str):
+    """Countdown that refreshes on its own without re-running the page"""
+    
+    remaining = time_left(exam['session'])
+    if remaining <= 0:
+        # Time is up: the full rerun submits the paper
+        st.rerun()
+    
+    answered = int((exam['answers'] != UNANSWERED).sum())
+    if remaining == math.inf:
+        st.markdown(f"{answered}/{len(exam['answers'])} answered" if language == 'en'
+                    else f"{answered}/{len(exam['answers'])} उत्तर दिए")
+        return
+    minutes, seconds = divmod(int(remaining), 60)
+    st.markdown(
+        f"⏱️ **{minutes:02d}:{seconds:02d}** left · {answered}/{len(exam['answers'])} answered" if language == 'en'
+        else f"⏱️ **{minutes:02d}:{seconds:02d}** शेष · {answered}/{len(exam['answers'])} उत्तर दिए"
+    )
+
+@st.fragment
+def display_question_block(exam: dict, language: str, lang_manager: LanguageManager):
+    """One page of one section; answering or paging re-runs only this block"""
+    
+    paper = exam['paper']
+    answers = exam['answers']
+    sections = paper['sections']
+    topics = lang_manager.get_quiz_topics(language)
+    
+    def section_label(i: int) -> str:
+        section = sections[i]
+        answered = int((answers[section['start']:section['start'] + section['count']] != UNANSWERED).sum())
+        return f"{topics.get(section['topic'], section['topic'])} ({answered}/{section['count']})"
+    
+    section_i = st.radio(
+        "Section" if language == 'en' else "खंड",
+        options=range(len(sections)),
+        format_func=section_label,
+        horizontal=True,
+        key=f"mock_exam_section_{paper['exam_id']}"
+    )
+    section = sections[section_i]
+    pages = math.ceil(section['count'] / QUESTIONS_PER_PAGE)
+    page = exam['pages'].get(section_i, 0)
+    
+    start = section['start'] + page * QUESTIONS_PER_PAGE
+    end = min(start + QUESTIONS_PER_PAGE, section['start'] + section['count'])
+    for i in range(start, end):
+        question = paper['questions'][i]
+        key = f"mock_exam_q_{paper['exam_id']}_{i}"
+        st.markdown(f"**Q{i + 1}.** {question['question']}")
+        
+        col1, col2 = st.columns([6, 1])
+        with col1:
+            st.radio(
+                f"Q{i + 1}",
+                options=range(len(question['options'])),
+                format_func=lambda x, options=question['options']: f"{chr(65 + x)}. {options[x]}",
+                index=int(answers[i]) if answers[i] != UNANSWERED else None,
+                key=key,
+                on_change=record_answer,
+                args=(exam, i, key),
+                label_visibility="collapsed"
+            )
+        with col2:
+            # Unanswered questions cost nothing under negative marking, so answers can be withdrawn
+            st.button("Clear" if language == 'en' else "हटाएं", key=f"clear_{key}", on_click=clear_answer,
+                      args=(exam, i, key), disabled=answers[i] == UNANSWERED)
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        st.button("⬅️ Previous" if language == 'en' else "⬅️ पिछला", disabled=page == 0, on_click=set_page,
+                  args=(exam, section_i, page - 1), key="mock_exam_prev")
+    with col2:
+        st.caption(f"Page {page + 1} of {pages}" if language == 'en' else f"पृष्ठ {page + 1} / {pages}")
+    with col3:
+        st.button("Next ➡️" if language == 'en' else "अगला ➡️", disabled=page >= pages - 1, on_click=set_page,
+                  args=(exam, section_i, page + 1), key="mock_exam_next")
+
+def record_answer(exam: dict, index: int, key: str):
+    choice = st.session_state.get(key)
+    answer = UNANSWERED if choice is None else choice
+    # The session store refuses answers once the deadline has passed
+    if get_exam_sessions().record(exam['session']['id'], index, answer):
+        exam['answers'][index] = answer
+
+def clear_answer(exam: dict, index: int, key: str):
+    if get_exam_sessions().record(exam['session']['id'], index, UNANSWERED):
+        exam['answers'][index] = UNANSWERED
+        st.session_state.pop(key, None)
+
+def set_page(exam: dict, section_i: int, page: int):
+    exam['pages'][section_i] = page
+
+def submit_exam(exam: dict):
+    """Grade the whole answer sheet once"""
+    exam['finished_at'] = get_exam_sessions().finish(exam['session']['id'])
+    exam['result'] = MockExamEngine.grade(exam['paper'], exam['answers'])
+
+def display_exam_results(exam: dict, data_manager: DataManager, language: str, lang_manager: LanguageManager):
+    """Score, per-section breakdown and answer review of a submitted exam"""
+    
+    paper = exam['paper']
+    result = exam['result']
+    blueprint = BLUEPRINTS[paper['blueprint']]
+    topics = lang_manager.get_quiz_topics(language)
+    
+    st.markdown(f"# 🎯 {blueprint['name'][language if language == 'hi' else 'en']}")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(lang_manager.get_text('your_score', language), f"{result['score']:g}/{result['max_score']:g}")
+    with col2:
+        st.metric("Accuracy" if language == 'en' else "सटीकता", f"{result['accuracy']:.1f}%")
+    with col3:
+        st.metric("Correct / Wrong / Skipped" if language == 'en' else "सही / गलत / छोड़े",
+                  f"{result['correct']} / {result['wrong']} / {result['unanswered']}")
+    with col4:
+        st.metric("Time Taken" if language == 'en' else "समय लिया",
+                  f"{(exam['finished_at'] - exam['session']['started_at']) / 60:.0f} min")
+    
+    # Save results once per exam (results re-render on every rerun)
+    if not exam.get('saved'):
+        data_manager.save_mock_exam_result(blueprint['name']['en'], paper, result)
+        exam['saved'] = True
+    
+    st.markdown("### 📊 Section-wise Performance" if language == 'en' else "### 📊 खंडवार प्रदर्शन")
+    st.dataframe(pd.DataFrame([{
+        "Section" if language == 'en' else "खंड": topics.get(s['topic'], s['topic']),
+        "Attempted" if language == 'en' else "प्रयास": f"{s['attempted']}/{s['questions']}",
+        "Correct" if language == 'en' else "सही": s['correct'],
+        "Wrong" if language == 'en' else "गलत": s['wrong'],
+        "Marks" if language == 'en' else "अंक": f"{s['marks']:g}/{s['max_marks']:g}",
+        "Accuracy" if language == 'en' else "सटीकता": f"{s['accuracy']:.1f}%"
+    } for s in result['sections']]), use_container_width=True, hide_index=True)
+    
+    display_answer_review(exam, language)
+    
+    if st.button("🔄 Take Another Exam" if language == 'en' else "🔄 दूसरी परीक्षा दें", use_container_width=True):
+        del st.session_state.mock_exam
+        st.rerun()
+
+def display_answer_review(exam: dict, language: str):
+    """Paged review of wrong, skipped or all questions"""
+    
+    paper = exam['paper']
+    result = exam['result']
+    
+    with st.expander("📋 Review Answers" if language == 'en' else "📋 उत्तरों की समीक्षा"):
+        filters = {
+            'wrong': "Wrong" if language == 'en' else "गलत",
+            'unanswered': "Skipped" if language == 'en' else "छोड़े गए",
+            'all': "All" if language == 'en' else "सभी"
+        }
+        shown = st.radio("Show" if language == 'en' else "दिखाएं", options=list(filters), format_func=filters.get,
+                         horizontal=True, key="mock_review_filter")
+        if shown == 'wrong':
+            indices = result['wrong_mask'].nonzero()[0]
+        elif shown == 'unanswered':
+            indices = (exam['answers'] == UNANSWERED).nonzero()[0]
+        else:
+            indices = range(len(paper['questions']))
+        
+        if not len(indices):
+            st.info("Nothing to show." if language == 'en' else "दिखाने के लिए कुछ नहीं।")
+            return
+        
+        pages = math.ceil(len(indices) / QUESTIONS_PER_PAGE)
+        page = st.number_input("Page" if language == 'en' else "पृष्ठ", min_value=1, max_value=pages, value=1,
+                               key=f"mock_review_page_{shown}") - 1
+        for i in indices[page * QUESTIONS_PER_PAGE:(page + 1) * QUESTIONS_PER_PAGE]:
+            question = paper['questions'][i]
+            answer = int(exam['answers'][i])
+            st.markdown(f"**Q{i + 1}.** {question['question']}")
+            if answer == UNANSWERED:
+                st.markdown("Your answer: ⏭️ Skipped" if language == 'en' else "आपका उत्तर: ⏭️ छोड़ा गया")
+            else:
+                mark = "✅" if result['correct_mask'][i] else "❌"
+                st.markdown(f"Your answer: {mark} {question['options'][answer]}" if language == 'en'
+                            else f"आपका उत्तर: {mark} {question['options'][answer]}")
+            st.markdown(f"Correct answer: ✅ {question['options'][question['correct_answer']]}" if language == 'en'
+                        else f"सही उत्तर: ✅ {question['options'][question['correct_answer']]}")
+            if question.get('explanation'):
+                st.info(f"💡 {question['explanation']}")
+            st.divider()
@@ -1,18 +1,30 @@
 import streamlit as st
 from utils.ai_services import AIServices
-from utils.data_manager import DataManager
 from utils.language_manager import LanguageManager
+from utils.services import get_ai_services, get_data_manager
+from utils.exam_sessions import get_exam_sessions, ordered_answers, INTERVIEW
+from utils.interview_bank import get_interview_bank
+from utils.interview_pool import get_interview_pool, get_interview_pool_filler, pool_key, POOL_TARGET
+from utils.answer_scorer import score_answer
+from utils.speech import get_transcriber, speech_available
+import hashlib
 import time
 from datetime import datetime
 
 def show_mock_interview_page(language: str, lang_manager: LanguageManager):
     """Display the AI mock interview page"""
     
-    ai_services = AIServices()
-    data_manager = DataManager()
+    ai_services = get_ai_services()
+    data_manager = get_data_manager()
     
     st.markdown(f"## 🎙️ {lang_manager.get_text('ai_mock_interview', language)}")
     
+    # Resume an in-progress interview across reruns, or after a reconnect from its autosaved responses
+    interview_session = st.session_state.get('interview_session') or resume_interview_session()
+    if interview_session:
+        run_interview_session(interview_session, ai_services, lang_manager)
+        return
+    
     # Interview setup
     col1, col2 = st.columns([2, 1])
     
@@ -72,114 +84,91 @@ def start_interview_session(topic: str, interview_type: str, difficulty: int, la
                            ai_services: AIServices, lang_manager: LanguageManager):
     """Start an interview session"""
     
-    # Initialize interview session
+    # Initialize interview session; the attempt and its responses are kept server-side
     if 'interview_session' not in st.session_state:
-        st.session_state.interview_session = {
+        data_manager = get_data_manager()
+        questions = generate_interview_questions(topic, interview_type, difficulty, language,
+                                                 data_manager.get_answered_interview_questions(),
+                                                 st.session_state.user_data.get('exam_type', ''), ai_services)
+        state = {
             'topic': topic,
             'type': interview_type,
             'difficulty': difficulty,
             'language': language,
-            'questions': generate_interview_questions(topic, interview_type, difficulty, language),
+            'questions': [question['question'] for question in questions],
+            'question_ids': [question['id'] for question in questions],
+            'key_points': [question.get('key_points', []) for question in questions]
+        }
+        exam_session = get_exam_sessions().start(st.session_state.user_id, INTERVIEW, state)
+        st.session_state.interview_session = {
+            **state,
             'current_question': 0,
             'responses': [],
-            'start_time': time.time()
+            'start_time': exam_session['started_at'],
+            'exam_session': exam_session
         }
     
-    session = st.session_state.interview_session
+    run_interview_session(st.session_state.interview_session, ai_services, lang_manager)
+
+def resume_interview_session():
+    """Rebuild the user's unfinished interview from the session store, or None"""
+    
+    exam_session = get_exam_sessions().resume(st.session_state.user_id, INTERVIEW)
+    if exam_session is None:
+        return None
+    
+    state = exam_session['state']
+    responses = [{**response, 'question': state['questions'][i]}
+                 for i, response in enumerate(ordered_answers(exam_session['answers']))]
+    session = st.session_state.interview_session = {
+        **state,
+        'current_question': len(responses),
+        'responses': responses,
+        'start_time': exam_session['started_at'],
+        'exam_session': exam_session
+    }
+    return session
+
+def save_response(session: dict, response: str, feedback, dimensions: dict = None):
+    """Record a response to the current question, with its local dimension scores and time taken, and autosave it"""
+    now = datetime.now()
+    # A resumed interview has no display time for its current question; count from the previous answer
+    previous = (datetime.fromisoformat(session['responses'][-1]['timestamp']).timestamp()
+                if session['responses'] else session['start_time'])
+    shown_at = session.get('shown_at', {}).get(session['current_question'], previous)
+    entry = {'response': response, 'feedback': feedback, 'timestamp': now.isoformat(),
+             'dimensions': dimensions, 'seconds': round(now.timestamp() - shown_at, 1)}
+    get_exam_sessions().record(session['exam_session']['id'], session['current_question'], entry)
+    session['responses'].append({'question': session['questions'][session['current_question']], **entry})
+    session['current_question'] += 1
+
+def run_interview_session(session: dict, ai_services: AIServices, lang_manager: LanguageManager):
+    """Display the current question or the results of the active interview"""
     
     if session['current_question'] < len(session['questions']):
         display_interview_question(session, ai_services, lang_manager)
     else:
         display_interview_results(session, lang_manager)
 
-def generate_interview_questions(topic: str, interview_type: str, difficulty: int, language: str) -> list:
-    """Generate interview questions based on parameters"""
-    
-    # Predefined questions based on topic and type
-    question_bank = {
-        'en': {
-            'Personal Background': [
-                "Tell me about yourself and your background.",
-                "What motivates you to join government service?",
-                "Describe your strengths and weaknesses.",
-                "How do you handle pressure and stressful situations?",
-                "What are your long-term career goals?"
-            ],
-            'Career Goals': [
-                "Why do you want to work in the government sector?",
-                "How do you see yourself contributing to public service?",
-                "What changes would you like to bring in your department?",
-                "How do you balance personal ambitions with public service?",
-                "Describe your ideal work environment."
-            ],
-            'Current Affairs': [
-                "What is your opinion on the latest government policies?",
-                "How do current economic trends affect governance?",
-                "Discuss a recent international event and its impact on India.",
-                "What are the major challenges facing India today?",
-                "How should the government address unemployment?"
-            ],
-            'Leadership': [
-                "Describe a situation where you demonstrated leadership.",
-                "How do you motivate a team during challenging times?",
-                "What is the difference between a manager and a leader?",
-                "How do you handle conflicts within your team?",
-                "Give an example of a difficult decision you had to make."
-            ],
-            'Ethics': [
-                "How do you handle ethical dilemmas in the workplace?",
-                "What would you do if asked to compromise your values?",
-                "Describe a situation where you stood up for what's right.",
-                "How important is transparency in government work?",
-                "What does integrity mean to you?"
-            ]
-        },
-        'hi': {
-            'Personal Background': [
-                "अपने बारे में और अपनी पृष्ठभूमि के बारे में बताएं।",
-                "आपको सरकारी सेवा में शामिल होने की प्रेरणा क्या देती है?",
-                "अपनी शक्तियों और कमजोरियों का वर्णन करें।",
-                "आप दबाव और तनावपूर्ण परिस्थितियों को कैसे संभालते हैं?",
-                "आपके दीर्घकालिक करियर लक्ष्य क्या हैं?"
-            ],
-            'Career Goals': [
-                "आप सरकारी क्षेत्र में क्यों काम करना चाहते हैं?",
-                "आप लोक सेवा में अपना योगदान कैसे देखते हैं?",
-                "आप अपने विभाग में क्या बदलाव लाना चाहेंगे?",
-                "आप व्यक्तिगत महत्वाकांक्षाओं और लोक सेवा के बीच संतुलन कैसे बनाते हैं?",
-                "अपने आदर्श कार्य वातावरण का वर्णन करें।"
-            ],
-            'Current Affairs': [
-                "नवीनतम सरकारी नीतियों पर आपकी क्या राय है?",
-                "वर्तमान आर्थिक रुझान शासन को कैसे प्रभावित करते हैं?",
-                "हाल की किसी अंतर्राष्ट्रीय घटना और भारत पर इसके प्रभाव पर चर्चा करें।",
-                "आज भारत के सामने मुख्य चुनौतियां क्या हैं?",
-                "सरकार को बेरोजगारी की समस्या कैसे हल करनी चाहिए?"
-            ],
-            'Leadership': [
-                "एक ऐसी स्थिति का वर्णन करें जहां आपने नेतृत्व का प्रदर्शन किया।",
-                "चुनौतीपूर्ण समय में आप टीम को कैसे प्रेरित करते हैं?",
-                "एक प्रबंधक और एक नेता के बीच क्या अंतर है?",
-                "आप अपनी टीम के भीतर संघर्षों को कैसे संभालते हैं?",
-                "किसी कठिन निर्णय का उदाहरण दें जो आपको लेना पड़ा।"
-            ],
-            'Ethics': [
-                "आप कार्यस्थल में नैतिक दुविधाओं को कैसे संभालते हैं?",
-                "यदि आपसे अपने मूल्यों से समझौता करने को कहा जाए तो आप क्या करेंगे?",
-                "एक ऐसी स्थिति का वर्णन करें जहां आपने सही के लिए खड़े होकर समर्थन किया।",
-                "सरकारी काम में पारदर्शिता कितनी महत्वपूर्ण है?",
-                "आपके लिए ईमानदारी का क्या मतलब है?"
-            ]
-        }
-    }
-    
-    # Get questions for the topic
-    lang_key = 'hi' if language == 'hi' else 'en'
-    topic_questions = question_bank.get(lang_key, {}).get(topic, question_bank[lang_key]['Personal Background'])
-    
-    # Select questions based on difficulty (more questions for higher difficulty)
-    num_questions = min(3 + difficulty, len(topic_questions))
-    return topic_questions[:num_questions]
+def generate_interview_questions(topic: str, interview_type: str, difficulty: int, language: str,
+                                 answered: set = frozenset(), exam_type: str = '',
+                                 ai_services: AIServices = None) -> list:
+    """Pick interview questions, avoiding ones already answered: AI-generated ones for the user's exam
+    from the stored pool first, then the question bank"""
+    
+    # More questions for higher difficulty
+    count = 3 + difficulty
+    pool = get_interview_pool()
+    key = pool_key(exam_type, topic, interview_type, difficulty, language)
+    pooled = pool.sample(key, count, exclude=answered)
+    
+    # Generation happens in the background; this interview is served from what is already stored
+    if ai_services and (len(pooled) < count or pool.size(key) < POOL_TARGET):
+        get_interview_pool_filler(get_ai_services).request(key, grow=len(pooled) < count)
+    
+    banked = get_interview_bank().select(language, topic, interview_type, difficulty, count - len(pooled),
+                                         exclude=answered) if len(pooled) < count else []
+    return sorted(pooled + banked, key=lambda question: question['difficulty'])
 
 def display_interview_question(session: dict, ai_services: AIServices, lang_manager: LanguageManager):
     """Display current interview question and handle response"""
@@ -195,42 +184,51 @@ def display_interview_question(session: dict, ai_services: AIServices, lang_mana
     
     # Question display
     st.markdown(f"### 🎤 {question}")
+    session.setdefault('shown_at', {}).setdefault(current_q_idx, time.time())
     
     # Response input
     st.markdown(f"#### {lang_manager.get_text('record_answer', language)}")
     
+    # A finished transcription is added to the response box before the box is drawn
+    response_key = f"response_{current_q_idx}"
+    transcript = st.session_state.pop(f"transcript_{current_q_idx}", None)
+    if transcript:
+        st.session_state[response_key] = f"{st.session_state.get(response_key, '').strip()} {transcript}".strip()
+    
     # Text response (primary method)
     user_response = st.text_area(
         "Your Response" if language == 'en' else "आपका उत्तर",
         height=150,
-        key=f"response_{current_q_idx}",
+        key=response_key,
         placeholder="Type your detailed response here..." if language == 'en' 
                    else "यहां अपना विस्तृत उत्तर टाइप करें..."
     )
     
-    # Optional: Voice recording simulation
+    # Optional: spoken answer, transcribed locally into the response box
+    display_voice_answer(current_q_idx, language)
+    
     col1, col2 = st.columns([3, 1])
     
     with col1:
         if st.button(f"🎯 {lang_manager.get_text('submit_response', language)}", 
                     disabled=not user_response.strip(), use_container_width=True):
-            # Evaluate response
-            with st.spinner("Evaluating your response..." if language == 'en' else "आपके उत्तर का मूल्यांकन कर रहे हैं..."):
-                feedback = ai_services.conduct_mock_interview(question, user_response, language)
-            
-            # Store response and feedback
-            session['responses'].append({
-                'question': question,
-                'response': user_response,
-                'feedback': feedback,
-                'timestamp': datetime.now().isoformat()
-            })
+            # Instant local check; only substantive answers are sent to the model for detailed feedback
+            key_points = session.get('key_points', [[]] * len(session['questions']))[current_q_idx]
+            feedback = score_answer(question, user_response, language, session['topic'], key_points)
+            dimensions = feedback['dimensions']
+            feedback_area = st.empty()
+            with feedback_area.container():
+                display_question_feedback(feedback, language, lang_manager)
             
-            # Show feedback
-            display_question_feedback(feedback, language, lang_manager)
+            if feedback['substantive']:
+                with st.spinner("Evaluating your response..." if language == 'en' else "आपके उत्तर का मूल्यांकन कर रहे हैं..."):
+                    feedback = ai_services.conduct_mock_interview(question, user_response, language,
+                                                                  session['topic'], key_points)
+                with feedback_area.container():
+                    display_question_feedback(feedback, language, lang_manager)
             
-            # Move to next question
-            session['current_question'] += 1
+            # Store response and feedback, and move to the next question
+            save_response(session, user_response, feedback, dimensions)
             
             # Brief pause before next question
             time.sleep(2)
@@ -238,13 +236,7 @@ def display_interview_question(session: dict, ai_services: AIServices, lang_mana
     
     with col2:
         if st.button("⏭️ Skip", help="Skip this question"):
-            session['responses'].append({
-                'question': question,
-                'response': "Skipped",
-                'feedback': None,
-                'timestamp': datetime.now().isoformat()
-            })
-            session['current_question'] += 1
+            save_response(session, "Skipped", None)
             st.rerun()
     
     # Interview guidelines
@@ -253,6 +245,56 @@ def display_interview_question(session: dict, ai_services: AIServices, lang_mana
         for guideline in guidelines:
             st.markdown(f"• {guideline}")
 
+def display_voice_answer(question_idx: int, language: str):
+    """Record or upload a spoken answer and transcribe it in the background"""
+    
+    with st.expander("🎙️ Answer by voice" if language == 'en' else "🎙️ बोलकर उत्तर दें"):
+        if not speech_available():
+            st.caption("Voice answers need the faster-whisper package on the server." if language == 'en'
+                       else "बोलकर उत्तर देने के लिए सर्वर पर faster-whisper पैकेज आवश्यक है।")
+            return
+        
+        error = st.session_state.pop(f"transcription_error_{question_idx}", None)
+        if error:
+            st.error(f"Could not transcribe the recording: {error}" if language == 'en'
+                     else f"रिकॉर्डिंग का लिप्यंतरण नहीं हो सका: {error}")
+        
+        recording = st.audio_input("Record your answer" if language == 'en' else "अपना उत्तर रिकॉर्ड करें",
+                                   key=f"voice_{question_idx}")
+        upload = st.file_uploader("Or upload a recording" if language == 'en' else "या रिकॉर्डिंग अपलोड करें",
+                                  type=['wav', 'mp3', 'm4a', 'ogg', 'webm'], key=f"voice_file_{question_idx}")
+        clip = recording or upload
+        if clip is not None:
+            data = clip.getvalue()
+            digest = hashlib.sha1(data).hexdigest()
+            # Each clip is transcribed once, however many reruns it survives
+            if st.session_state.get(f"transcribed_clip_{question_idx}") != digest:
+                st.session_state[f"transcribed_clip_{question_idx}"] = digest
+                st.session_state[f"transcription_{question_idx}"] = get_transcriber().submit(data, language)
+        
+        if f"transcription_{question_idx}" in st.session_state:
+            show_transcription_progress(question_idx, language)
+
+@st.fragment(run_every=1)
+def show_transcription_progress(question_idx: int, language: str):
+    """Show partial text while a recording is transcribed, then hand the text to the response box"""
+    
+    job = st.session_state.get(f"transcription_{question_idx}")
+    if job is None:
+        return
+    
+    if job.done:
+        del st.session_state[f"transcription_{question_idx}"]
+        if job.error:
+            st.session_state[f"transcription_error_{question_idx}"] = job.error
+        else:
+            st.session_state[f"transcript_{question_idx}"] = job.text
+        st.rerun()
+    
+    st.progress(job.progress, text="Transcribing..." if language == 'en' else "लिप्यंतरण हो रहा है...")
+    if job.text:
+        st.caption(job.text)
+
 def display_question_feedback(feedback: dict, language: str, lang_manager: LanguageManager):
     """Display AI feedback for the current response"""
     
@@ -261,6 +303,9 @@ def display_question_feedback(feedback: dict, language: str, lang_manager: Langu
     
     st.markdown("---")
     st.markdown(f"### 📝 {lang_manager.get_text('interview_feedback', language)}")
+    if feedback.get('provisional'):
+        st.caption("⚡ Quick check of length, structure and key points" if language == 'en'
+                   else "⚡ लंबाई, संरचना और मुख्य बिंदुओं की त्वरित जांच")
     
     col1, col2 = st.columns(2)
     
@@ -321,7 +366,9 @@ def display_interview_results(session: dict, lang_manager: LanguageManager):
         st.metric("Overall Score" if language == 'en' else "समग्र स्कोर", f"{overall_score:.1f}/100")
     
     with col2:
-        interview_time = (time.time() - session['start_time']) / 60
+        if 'finished_at' not in session:
+            session['finished_at'] = get_exam_sessions().finish(session['exam_session']['id'])
+        interview_time = (session['finished_at'] - session['start_time']) / 60
         st.metric("Time Taken" if language == 'en' else "समय लिया", f"{interview_time:.1f} min")
     
     with col3:
@@ -364,9 +411,12 @@ def display_interview_results(session: dict, lang_manager: LanguageManager):
             
             st.divider()
     
-    # Save interview results
-    data_manager = DataManager()
-    data_manager.save_interview_result(overall_score, session['topic'], language)
+    # Save interview results once per session (results re-render on every rerun)
+    if not session.get('saved'):
+        data_manager = get_data_manager()
+        data_manager.save_interview_result(overall_score, session['topic'], language, session.get('question_ids'),
+                                           [answer_record(session, i) for i in range(len(session['responses']))])
+        session['saved'] = True
     
     # Action buttons
     col1, col2, col3 = st.columns(3)
@@ -389,6 +439,22 @@ def display_interview_results(session: dict, lang_manager: LanguageManager):
             st.session_state.page = 'Home'
             st.rerun()
 
+def answer_record(session: dict, index: int) -> dict:
+    """Structured per-question result kept with the saved interview"""
+    response = session['responses'][index]
+    feedback = response['feedback'] or {}
+    question_ids = session.get('question_ids') or []
+    return {
+        'question_id': question_ids[index] if index < len(question_ids) else None,
+        'skipped': response['response'] == 'Skipped',
+        'score': feedback.get('score'),
+        'dimensions': response.get('dimensions') or {},
+        'strengths': list(feedback.get('strengths', [])),
+        'improvements': list(feedback.get('improvements', [])),
+        'seconds': response.get('seconds'),
+        'words': len(response['response'].split()) if response['response'] != 'Skipped' else 0
+    }
+
 def get_interview_tips(language: str) -> list:
     """Get interview tips based on language"""
     
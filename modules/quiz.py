@@ -2,17 +2,33 @@ import streamlit as st
 from utils.ai_services import AIServices
 from utils.data_manager import DataManager
 from utils.language_manager import LanguageManager
+from utils.services import get_adaptive_engine, get_ai_services, get_data_manager, get_review_scheduler
+from utils.adaptive_engine import AdaptiveEngine
+from utils.review_scheduler import ReviewScheduler
+from utils.exam_sessions import get_exam_sessions, time_left, ordered_answers, QUIZ
+import math
 import time
 
+# Time allowed per question; the deadline is held by the exam session store
+QUIZ_SECONDS_PER_QUESTION = 90
+
 def show_quiz_page(language: str, lang_manager: LanguageManager):
     """Display the AI Quiz page"""
     
     # Initialize services
-    ai_services = AIServices()
-    data_manager = DataManager()
+    ai_services = get_ai_services()
+    data_manager = get_data_manager()
+    adaptive_engine = get_adaptive_engine()
+    review_scheduler = get_review_scheduler()
     
     st.markdown(f"## 📝 {lang_manager.get_text('quiz_generator', language)}")
     
+    # Resume an in-progress quiz across reruns, or after a reconnect from its autosaved answers
+    quiz_session = st.session_state.get('quiz_session') or resume_quiz_session()
+    if quiz_session:
+        run_quiz_session(quiz_session, data_manager, lang_manager, language, adaptive_engine, review_scheduler)
+        return
+    
     # Quiz configuration
     col1, col2 = st.columns([2, 1])
     
@@ -24,14 +40,26 @@ def show_quiz_page(language: str, lang_manager: LanguageManager):
             key="quiz_topic"
         )
         
+        adaptive = st.checkbox(
+            "🎯 Adaptive difficulty (match my level)" if language == 'en' else "🎯 अनुकूली कठिनाई (मेरे स्तर के अनुसार)",
+            value=False,
+            key="quiz_adaptive"
+        )
+        
         difficulty = st.slider(
             lang_manager.get_text('select_difficulty', language),
             min_value=1,
             max_value=5,
             value=3,
-            key="quiz_difficulty"
+            key="quiz_difficulty",
+            disabled=adaptive
         )
         
+        if adaptive:
+            difficulty = adaptive_engine.get_recommended_difficulty(selected_topic)
+            st.caption(f"Estimated level for this topic: {difficulty}/5" if language == 'en'
+                      else f"इस विषय के लिए अनुमानित स्तर: {difficulty}/5")
+        
         num_questions = st.selectbox(
             lang_manager.get_text('number_of_questions', language),
             options=[5, 10, 15, 20],
@@ -67,14 +95,30 @@ def show_quiz_page(language: str, lang_manager: LanguageManager):
     
     # Generate quiz button
     if st.button(f"🚀 {lang_manager.get_text('generate_quiz', language)}", use_container_width=True):
-        generate_and_run_quiz(selected_topic, difficulty, num_questions, language, ai_services, data_manager, lang_manager)
+        generate_and_run_quiz(selected_topic, difficulty, num_questions, language, ai_services, data_manager,
+                              lang_manager, adaptive_engine, review_scheduler, adaptive)
+    
+    # Review mode: missed questions that are due again, served from local storage
+    due_count = review_scheduler.count_due()
+    review_label = (f"🔁 Review Missed Questions ({due_count} due)" if language == 'en'
+                    else f"🔁 छूटे प्रश्नों की पुनरावृत्ति ({due_count} देय)")
+    if st.button(review_label, use_container_width=True, disabled=due_count == 0):
+        start_review_quiz(num_questions, language, data_manager, lang_manager, adaptive_engine, review_scheduler)
 
 def generate_and_run_quiz(topic: str, difficulty: int, num_questions: int, language: str, 
-                         ai_services: AIServices, data_manager: DataManager, lang_manager: LanguageManager):
+                         ai_services: AIServices, data_manager: DataManager, lang_manager: LanguageManager,
+                         adaptive_engine: AdaptiveEngine, review_scheduler: ReviewScheduler, adaptive: bool = False):
     """Generate and run a quiz session"""
     
-    with st.spinner(lang_manager.get_text('loading', language)):
-        questions = ai_services.generate_quiz_questions(topic, difficulty, language, num_questions)
+    # Adaptive quizzes come from the question bank; only the questions it can't supply are generated
+    questions = adaptive_engine.assemble_quiz(topic, num_questions, language) if adaptive else []
+    
+    if len(questions) < num_questions:
+        with st.spinner(lang_manager.get_text('loading', language)):
+            generated = ai_services.generate_quiz_questions(topic, difficulty, language, num_questions - len(questions))
+        adaptive_engine.add_questions(generated, topic, difficulty, language)
+        chosen = {question['id'] for question in questions}
+        questions += [question for question in generated if question['id'] not in chosen][:num_questions - len(questions)]
     
     if not questions:
         st.error("Unable to generate quiz questions. Please check your OpenAI API key or try again later.")
@@ -82,27 +126,95 @@ def generate_and_run_quiz(topic: str, difficulty: int, num_questions: int, langu
     
     # Initialize quiz session
     if 'quiz_session' not in st.session_state:
-        st.session_state.quiz_session = {
-            'questions': questions,
-            'current_question': 0,
-            'answers': [],
-            'score': 0,
-            'start_time': time.time(),
-            'topic': topic,
-            'difficulty': difficulty,
-            'language': language
-        }
-    
-    # Display current question
-    session = st.session_state.quiz_session
+        st.session_state.quiz_session = new_quiz_session(questions, topic, difficulty, language, 'practice')
+    
+    run_quiz_session(st.session_state.quiz_session, data_manager, lang_manager, language,
+                     adaptive_engine, review_scheduler)
+
+def start_review_quiz(num_questions: int, language: str, data_manager: DataManager, lang_manager: LanguageManager,
+                      adaptive_engine: AdaptiveEngine, review_scheduler: ReviewScheduler):
+    """Start a review session from due spaced-repetition items (no API calls)"""
+    
+    questions = review_scheduler.get_due_items(num_questions)
+    
+    if not questions:
+        st.info("Nothing is due for review right now." if language == 'en'
+               else "अभी पुनरावृत्ति के लिए कुछ भी देय नहीं है।")
+        return
+    
+    st.session_state.quiz_session = new_quiz_session(
+        questions, 'Review', round(sum(q.get('difficulty', 3) for q in questions) / len(questions)), language, 'review'
+    )
+    
+    run_quiz_session(st.session_state.quiz_session, data_manager, lang_manager, language,
+                     adaptive_engine, review_scheduler)
+
+def new_quiz_session(questions: list, topic: str, difficulty: int, language: str, mode: str) -> dict:
+    """Quiz session state, with its deadline and autosaved answers held server-side"""
+    
+    state = {'questions': questions, 'topic': topic, 'difficulty': difficulty, 'language': language, 'mode': mode}
+    exam_session = get_exam_sessions().start(st.session_state.user_id, QUIZ, state,
+                                             time_limit=len(questions) * QUIZ_SECONDS_PER_QUESTION)
+    return {
+        **state,
+        'current_question': 0,
+        'answers': [],
+        'score': 0,
+        'start_time': exam_session['started_at'],
+        'exam_session': exam_session
+    }
+
+def resume_quiz_session():
+    """Rebuild the user's unfinished quiz from the session store, or None"""
+    
+    exam_session = get_exam_sessions().resume(st.session_state.user_id, QUIZ)
+    if exam_session is None:
+        return None
+    
+    session = {
+        **exam_session['state'],
+        'current_question': 0,
+        'answers': [],
+        'score': 0,
+        'start_time': exam_session['started_at'],
+        'exam_session': exam_session
+    }
+    # Questions are answered in order, so the saved answers are the first ones
+    for q_idx, user_answer in enumerate(ordered_answers(exam_session['answers'])):
+        answer = answer_record(session['questions'][q_idx], q_idx, user_answer)
+        session['answers'].append(answer)
+        session['score'] += answer['is_correct']
+    session['current_question'] = len(session['answers'])
+    st.session_state.quiz_session = session
+    return session
+
+def answer_record(question: dict, q_idx: int, user_answer: int) -> dict:
+    return {
+        'question_idx': q_idx,
+        'user_answer': user_answer,
+        'correct_answer': question['correct_answer'],
+        'is_correct': user_answer == question['correct_answer'],
+        'question_text': question['question'],
+        'explanation': question.get('explanation', '')
+    }
+
+def run_quiz_session(session: dict, data_manager: DataManager, lang_manager: LanguageManager, language: str,
+                     adaptive_engine: AdaptiveEngine, review_scheduler: ReviewScheduler):
+    """Display the current question or the results of the active quiz session"""
+    
     current_q_idx = session['current_question']
     
+    if current_q_idx < len(session['questions']) and time_left(session['exam_session']) <= 0:
+        # Time is up: questions not reached count as unanswered
+        session['current_question'] = current_q_idx = len(session['questions'])
+    
     if current_q_idx < len(session['questions']):
-        display_question(session, current_q_idx, lang_manager, language)
+        display_question(session, current_q_idx, lang_manager, language, adaptive_engine, review_scheduler)
     else:
-        display_quiz_results(session, data_manager, lang_manager, language)
+        display_quiz_results(session, data_manager, lang_manager, language, adaptive_engine, review_scheduler)
 
-def display_question(session: dict, q_idx: int, lang_manager: LanguageManager, language: str):
+def display_question(session: dict, q_idx: int, lang_manager: LanguageManager, language: str,
+                     adaptive_engine: AdaptiveEngine, review_scheduler: ReviewScheduler):
     """Display current question and handle user interaction"""
     
     question = session['questions'][q_idx]
@@ -111,6 +223,10 @@ def display_question(session: dict, q_idx: int, lang_manager: LanguageManager, l
     progress = (q_idx + 1) / len(session['questions'])
     st.progress(progress)
     st.markdown(f"**{lang_manager.get_text('quiz', language)} {q_idx + 1}/{len(session['questions'])}**")
+    remaining = time_left(session['exam_session'])
+    if remaining != math.inf:
+        minutes, seconds = divmod(int(remaining), 60)
+        st.caption(f"⏱️ {minutes:02d}:{seconds:02d} left" if language == 'en' else f"⏱️ {minutes:02d}:{seconds:02d} शेष")
     
     # Question display
     st.markdown(f"### {question['question']}")
@@ -127,16 +243,20 @@ def display_question(session: dict, q_idx: int, lang_manager: LanguageManager, l
     
     with col2:
         if st.button(lang_manager.get_text('submit_answer', language), use_container_width=True):
+            # Autosave the answer; it is refused once the time is up
+            if not get_exam_sessions().record(session['exam_session']['id'], q_idx, user_answer):
+                session['current_question'] = len(session['questions'])
+                st.rerun()
+            
             # Record answer
-            is_correct = user_answer == question['correct_answer']
-            session['answers'].append({
-                'question_idx': q_idx,
-                'user_answer': user_answer,
-                'correct_answer': question['correct_answer'],
-                'is_correct': is_correct,
-                'question_text': question['question'],
-                'explanation': question.get('explanation', '')
-            })
+            answer = answer_record(question, q_idx, user_answer)
+            is_correct = answer['is_correct']
+            session['answers'].append(answer)
+            if session.get('mode') == 'review':
+                adaptive_engine.record_response(question, question.get('topic', session['topic']), is_correct)
+                review_scheduler.record_review(question['id'], is_correct)
+            else:
+                adaptive_engine.record_response(question, session['topic'], is_correct)
             
             if is_correct:
                 session['score'] += 1
@@ -154,13 +274,16 @@ def display_question(session: dict, q_idx: int, lang_manager: LanguageManager, l
             time.sleep(2)  # Brief pause to show result
             st.rerun()
 
-def display_quiz_results(session: dict, data_manager: DataManager, lang_manager: LanguageManager, language: str):
+def display_quiz_results(session: dict, data_manager: DataManager, lang_manager: LanguageManager, language: str,
+                         adaptive_engine: AdaptiveEngine, review_scheduler: ReviewScheduler):
     """Display quiz completion results and statistics"""
     
     score = session['score']
     total = len(session['questions'])
     percentage = (score / total) * 100
-    time_taken = time.time() - session['start_time']
+    if 'finished_at' not in session:
+        session['finished_at'] = get_exam_sessions().finish(session['exam_session']['id'])
+    time_taken = session['finished_at'] - session['start_time']
     
     # Celebration based on performance
     if percentage >= 90:
@@ -199,14 +322,28 @@ def display_quiz_results(session: dict, data_manager: DataManager, lang_manager:
         points_earned = data_manager._calculate_points(score, total, session['difficulty'])
         st.metric(lang_manager.get_text('points_earned', language), points_earned)
     
-    # Save results
-    data_manager.save_quiz_result(
-        topic=session['topic'],
-        score=score,
-        total_questions=total,
-        difficulty=session['difficulty'],
-        language=session['language']
-    )
+    # Save results once per session (results re-render on every rerun)
+    if not session.get('saved'):
+        data_manager.save_quiz_result(
+            topic=session['topic'],
+            score=score,
+            total_questions=total,
+            difficulty=session['difficulty'],
+            language=session['language']
+        )
+        # Same topics the answers were logged under
+        topics = ({question.get('topic', session['topic']) for question in session['questions']}
+                  if session.get('mode') == 'review' else {session['topic']})
+        for topic in topics:
+            adaptive_engine.recalibrate_items(topic)
+        
+        # Missed questions go into the spaced-repetition queue (review answers are rescheduled as they're given)
+        if session.get('mode') != 'review':
+            for answer in session['answers']:
+                if not answer['is_correct']:
+                    review_scheduler.add_missed(session['questions'][answer['question_idx']],
+                                                session['topic'], session['language'])
+        session['saved'] = True
     
     # Detailed review
     with st.expander("📋 Detailed Review" if language == 'en' else "📋 विस्तृत समीक्षा", expanded=False):
@@ -2,14 +2,16 @@ import streamlit as st
 from utils.ai_services import AIServices
 from utils.data_manager import DataManager
 from utils.language_manager import LanguageManager
+from utils.services import get_ai_services, get_data_manager
+from utils.study_scheduler import build_study_schedule, daily_schedule, schedule_key
 from datetime import datetime, timedelta
 import pandas as pd
 
 def show_study_plan_page(language: str, lang_manager: LanguageManager):
     """Display the personalized study plan page"""
     
-    ai_services = AIServices()
-    data_manager = DataManager()
+    ai_services = get_ai_services()
+    data_manager = get_data_manager()
     
     st.markdown(f"## 🎯 {lang_manager.get_text('personalized_study_plan', language)}")
     
@@ -33,9 +35,20 @@ def show_study_plan_page(language: str, lang_manager: LanguageManager):
                        else f"**परीक्षा तक दिन:** {days_left} दिन")
     
     with col2:
+        # The calendar is built locally; the AI only adds optional study tips
+        use_ai_tips = st.checkbox(
+            "✨ Add AI study tips" if language == 'en' else "✨ एआई अध्ययन सुझाव जोड़ें",
+            value=False,
+            key="study_plan_ai_tips",
+            disabled=ai_services.client is None
+        )
+        
         # Generate study plan button
         if st.button(f"🚀 {lang_manager.get_text('generate_study_plan', language)}", use_container_width=True):
-            generate_study_plan(user_data, language, ai_services, lang_manager)
+            generate_study_plan(user_data, language, ai_services, data_manager, lang_manager, use_ai_tips)
+    
+    # Rebuild the calendar when the profile or weak/strong topics changed
+    refresh_study_plan_if_stale(user_data, language, data_manager)
     
     # Display existing study plan if available
     if st.session_state.get('study_plan'):
@@ -44,33 +57,80 @@ def show_study_plan_page(language: str, lang_manager: LanguageManager):
     # Study statistics
     display_study_statistics(data_manager, language, lang_manager)
 
-def generate_study_plan(user_data: dict, language: str, ai_services: AIServices, lang_manager: LanguageManager):
-    """Generate AI-powered study plan"""
+def build_local_plan(user_data: dict, language: str, data_manager: DataManager) -> dict:
+    """Build the day-by-day study calendar from the profile and quiz performance"""
+    
+    stats = data_manager.get_user_stats()
+    return build_study_schedule(
+        user_data['exam_type'],
+        user_data.get('target_date'),
+        user_data.get('study_hours_per_day', 2),
+        user_data.get('topics_studied', {}),
+        stats['weak_topics'],
+        stats['strong_topics'],
+        language
+    )
+
+def generate_study_plan(user_data: dict, language: str, ai_services: AIServices, data_manager: DataManager,
+                        lang_manager: LanguageManager, use_ai_tips: bool = False):
+    """Generate the study calendar, optionally with AI-written study tips"""
     
-    with st.spinner(lang_manager.get_text('loading', language)):
-        study_plan = ai_services.generate_study_plan(user_data, language)
+    study_plan = build_local_plan(user_data, language, data_manager)
     
-    if study_plan:
-        st.session_state.study_plan = study_plan
-        st.success("Study plan generated successfully!" if language == 'en' 
-                  else "अध्ययन योजना सफलतापूर्वक तैयार की गई!")
-        st.rerun()
-    else:
-        st.error("Failed to generate study plan. Please try again." if language == 'en'
-                else "अध्ययन योजना बनाने में असफल। कृपया पुनः प्रयास करें।")
+    if use_ai_tips:
+        with st.spinner(lang_manager.get_text('loading', language)):
+            # Served from the study plan cache when the profile inputs are unchanged
+            ai_plan = ai_services.generate_study_plan(user_data, language)
+        if ai_plan and ai_plan.get('study_tips') and ai_plan.get('fingerprint'):
+            study_plan['study_tips'] = ai_plan['study_tips']
+            study_plan['tips_fingerprint'] = ai_plan['fingerprint']
+    
+    data_manager.save_study_plan(study_plan)
+    st.success("Study plan generated successfully!" if language == 'en' 
+              else "अध्ययन योजना सफलतापूर्वक तैयार की गई!")
+    st.rerun()
+
+def refresh_study_plan_if_stale(user_data: dict, language: str, data_manager: DataManager):
+    """Rebuild the calendar when its inputs changed (it takes milliseconds), keeping any AI tips"""
+    
+    study_plan = st.session_state.get('study_plan')
+    if not study_plan:
+        return
+    
+    if not study_plan.get('days'):
+        st.info("Generate a new plan to get a day-by-day calendar up to your exam." if language == 'en'
+               else "परीक्षा तक दिन-प्रतिदिन का कैलेंडर पाने के लिए नई योजना बनाएं।")
+        return
+    
+    stats = data_manager.get_user_stats()
+    key = schedule_key(user_data['exam_type'], user_data.get('target_date'), user_data.get('study_hours_per_day', 2),
+                       language, stats['weak_topics'], stats['strong_topics'])
+    if study_plan.get('schedule_key') == key:
+        return
+    
+    new_plan = build_local_plan(user_data, language, data_manager)
+    if study_plan.get('tips_fingerprint'):
+        new_plan['study_tips'] = study_plan['study_tips']
+        new_plan['tips_fingerprint'] = study_plan['tips_fingerprint']
+    data_manager.save_study_plan(new_plan)
 
 def display_study_plan(study_plan: dict, language: str, lang_manager: LanguageManager):
     """Display the generated study plan"""
     
     st.markdown("---")
     
+    # Today's row of the calendar, or the single schedule of older AI-generated plans
+    today = datetime.now().date().isoformat()
+    todays = next((day for day in study_plan.get('days', []) if day['date'] == today), None)
+    schedule = daily_schedule(todays, language) if todays else study_plan.get('daily_schedule')
+    
     # Daily Schedule
-    if study_plan.get('daily_schedule'):
+    if schedule:
         st.markdown(f"### 📅 {lang_manager.get_text('daily_schedule', language)}")
         
         # Create dataframe for better display
         schedule_data = []
-        for item in study_plan['daily_schedule']:
+        for item in schedule:
             schedule_data.append({
                 lang_manager.get_text('time_slot', language): item.get('time_slot', ''),
                 lang_manager.get_text('subject', language): item.get('subject', ''),
@@ -87,9 +147,9 @@ def display_study_plan(study_plan: dict, language: str, lang_manager: LanguageMa
         st.markdown("#### 📊 Study Timeline")
         col1, col2, col3 = st.columns(3)
         
-        morning_tasks = [item for item in study_plan['daily_schedule'] if 'morning' in item.get('time_slot', '').lower()]
-        afternoon_tasks = [item for item in study_plan['daily_schedule'] if 'afternoon' in item.get('time_slot', '').lower()]
-        evening_tasks = [item for item in study_plan['daily_schedule'] if 'evening' in item.get('time_slot', '').lower()]
+        morning_tasks = [item for item in schedule if any(k in item.get('time_slot', '').lower() for k in ('morning', 'सुबह'))]
+        afternoon_tasks = [item for item in schedule if any(k in item.get('time_slot', '').lower() for k in ('afternoon', 'दोपहर'))]
+        evening_tasks = [item for item in schedule if any(k in item.get('time_slot', '').lower() for k in ('evening', 'शाम'))]
         
         with col1:
             st.markdown("**🌅 Morning**" if language == 'en' else "**🌅 सुबह**")
@@ -106,6 +166,10 @@ def display_study_plan(study_plan: dict, language: str, lang_manager: LanguageMa
             for task in evening_tasks:
                 st.markdown(f"• {task.get('subject', '')} ({task.get('duration', '')})")
     
+    # Day-by-day calendar up to the exam
+    if study_plan.get('days'):
+        display_study_calendar(study_plan, language)
+    
     # Weekly Goals
     if study_plan.get('weekly_goals'):
         st.markdown(f"### 🎯 {lang_manager.get_text('weekly_goals', language)}")
@@ -140,6 +204,56 @@ def display_study_plan(study_plan: dict, language: str, lang_manager: LanguageMa
         for tip in study_plan['study_tips']:
             st.markdown(f"💡 {tip}")
 
+def display_study_calendar(study_plan: dict, language: str):
+    """Display the upcoming days of the study calendar and the time per topic"""
+    
+    st.markdown("### 🗓️ Study Calendar" if language == 'en' else "### 🗓️ अध्ययन कैलेंडर")
+    
+    day_types = {
+        'study': "Study" if language == 'en' else "अध्ययन",
+        'weekly_review': "Test & Revision" if language == 'en' else "टेस्ट और रिवीजन",
+        'final_revision': "Final Revision" if language == 'en' else "अंतिम रिवीजन"
+    }
+    today = datetime.now().date().isoformat()
+    upcoming = [day for day in study_plan['days'] if day['date'] >= today]
+    
+    rows = [
+        {
+            "Date" if language == 'en' else "तारीख": day['date'],
+            "Type" if language == 'en' else "प्रकार": day_types.get(day['type'], day['type']),
+            "Sessions" if language == 'en' else "सत्र": ", ".join(
+                f"{session['topic']} ({session['minutes']}m)" for session in day['sessions']
+            )
+        }
+        for day in upcoming
+    ]
+    
+    if not rows:
+        st.info("This plan has ended. Generate a new one." if language == 'en' else "यह योजना समाप्त हो गई है। नई योजना बनाएं।")
+        return
+    
+    st.dataframe(pd.DataFrame(rows[:14]), use_container_width=True, hide_index=True)
+    if len(rows) > 14:
+        with st.expander("Full calendar" if language == 'en' else "पूरा कैलेंडर"):
+            st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    
+    topic_hours = pd.DataFrame(
+        [{'topic': topic, 'hours': minutes / 60} for topic, minutes in study_plan.get('topic_minutes', {}).items()]
+    )
+    if not topic_hours.empty:
+        import plotly.express as px
+        
+        fig = px.bar(
+            topic_hours.sort_values('hours'),
+            x='hours',
+            y='topic',
+            orientation='h',
+            title="Planned Hours per Topic" if language == 'en' else "प्रति विषय नियोजित घंटे",
+            color_discrete_sequence=['#FF9933']
+        )
+        fig.update_layout(height=400, xaxis_title=None, yaxis_title=None)
+        st.plotly_chart(fig, use_container_width=True)
+
 def display_study_statistics(data_manager: DataManager, language: str, lang_manager: LanguageManager):
     """Display study statistics and progress tracking"""
     
@@ -0,0 +1,105 @@
+"""Current affairs feed ingestion worker.
+
+Examples:
+    python news_worker.py --db data/app.db               # poll the configured feeds every 15 minutes
+    python news_worker.py --once --feed-dir feeds/       # load saved RSS/Atom files once (no network)
+    python news_worker.py --reindex                      # rebuild the search index from stored articles
+    python news_worker.py --questions                    # also generate quiz questions from new articles (needs OPENAI_API_KEY)
+    python news_worker.py --once --digest                # also build today's digests (once per day, kept thereafter)
+
+Feeds default to PIB; set CA_FEEDS_FILE to a JSON list of {"name", "url", "language"} to change them.
+"""
+import argparse
+import logging
+import sys
+import time
+from typing import List, Optional
+
+from utils.event_store import DEFAULT_DB_PATH
+from utils.news_store import NewsStore, FeedIngestor, INGEST_INTERVAL_SECONDS
+from utils.search_index import SearchIndex
+from utils.ca_questions import CAQuestionBank, CAQuestionGenerator
+from utils.daily_digest import DigestStore, DigestBuilder
+
+logger = logging.getLogger('news_worker')
+
+def run_pass(ingestor: FeedIngestor, generator: Optional[CAQuestionGenerator] = None,
+             digest_builder: Optional[DigestBuilder] = None) -> int:
+    started = time.perf_counter()
+    stats = ingestor.run_once()
+    sys.stderr.write(
+        f"[ingest] {stats['entries']} entries, {stats['new']} new, "
+        f"{len(stats['errors'])} errors in {time.perf_counter() - started:.1f}s\n"
+    )
+    for error in stats['errors']:
+        sys.stderr.write(f"  {error}\n")
+    
+    # A failing follow-up step is logged and retried on the next pass rather than stopping the worker
+    if generator:
+        started = time.perf_counter()
+        try:
+            question_stats = generator.run_once()
+        except Exception:
+            logger.exception("Question generation pass failed")
+        else:
+            sys.stderr.write(
+                f"[questions] {question_stats['questions']} questions from {question_stats['articles']} articles, "
+                f"{len(question_stats['errors'])} failed batches in {time.perf_counter() - started:.1f}s\n"
+            )
+            for error in question_stats['errors']:
+                sys.stderr.write(f"  {error}\n")
+    
+    if digest_builder:
+        try:
+            digest_stats = digest_builder.run()
+        except Exception:
+            logger.exception("Daily digest pass failed")
+        else:
+            sys.stderr.write(
+                f"[digest] {digest_stats['built']} built, {digest_stats['existing']} already built, "
+                f"{digest_stats['empty']} without news, {digest_stats['without_questions']} without a practice set\n"
+            )
+    return 1 if stats['errors'] and not stats['entries'] else 0
+
+def run_reindex(store: NewsStore, index: SearchIndex) -> int:
+    added = sum(index.add_articles(batch) for batch in store.iter_articles())
+    index.optimize()
+    sys.stderr.write(f"[reindex] {added} articles added, {index.count()} documents indexed\n")
+    return 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ingest current affairs RSS/Atom feeds")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite database path")
+    parser.add_argument('--feed-dir', help="Read feed files from this directory instead of the network")
+    parser.add_argument('--once', action='store_true', help="Run a single pass and exit")
+    parser.add_argument('--interval', type=int, default=INGEST_INTERVAL_SECONDS, help="Seconds between passes")
+    parser.add_argument('--reindex', action='store_true', help="Index stored articles missing from the search index and exit")
+    parser.add_argument('--questions', action='store_true', help="Generate quiz questions from new articles after each pass")
+    parser.add_argument('--digest', action='store_true', help="Build today's missing daily digests after each pass")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    
+    store, index = NewsStore(args.db), SearchIndex(args.db)
+    if args.reindex:
+        return run_reindex(store, index)
+    
+    ingestor = FeedIngestor(store, feed_dir=args.feed_dir, search_index=index)
+    bank = CAQuestionBank(args.db)
+    generator = digest_builder = None
+    if args.questions:
+        from utils.ai_services import AIServices
+        generator = CAQuestionGenerator(store, bank, AIServices(), index)
+    if args.digest:
+        digest_builder = DigestBuilder(store, bank, DigestStore(args.db), index)
+    if args.once:
+        return run_pass(ingestor, generator, digest_builder)
+    
+    while True:
+        try:
+            run_pass(ingestor, generator, digest_builder)
+        except Exception:
+            logger.exception("Ingestion pass failed")
+        time.sleep(args.interval)
+
+if __name__ == '__main__':
+    sys.exit(main())
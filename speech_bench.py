@@ -0,0 +1,54 @@
+"""Speech-to-text real-time factor benchmark on CPU.
+
+Examples:
+    python speech_bench.py answer.wav                            # one clip with the default model
+    python speech_bench.py clips/*.wav --model small --workers 4  # concurrent clips, as under load
+    python speech_bench.py answer_hi.wav --language hi
+
+A real-time factor below 1 means audio is transcribed faster than it was spoken. Needs faster-whisper.
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from utils.speech import SpeechTranscriber, speech_available, benchmark, DEFAULT_MODEL, DEFAULT_WORKERS, CHUNK_SECONDS
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the real-time factor of local speech-to-text")
+    parser.add_argument('audio', nargs='+', help="Audio files to transcribe")
+    parser.add_argument('--model', default=DEFAULT_MODEL, help="Speech model size or path")
+    parser.add_argument('--compute-type', default='int8', help="Model precision, e.g. int8 or float32")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Concurrent transcriptions")
+    parser.add_argument('--threads', type=int, default=0, help="CPU threads per transcription (0 = library default)")
+    parser.add_argument('--chunk-seconds', type=float, default=CHUNK_SECONDS, help="Streaming chunk length")
+    parser.add_argument('--language', default='en', choices=['en', 'hi'])
+    args = parser.parse_args(argv)
+    
+    if not speech_available():
+        sys.stderr.write("faster-whisper is not installed\n")
+        return 1
+    
+    clips = []
+    for path in args.audio:
+        with open(path, 'rb') as f:
+            clips.append(f.read())
+    
+    transcriber = SpeechTranscriber(args.model, args.compute_type, args.workers, args.threads, args.chunk_seconds)
+    stats = benchmark(transcriber, clips, args.language)
+    for path, clip in zip(args.audio, stats['clips']):
+        if clip['error']:
+            sys.stderr.write(f"{path}: {clip['error']}\n")
+        else:
+            sys.stderr.write(
+                f"{path}: {clip['audio_seconds']:.1f}s audio, {clip['chunks']} chunks, "
+                f"RTF {clip['real_time_factor']:.2f}\n"
+            )
+    if stats['real_time_factor'] is not None:
+        sys.stderr.write(
+            f"[bench] {stats['audio_seconds']:.1f}s audio in {stats['seconds']:.1f}s with {args.workers} workers, "
+            f"overall RTF {stats['real_time_factor']:.2f}\n"
+        )
+    return 1 if any(clip['error'] for clip in stats['clips']) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+from bisect import bisect_right
+from typing import Dict, List, Any, Iterable, Optional, Set
+
+from utils.event_store import (
+    QUIZ_COMPLETED, INTERVIEW_COMPLETED, MOCK_EXAM_COMPLETED, CURRENT_AFFAIRS_COMPLETED, ACTIVITY_RECORDED,
+    STATE_IMPORTED
+)
+
+# Declarative badge table: a badge is awarded once `counter` reaches `threshold`.
+# Adding a badge is one row here; saves only look at rules for the counters they changed.
+ACHIEVEMENT_RULES = [
+    {'badge': "⭐ Rising Star", 'counter': 'total_points', 'threshold': 500, 'description': "500+ points"},
+    {'badge': "🏆 Point Master", 'counter': 'total_points', 'threshold': 1000, 'description': "1000+ points"},
+    {'badge': "💎 Point Legend", 'counter': 'total_points', 'threshold': 5000, 'description': "5000+ points"},
+    {'badge': "🎯 Dedicated Learner", 'counter': 'quizzes_completed', 'threshold': 10, 'description': "10+ quizzes"},
+    {'badge': "📚 Quiz Master", 'counter': 'quizzes_completed', 'threshold': 50, 'description': "50+ quizzes"},
+    {'badge': "🎓 Quiz Centurion", 'counter': 'quizzes_completed', 'threshold': 100, 'description': "100+ quizzes"},
+    {'badge': "💯 Perfectionist", 'counter': 'perfect_scores', 'threshold': 5, 'description': "5 perfect scores"},
+    {'badge': "🔥 Week Warrior", 'counter': 'study_streak', 'threshold': 7, 'description': "7-day streak"},
+    {'badge': "🌙 Month Marathoner", 'counter': 'study_streak', 'threshold': 30, 'description': "30-day streak"},
+    {'badge': "🎙️ Interview Ready", 'counter': 'interviews_completed', 'threshold': 5, 'description': "5 mock interviews"},
+    {'badge': "📰 News Hound", 'counter': 'current_affairs_quizzes', 'threshold': 10,
+     'description': "10 current affairs quizzes"}
+]
+
+# Counters each event type can change
+EVENT_COUNTERS = {
+    QUIZ_COMPLETED: ['total_points', 'quizzes_completed', 'perfect_scores', 'study_streak'],
+    INTERVIEW_COMPLETED: ['total_points', 'interviews_completed', 'study_streak'],
+    MOCK_EXAM_COMPLETED: ['total_points', 'study_streak'],
+    CURRENT_AFFAIRS_COMPLETED: ['total_points', 'current_affairs_quizzes', 'study_streak'],
+    ACTIVITY_RECORDED: ['study_streak'],
+    STATE_IMPORTED: None  # everything
+}
+
+# How to read each counter from user_data
+COUNTER_GETTERS = {
+    'total_points': lambda user_data: user_data.get('total_points', 0),
+    'quizzes_completed': lambda user_data: len(user_data.get('quiz_scores', [])),
+    'perfect_scores': lambda user_data: user_data.get('counters', {}).get('perfect_scores', 0),
+    'study_streak': lambda user_data: user_data.get('study_streaks', 0),
+    'interviews_completed': lambda user_data: len(user_data.get('interview_scores', [])),
+    'current_affairs_quizzes': lambda user_data: user_data.get('counters', {}).get('current_affairs_quizzes', 0)
+}
+
+def _index_rules(rules: List[Dict[str, Any]]) -> Dict[str, Dict[str, list]]:
+    """Group rules by counter, sorted by threshold, with a parallel threshold list for bisect"""
+    index = {}
+    for rule in sorted(rules, key=lambda r: r['threshold']):
+        entry = index.setdefault(rule['counter'], {'rules': [], 'thresholds': []})
+        entry['rules'].append(rule)
+        entry['thresholds'].append(rule['threshold'])
+    return index
+
+class AchievementEngine:
+    """Evaluates the badge rule table against the counters changed by an event"""
+    
+    def __init__(self, rules: List[Dict[str, Any]] = None):
+        self.rules = rules if rules is not None else ACHIEVEMENT_RULES
+        self.index = _index_rules(self.rules)
+    
+    def changed_counters(self, event_type: str) -> Iterable[str]:
+        """Counters that an event type may have changed"""
+        counters = EVENT_COUNTERS.get(event_type, [])
+        return self.index.keys() if counters is None else counters
+    
+    def evaluate(self, user_data: Dict[str, Any], changed: Iterable[str], awarded: Set[str],
+                 cursors: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
+        """Rules newly satisfied for the changed counters.
+
+        Per counter, a cursor remembers how many thresholds were already passed, so each check is a
+        bisect over that counter's thresholds plus the newly passed rules. The caller keeps `cursors`
+        (updated in place); they are an optimisation only, since `awarded` already prevents repeats.
+        """
+        cursors = cursors if cursors is not None else {}
+        unlocked = []
+        
+        for counter in changed:
+            entry = self.index.get(counter)
+            if not entry:
+                continue
+            
+            value = COUNTER_GETTERS[counter](user_data)
+            passed = bisect_right(entry['thresholds'], value)
+            start = cursors.get(counter, 0)
+            if passed <= start:
+                continue
+            
+            # Counters like the streak can drop again; the cursor only moves forward
+            cursors[counter] = passed
+            for rule in entry['rules'][start:passed]:
+                if rule['badge'] not in awarded:
+                    unlocked.append(rule)
+        
+        return unlocked
+    
+    def get_progress(self, user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Next locked rule and progress towards it for every counter"""
+        progress = []
+        for counter, entry in self.index.items():
+            value = COUNTER_GETTERS[counter](user_data)
+            passed = bisect_right(entry['thresholds'], value)
+            if passed < len(entry['rules']):
+                rule = entry['rules'][passed]
+                progress.append({
+                    'badge': rule['badge'],
+                    'description': rule['description'],
+                    'current': value,
+                    'threshold': rule['threshold'],
+                    'progress': min(value / rule['threshold'], 1.0)
+                })
+        return progress
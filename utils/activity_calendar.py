@@ -0,0 +1,146 @@
+import streamlit as st
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+class ActivityCalendar:
+    """Per-user activity calendar stored as one bit per day for each activity kind"""
+    
+    KINDS = ['quiz', 'interview', 'current_affairs']
+    # Union of all kinds, used for the overall study streak
+    ANY = 'any'
+    
+    def __init__(self, user_data: Optional[Dict] = None):
+        self.user_data = user_data if user_data is not None else st.session_state.user_data
+        self.initialize_session_state()
+    
+    def initialize_session_state(self):
+        """Initialize the calendar inside user_data if it doesn't exist"""
+        user_data = self.user_data
+        if 'activity_calendar' not in user_data:
+            user_data['activity_calendar'] = {
+                'start': None,
+                'bits': {kind: 0 for kind in self.KINDS + [self.ANY]},
+                'streaks': {kind: 0 for kind in self.KINDS + [self.ANY]},
+                'longest': {kind: 0 for kind in self.KINDS + [self.ANY]}
+            }
+        self.calendar = user_data['activity_calendar']
+    
+    def mark(self, kind: str, day: Optional[date] = None) -> int:
+        """Record activity of `kind` on `day` and return the updated streak for that kind"""
+        day = day or datetime.now().date()
+        for key in (kind, self.ANY):
+            self._mark_one(key, day)
+        
+        self.user_data['study_streaks'] = self.calendar['streaks'][self.ANY]
+        self.user_data['last_activity'] = day.isoformat()
+        return self.calendar['streaks'][kind]
+    
+    def is_active(self, day: date, kind: str = ANY) -> bool:
+        """Whether there was activity of `kind` on `day`"""
+        offset = self._offset(day)
+        return offset is not None and offset >= 0 and bool(self.calendar['bits'].get(kind, 0) >> offset & 1)
+    
+    def current_streak(self, kind: str = ANY, today: Optional[date] = None) -> int:
+        """Current streak; zero once a full day has been missed"""
+        today = today or datetime.now().date()
+        if self.is_active(today, kind) or self.is_active(today - timedelta(days=1), kind):
+            return self.calendar['streaks'].get(kind, 0)
+        return 0
+    
+    def longest_streak(self, kind: str = ANY) -> int:
+        """Longest run of consecutive active days"""
+        return self.calendar['longest'].get(kind, 0)
+    
+    def recompute_longest_streak(self, kind: str = ANY) -> int:
+        """Recompute the longest run from the bitmap (one shift-and per day of the longest run)"""
+        bits = self.calendar['bits'].get(kind, 0)
+        longest = 0
+        while bits:
+            bits &= bits << 1
+            longest += 1
+        self.calendar['longest'][kind] = longest
+        return longest
+    
+    def active_days(self, kind: str = ANY) -> int:
+        """Total number of days with activity"""
+        return bin(self.calendar['bits'].get(kind, 0)).count('1')
+    
+    def get_heatmap(self, start: date, end: date, kind: str = ANY) -> List[int]:
+        """0/1 activity flags for every day from `start` to `end` inclusive"""
+        num_days = (end - start).days + 1
+        if num_days <= 0:
+            return []
+        
+        offset = self._offset(start)
+        if offset is None:
+            return [0] * num_days
+        
+        bits = self.calendar['bits'].get(kind, 0)
+        # Days before the calendar start have no bits
+        window = bits >> offset if offset >= 0 else bits << -offset
+        window &= (1 << num_days) - 1
+        return [window >> i & 1 for i in range(num_days)]
+    
+    def get_summary(self) -> Dict[str, Dict[str, int]]:
+        """Current and longest streaks and active day counts for every kind"""
+        return {
+            kind: {
+                'current_streak': self.current_streak(kind),
+                'longest_streak': self.longest_streak(kind),
+                'active_days': self.active_days(kind)
+            }
+            for kind in self.KINDS + [self.ANY]
+        }
+    
+    def _mark_one(self, kind: str, day: date):
+        """Set the bit for `day` and update the running streak in O(1)"""
+        if self.calendar['start'] is None:
+            self.calendar['start'] = day.isoformat()
+        
+        offset = self._offset(day)
+        if offset < 0:
+            self._rebase(day)
+            offset = 0
+        
+        bits = self.calendar['bits'].get(kind, 0)
+        if bits >> offset & 1:
+            return
+        
+        bits |= 1 << offset
+        self.calendar['bits'][kind] = bits
+        
+        if bits >> (offset + 1):
+            # Back-filled day: streaks may have merged, so recount from the bitmap
+            self.calendar['streaks'][kind] = self._trailing_run(bits)
+            self.recompute_longest_streak(kind)
+            return
+        
+        if offset > 0 and bits >> (offset - 1) & 1:
+            self.calendar['streaks'][kind] = self.calendar['streaks'].get(kind, 0) + 1
+        else:
+            self.calendar['streaks'][kind] = 1
+        
+        if self.calendar['streaks'][kind] > self.calendar['longest'].get(kind, 0):
+            self.calendar['longest'][kind] = self.calendar['streaks'][kind]
+    
+    @staticmethod
+    def _trailing_run(bits: int) -> int:
+        """Length of the run of set bits ending at the most significant bit"""
+        top = bits.bit_length() - 1
+        run = 0
+        while top - run >= 0 and bits >> (top - run) & 1:
+            run += 1
+        return run
+    
+    def _rebase(self, day: date):
+        """Move the calendar start back to `day`, shifting every bitmap"""
+        shift = -self._offset(day)
+        for kind, bits in self.calendar['bits'].items():
+            self.calendar['bits'][kind] = bits << shift
+        self.calendar['start'] = day.isoformat()
+    
+    def _offset(self, day: date) -> Optional[int]:
+        """Bit position of `day` relative to the calendar start"""
+        if self.calendar['start'] is None:
+            return None
+        return (day - date.fromisoformat(self.calendar['start'])).days
@@ -0,0 +1,187 @@
+import streamlit as st
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+import hashlib
+import math
+import random
+
+import numpy as np
+
+from utils.adaptive_store import AdaptiveStore, get_adaptive_store
+from utils.data_manager import DataManager
+from utils.search_index import SearchIndex, get_search_index
+
+class AdaptiveEngine:
+    """Elo/IRT-style ability estimation and question selection from a persistent question bank"""
+    
+    # Learning rates for the incremental (Elo-style) updates
+    ABILITY_K = 0.4
+    ITEM_K = 0.1
+    # Assemble quizzes so the user is expected to answer ~70% correctly
+    TARGET_SUCCESS = 0.7
+    # Number of most recently answered questions to keep out of new quizzes
+    RECENT_WINDOW = 50
+    
+    def __init__(self, data_manager: Optional[DataManager] = None, store: Optional[AdaptiveStore] = None,
+                 search_index: Optional[SearchIndex] = None):
+        # Ability estimates are saved through the data manager's event log; items and responses in the store
+        self.data_manager = data_manager or DataManager()
+        self.store = store or get_adaptive_store()
+        self.search_index = search_index or get_search_index()
+    
+    @property
+    def user_id(self) -> str:
+        return st.session_state.user_id
+    
+    @staticmethod
+    def question_id(question: Dict) -> str:
+        """Stable id for a question derived from its text and options"""
+        key = question.get('question', '') + '|' + '|'.join(str(o) for o in question.get('options', []))
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    
+    @staticmethod
+    def level_to_logit(level: int) -> float:
+        """Map the 1-5 difficulty slider onto the logit scale"""
+        return (level - 3) * 0.8
+    
+    @staticmethod
+    def logit_to_level(value: float) -> int:
+        """Map a logit-scale difficulty or ability back onto the 1-5 slider"""
+        return int(min(5, max(1, round(value / 0.8 + 3))))
+    
+    @staticmethod
+    def _expected(ability: float, difficulty: float) -> float:
+        """Rasch model probability of a correct answer"""
+        return 1.0 / (1.0 + math.exp(difficulty - ability))
+    
+    def add_questions(self, questions: List[Dict], topic: str, difficulty: int, language: str) -> List[str]:
+        """Add generated questions to the bank and return their ids"""
+        items, ids = [], []
+        
+        for question in questions:
+            qid = self.question_id(question)
+            items.append({
+                **question,
+                'id': qid,
+                'topic': topic,
+                'language': language,
+                'level': difficulty,
+                'b': self.level_to_logit(question.get('difficulty', difficulty))
+            })
+            question['id'] = qid
+            ids.append(qid)
+        
+        self.store.add_items(items)
+        return ids
+    
+    def response_log(self) -> List[Dict[str, Any]]:
+        """The user's answers, oldest first"""
+        return self.store.responses(self.user_id)
+    
+    def get_ability(self, topic: str) -> float:
+        """Current ability estimate for a topic (logit scale, 0 = average)"""
+        return st.session_state.user_data.get('ability', {}).get(topic, 0.0)
+    
+    def _target(self, topic: str) -> float:
+        return self.get_ability(topic) - math.log(self.TARGET_SUCCESS / (1 - self.TARGET_SUCCESS))
+    
+    def get_recommended_difficulty(self, topic: str) -> int:
+        """Difficulty level (1-5) matching the user's estimated ability"""
+        return self.logit_to_level(self._target(topic))
+    
+    def record_response(self, question: Dict, topic: str, is_correct: bool) -> float:
+        """Log a single answer and update ability and item difficulty incrementally"""
+        qid = question.get('id') or self.question_id(question)
+        item = self.store.get_item(qid)
+        
+        ability = self.get_ability(topic)
+        difficulty = item['b'] if item else self.level_to_logit(question.get('difficulty', 3))
+        expected = self._expected(ability, difficulty)
+        outcome = 1.0 if is_correct else 0.0
+        
+        self.store.add_responses(self.user_id, [{
+            'question_id': qid,
+            'topic': topic,
+            'is_correct': is_correct,
+            'ability': ability,
+            'difficulty': difficulty,
+            'date': datetime.now().isoformat()
+        }])
+        
+        new_ability = ability + self.ABILITY_K * (outcome - expected)
+        self.data_manager.save_ability(topic, new_ability)
+        
+        if item:
+            self.store.update_item(qid, -self.ITEM_K * (outcome - expected), is_correct)
+        
+        return new_ability
+    
+    def recalibrate_items(self, topic: str, iterations: int = 20, learning_rate: float = 0.5):
+        """Re-estimate a topic's item difficulties from its newest responses (all users) in one vectorized pass"""
+        rows = self.store.calibration_data(topic)
+        if not rows:
+            return
+        
+        item_ids = sorted({row[0] for row in rows})
+        index = {qid: i for i, qid in enumerate(item_ids)}
+        current = {row[0]: row[3] for row in rows}
+        
+        item_idx = np.fromiter((index[r[0]] for r in rows), dtype=np.int64, count=len(rows))
+        abilities = np.fromiter((r[1] for r in rows), dtype=np.float64, count=len(rows))
+        outcomes = np.fromiter((r[2] for r in rows), dtype=np.float64, count=len(rows))
+        b = np.array([current[qid] for qid in item_ids], dtype=np.float64)
+        counts = np.bincount(item_idx, minlength=len(item_ids))
+        
+        for _ in range(iterations):
+            expected = 1.0 / (1.0 + np.exp(b[item_idx] - abilities))
+            # Gradient of the log-likelihood w.r.t. each item difficulty
+            grad = np.bincount(item_idx, weights=expected - outcomes, minlength=len(item_ids))
+            b += learning_rate * grad / counts
+        
+        np.clip(b, -4.0, 4.0, out=b)
+        self.store.set_difficulties({qid: float(value) for qid, value in zip(item_ids, b)})
+    
+    def assemble_quiz(self, topic: str, num_questions: int, language: str) -> List[Dict]:
+        """Up to `num_questions` bank questions whose difficulty best matches the user's ability.
+        
+        When the bank is short, questions generated earlier (by any user) are pulled in from the search
+        index first, so the caller only needs to generate the questions still missing.
+        """
+        target = self._target(topic)
+        # Twice as many candidates as needed, so the jitter below has room to vary the pick
+        candidates = self.store.candidates(self.user_id, topic, language, target, num_questions * 2, self.RECENT_WINDOW)
+        if len(candidates) < num_questions:
+            indexed = self.search_index.question_pool(topic, language, (num_questions - len(candidates)) * 2)
+            if self._bank_indexed_questions(indexed, topic, language):
+                candidates = self.store.candidates(self.user_id, topic, language, target, num_questions * 2,
+                                                   self.RECENT_WINDOW)
+        
+        # Small jitter so equally-suited questions don't always come out in the same order
+        candidates.sort(key=lambda item: abs(item['b'] - target) + random.uniform(0, 0.2))
+        return candidates[:num_questions]
+    
+    def _bank_indexed_questions(self, questions: List[Dict], topic: str, language: str) -> int:
+        """Bank search index questions, keeping their own difficulty; returns the number new to the bank"""
+        items = []
+        for question in questions:
+            question = {key: value for key, value in question.items() if key != 'ref'}
+            level = int(question.get('difficulty') or 3)
+            items.append({**question, 'id': self.question_id(question), 'topic': topic, 'language': language,
+                          'level': level, 'b': self.level_to_logit(level)})
+        return self.store.add_items(items)
+    
+    def get_topic_bank_size(self, topic: str, language: Optional[str] = None) -> int:
+        """Number of banked questions for a topic"""
+        return self.store.bank_size(topic, language)
+    
+    def get_response_stats(self, topic: str) -> Dict[str, Any]:
+        """Per-question response statistics for a topic"""
+        responses = self.store.responses(self.user_id, topic)
+        correct = sum(1 for r in responses if r['is_correct'])
+        
+        return {
+            'responses': len(responses),
+            'accuracy': (correct / len(responses)) * 100 if responses else 0,
+            'ability': self.get_ability(topic),
+            'recommended_difficulty': self.get_recommended_difficulty(topic)
+        }
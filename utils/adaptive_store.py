@@ -0,0 +1,164 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Any, Iterable, Optional
+
+from utils.event_store import DEFAULT_DB_PATH
+
+# Calibration only looks at this many of the newest responses per topic, which keeps it bounded
+CALIBRATION_WINDOW = 5000
+
+class AdaptiveStore:
+    """Question bank and per-user response log for the adaptive engine, backed by SQLite.
+
+    Items and their difficulty estimates are shared by all users, so every answer calibrates the bank
+    for everyone; responses are kept per user.
+    """
+    
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        if db_path != ':memory:' and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS adaptive_items (
+                    id TEXT PRIMARY KEY,
+                    topic TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    level INTEGER NOT NULL,
+                    b REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    correct INTEGER NOT NULL DEFAULT 0,
+                    payload TEXT NOT NULL
+                )
+            """)
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_adaptive_items_topic ON adaptive_items (topic, language, b)')
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS adaptive_responses (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    question_id TEXT NOT NULL,
+                    topic TEXT NOT NULL,
+                    is_correct INTEGER NOT NULL,
+                    ability REAL NOT NULL,
+                    difficulty REAL NOT NULL,
+                    date TEXT NOT NULL,
+                    UNIQUE (user_id, question_id, date)
+                )
+            """)
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_adaptive_responses_user ON adaptive_responses (user_id, seq)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_adaptive_responses_topic ON adaptive_responses (topic, seq)')
+    
+    @staticmethod
+    def _item(row) -> Dict[str, Any]:
+        qid, topic, language, level, b, attempts, correct, payload = row
+        return {**json.loads(payload), 'id': qid, 'topic': topic, 'language': language, 'level': level, 'b': b,
+                'attempts': attempts, 'correct': correct}
+    
+    def add_items(self, items: Iterable[Dict[str, Any]]) -> int:
+        """Add items (dicts with id, topic, language, level, b and the question fields); known ids are skipped"""
+        rows = []
+        for item in items:
+            payload = {key: value for key, value in item.items()
+                       if key not in ('id', 'topic', 'language', 'level', 'b', 'attempts', 'correct')}
+            rows.append((item['id'], item['topic'], item['language'], item['level'], item['b'],
+                         json.dumps(payload, ensure_ascii=False)))
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO adaptive_items (id, topic, language, level, b, payload) VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            return self.conn.total_changes - before
+    
+    def get_item(self, qid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT id, topic, language, level, b, attempts, correct, payload FROM adaptive_items WHERE id = ?',
+                (qid,)
+            ).fetchone()
+        return self._item(row) if row else None
+    
+    def update_item(self, qid: str, delta_b: float, is_correct: bool):
+        """Move an item's difficulty by `delta_b` and count the attempt"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                'UPDATE adaptive_items SET b = b + ?, attempts = attempts + 1, correct = correct + ? WHERE id = ?',
+                (delta_b, int(is_correct), qid)
+            )
+    
+    def set_difficulties(self, difficulties: Dict[str, float]):
+        with self._lock, self.conn:
+            self.conn.executemany('UPDATE adaptive_items SET b = ? WHERE id = ?',
+                                  [(b, qid) for qid, b in difficulties.items()])
+    
+    def candidates(self, user_id: str, topic: str, language: str, target: float, limit: int,
+                   recent_window: int) -> List[Dict[str, Any]]:
+        """Items closest to `target` difficulty, leaving out the user's `recent_window` latest answers"""
+        with self._lock:
+            rows = self.conn.execute("""
+                SELECT id, topic, language, level, b, attempts, correct, payload FROM adaptive_items
+                WHERE topic = ? AND language = ? AND id NOT IN (
+                    SELECT question_id FROM adaptive_responses WHERE user_id = ? ORDER BY seq DESC LIMIT ?
+                )
+                ORDER BY ABS(b - ?) LIMIT ?
+            """, (topic, language, user_id, recent_window, target, limit)).fetchall()
+        return [self._item(row) for row in rows]
+    
+    def bank_size(self, topic: str, language: Optional[str] = None) -> int:
+        with self._lock:
+            if language is None:
+                return self.conn.execute('SELECT COUNT(*) FROM adaptive_items WHERE topic = ?', (topic,)).fetchone()[0]
+            return self.conn.execute('SELECT COUNT(*) FROM adaptive_items WHERE topic = ? AND language = ?',
+                                     (topic, language)).fetchone()[0]
+    
+    def add_responses(self, user_id: str, responses: Iterable[Dict[str, Any]]) -> int:
+        """Log answers; an answer already logged (same question and time) is skipped. Returns the number added."""
+        rows = [(user_id, r['question_id'], r['topic'], int(r['is_correct']), r.get('ability', 0.0),
+                 r.get('difficulty', 0.0), r['date']) for r in responses]
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO adaptive_responses (user_id, question_id, topic, is_correct, ability, difficulty, date) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            return self.conn.total_changes - before
+    
+    def responses(self, user_id: str, topic: Optional[str] = None) -> List[Dict[str, Any]]:
+        """A user's answers, oldest first"""
+        query = 'SELECT question_id, topic, is_correct, ability, difficulty, date FROM adaptive_responses WHERE user_id = ?'
+        params: List[Any] = [user_id]
+        if topic is not None:
+            query += ' AND topic = ?'
+            params.append(topic)
+        with self._lock:
+            rows = self.conn.execute(query + ' ORDER BY seq', params).fetchall()
+        return [{'question_id': r[0], 'topic': r[1], 'is_correct': bool(r[2]), 'ability': r[3], 'difficulty': r[4],
+                 'date': r[5]} for r in rows]
+    
+    def calibration_data(self, topic: str) -> List[tuple]:
+        """(question_id, ability, is_correct, b) for the newest responses on a topic, across all users"""
+        with self._lock:
+            return self.conn.execute("""
+                SELECT r.question_id, r.ability, r.is_correct, i.b
+                FROM (SELECT question_id, ability, is_correct FROM adaptive_responses
+                      WHERE topic = ? ORDER BY seq DESC LIMIT ?) r
+                JOIN adaptive_items i ON i.id = r.question_id
+            """, (topic, CALIBRATION_WINDOW)).fetchall()
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def get_adaptive_store() -> AdaptiveStore:
+    """Process-wide adaptive question bank and response log"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = AdaptiveStore()
+        return _default_store
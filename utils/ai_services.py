@@ -2,20 +2,62 @@ import json
 import os
 from openai import OpenAI
 import streamlit as st
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import random
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from utils.plan_cache import StudyPlanCache, get_study_plan_cache, study_plan_inputs, study_plan_fingerprint
+from utils.search_index import SearchIndex, get_search_index
+from utils.answer_scorer import score_answer
+from utils.rate_limiter import RateLimiter, RateLimitExceeded, estimate_tokens, get_rate_limiter
+
+MODEL = "gpt-4o"  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
+
+def _current_user_id() -> Optional[str]:
+    """The signed-in user of the calling script run; None on background threads (workers, pool fillers)"""
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return None
+    return st.session_state.get('user_id')
 
 class AIServices:
-    def __init__(self):
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None):
+        self.rate_limiter = rate_limiter or get_rate_limiter()
         self.api_key = os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             st.error("OpenAI API key not found. Please set OPENAI_API_KEY environment variable.")
         self.client = OpenAI(api_key=self.api_key) if self.api_key else None
     
-    def generate_quiz_questions(self, topic: str, difficulty: int, language: str = 'en', num_questions: int = 5) -> List[Dict]:
-        """Generate quiz questions using OpenAI API"""
+    def _chat(self, messages: List[Dict[str, str]], temperature: float, max_output_tokens: int) -> Dict:
+        """One JSON-mode completion, charged to the caller's user, institute and global budgets.
+
+        Reserves the prompt size plus max_output_tokens up front, then settles to the reported usage.
+        Raises RateLimitExceeded when a budget is used up.
+        """
+        user_id = _current_user_id()
+        reserved = self.rate_limiter.acquire(
+            user_id, sum(estimate_tokens(message['content']) for message in messages) + max_output_tokens
+        )
+        try:
+            response = self.client.chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                response_format={"type": "json_object"},
+                temperature=temperature,
+                max_tokens=max_output_tokens
+            )
+        except Exception:
+            # Failed calls cost nothing but the request itself
+            self.rate_limiter.settle(user_id, reserved, 0)
+            raise
+        usage = getattr(response, 'usage', None)
+        self.rate_limiter.settle(user_id, reserved, usage.total_tokens if usage else None)
+        return json.loads(response.choices[0].message.content)
+    
+    def generate_quiz_questions(self, topic: str, difficulty: int, language: str = 'en', num_questions: int = 5,
+                                search_index: Optional[SearchIndex] = None) -> List[Dict]:
+        """Generate quiz questions using OpenAI API; generated questions are added to the search index"""
         if not self.client:
-            return self._get_fallback_questions(topic, difficulty, language, num_questions)
+            return self._get_fallback_questions(topic, difficulty, language, num_questions, search_index)
         
         try:
             lang_instruction = "in Hindi (Devanagari script)" if language == 'hi' else "in English"
@@ -42,38 +84,48 @@ class AIServices:
             Make sure all content is culturally appropriate for Indian government exam preparation.
             """
             
-            response = self.client.chat.completions.create(
-                model="gpt-4o",  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
-                messages=[
-                    {"role": "system", "content": "You are an expert in Indian government job preparation and exam content creation."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.7
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            return result.get("questions", [])
+            result = self._chat([
+                {"role": "system", "content": "You are an expert in Indian government job preparation and exam content creation."},
+                {"role": "user", "content": prompt}
+            ], temperature=0.7, max_output_tokens=400 * num_questions + 200)
+            questions = result.get("questions", [])
+            (search_index or get_search_index()).add_questions(questions, topic, language)
+            return questions
             
+        except RateLimitExceeded as e:
+            self._warn_rate_limited(e, language)
+            return self._get_fallback_questions(topic, difficulty, language, num_questions, search_index)
         except Exception as e:
             st.error(f"Error generating quiz questions: {str(e)}")
-            return self._get_fallback_questions(topic, difficulty, language, num_questions)
+            return self._get_fallback_questions(topic, difficulty, language, num_questions, search_index)
     
-    def generate_study_plan(self, user_data: Dict, language: str = 'en') -> Dict:
-        """Generate personalized study plan using AI"""
+    def generate_study_plan(self, user_data: Dict, language: str = 'en', plan_cache: Optional[StudyPlanCache] = None) -> Dict:
+        """Generate personalized study plan using AI, reusing a cached plan for the same inputs.
+
+        The returned plan carries the `fingerprint` of its inputs; fallback plans have none.
+        """
+        inputs = study_plan_inputs(user_data, language)
+        fingerprint = study_plan_fingerprint(inputs)
+        plan_cache = plan_cache or get_study_plan_cache()
+        
+        cached = plan_cache.get(fingerprint)
+        if cached:
+            return {**cached, 'fingerprint': fingerprint}
+        
         if not self.client:
             return self._get_fallback_study_plan(user_data, language)
         
         try:
             lang_instruction = "in Hindi (Devanagari script)" if language == 'hi' else "in English"
             
+            # The prompt only uses the fingerprinted inputs, so a cached plan matches its key exactly
             prompt = f"""Create a personalized study plan for Indian government job exam preparation {lang_instruction}.
             
             User Profile:
-            - Target Exam: {user_data.get('exam_type', 'General')}
-            - Daily Study Hours: {user_data.get('study_hours_per_day', 2)}
-            - Current Performance: {len(user_data.get('quiz_scores', []))} quizzes completed
-            - Average Score: {sum(user_data.get('quiz_scores', [0]))/max(len(user_data.get('quiz_scores', [1])), 1):.1f}%
+            - Target Exam: {inputs['exam_type']}
+            - Daily Study Hours: {inputs['study_hours_per_day']}
+            - Current Performance: {inputs['quiz_count']} quizzes completed
+            - Average Score: {inputs['average_score']}
             
             Return a JSON object with this structure:
             {{
@@ -104,35 +156,35 @@ class AIServices:
             }}
             """
             
-            response = self.client.chat.completions.create(
-                model="gpt-4o",  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
-                messages=[
-                    {"role": "system", "content": "You are an expert study planner for Indian government job preparation."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.7
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            return result
+            result = self._chat([
+                {"role": "system", "content": "You are an expert study planner for Indian government job preparation."},
+                {"role": "user", "content": prompt}
+            ], temperature=0.7, max_output_tokens=1500)
+            plan_cache.put(fingerprint, inputs, result)
+            return {**result, 'fingerprint': fingerprint}
             
+        except RateLimitExceeded as e:
+            self._warn_rate_limited(e, language)
+            return self._get_fallback_study_plan(user_data, language)
         except Exception as e:
             st.error(f"Error generating study plan: {str(e)}")
             return self._get_fallback_study_plan(user_data, language)
     
-    def conduct_mock_interview(self, question: str, user_answer: str, language: str = 'en') -> Dict:
+    def conduct_mock_interview(self, question: str, user_answer: str, language: str = 'en', topic: str = '',
+                               key_points: Optional[List[str]] = None) -> Dict:
         """Evaluate mock interview responses"""
         if not self.client:
-            return self._get_fallback_interview_feedback(question, user_answer, language)
+            return self._get_fallback_interview_feedback(question, user_answer, language, topic, key_points)
         
         try:
             lang_instruction = "in Hindi (Devanagari script)" if language == 'hi' else "in English"
+            points_line = f"Points a strong answer covers: {'; '.join(key_points)}" if key_points else ""
             
             prompt = f"""Evaluate this mock interview response for Indian government job interview {lang_instruction}.
             
             Question: {question}
             Candidate's Answer: {user_answer}
+            {points_line}
             
             Provide detailed feedback as JSON:
             {{
@@ -146,70 +198,104 @@ class AIServices:
             Score should be out of 100. Focus on Indian government service context.
             """
             
-            response = self.client.chat.completions.create(
-                model="gpt-4o",  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
-                messages=[
-                    {"role": "system", "content": "You are an expert interviewer for Indian government job positions."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.6
-            )
-            
-            result = json.loads(response.choices[0].message.content)
+            result = self._chat([
+                {"role": "system", "content": "You are an expert interviewer for Indian government job positions."},
+                {"role": "user", "content": prompt}
+            ], temperature=0.6, max_output_tokens=800)
             return result
             
+        except RateLimitExceeded as e:
+            self._warn_rate_limited(e, language)
+            return self._get_fallback_interview_feedback(question, user_answer, language, topic, key_points)
         except Exception as e:
             st.error(f"Error evaluating interview response: {str(e)}")
-            return self._get_fallback_interview_feedback(question, user_answer, language)
+            return self._get_fallback_interview_feedback(question, user_answer, language, topic, key_points)
     
-    def generate_current_affairs_questions(self, topic: str, language: str = 'en') -> List[Dict]:
-        """Generate current affairs questions"""
-        if not self.client:
+    def generate_current_affairs_questions(self, articles: List[Dict], language: str = 'en',
+                                           questions_per_article: int = 2) -> List[Dict]:
+        """Generate questions grounded in a batch of stored articles, each tagged with its article id.
+        
+        Raises on API or parsing errors so batch callers can retry the articles later.
+        """
+        if not self.client or not articles:
             return []
         
-        try:
-            lang_instruction = "in Hindi (Devanagari script)" if language == 'hi' else "in English"
-            
-            prompt = f"""Generate 3 current affairs questions related to "{topic}" for Indian government job exams {lang_instruction}.
-            
-            Focus on recent developments in Indian politics, economy, international relations, science & technology,
-            sports, awards, and government schemes that are relevant for competitive exams.
-            
-            Return JSON format:
-            {{
-                "questions": [
-                    {{
-                        "question": "Question text",
-                        "options": ["A", "B", "C", "D"],
-                        "correct_answer": 0,
-                        "explanation": "Why this is correct and current",
-                        "date_relevance": "Month Year or recent timeframe"
-                    }}
-                ]
-            }}
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4o",  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
-                messages=[
-                    {"role": "system", "content": "You are an expert in Indian current affairs and government exam preparation."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.7
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            return result.get("questions", [])
-            
-        except Exception as e:
-            st.error(f"Error generating current affairs questions: {str(e)}")
+        lang_instruction = "in Hindi (Devanagari script)" if language == 'hi' else "in English"
+        article_block = "\n\n".join(
+            f"[{article['id']}] ({article.get('date', '')}) {article['title']}\n{article.get('summary', '')}"
+            for article in articles
+        )
+        
+        prompt = f"""Below are {len(articles)} news articles, each starting with its id in square brackets.
+        For each article, write up to {questions_per_article} multiple choice current affairs questions for Indian
+        government job exams {lang_instruction}, using only facts stated in that article. Skip an article
+        if it has no exam-relevant facts.
+        
+        {article_block}
+        
+        Return JSON format:
+        {{
+            "questions": [
+                {{
+                    "article_id": "id of the article the question is based on",
+                    "question": "Question text",
+                    "options": ["A", "B", "C", "D"],
+                    "correct_answer": 0,
+                    "explanation": "Why this is correct, citing the article",
+                    "difficulty": 3
+                }}
+            ]
+        }}
+        """
+        
+        result = self._chat([
+            {"role": "system", "content": "You are an expert in Indian current affairs and government exam preparation."},
+            {"role": "user", "content": prompt}
+        ], temperature=0.4, max_output_tokens=300 * questions_per_article * len(articles) + 200)
+        return result.get("questions", [])
+    
+    def generate_interview_questions(self, exam_type: str, topic: str, interview_type: str, difficulty: int,
+                                     language: str = 'en', count: int = 10) -> List[Dict]:
+        """Generate a batch of interview questions, each with the key points a strong answer covers.
+
+        Raises on API or parsing errors so the pool filler can retry later.
+        """
+        if not self.client:
             return []
+        
+        lang_instruction = "in Hindi (Devanagari script)" if language == 'hi' else "in English"
+        
+        prompt = f"""Write {count} different interview questions {lang_instruction} that an interview board for
+        "{exam_type}" (Indian government recruitment) might ask in a {interview_type} on the topic "{topic}",
+        at difficulty {difficulty}/5 (1=warm-up, 5=very probing). Vary the angle of each question.
+
+        Return JSON format:
+        {{
+            "questions": [
+                {{
+                    "question": "Question text",
+                    "key_points": ["short phrase a strong answer would cover", "another point"]
+                }}
+            ]
+        }}
+        """
+        
+        result = self._chat([
+            {"role": "system", "content": "You are an expert interviewer for Indian government job positions."},
+            {"role": "user", "content": prompt}
+        ], temperature=0.9, max_output_tokens=120 * count + 200)
+        return result.get("questions", [])
+    
+    def _warn_rate_limited(self, error: RateLimitExceeded, language: str):
+        minutes = max(1, round(error.retry_after / 60))
+        st.warning(f"AI usage limit reached, showing offline content instead. AI features return in about {minutes} min."
+                   if language == 'en' else
+                   f"AI उपयोग सीमा पूरी हो गई है, इसलिए ऑफ़लाइन सामग्री दिखाई जा रही है। AI सुविधाएँ लगभग {minutes} मिनट में लौटेंगी।")
     
-    def _get_fallback_questions(self, topic: str, difficulty: int, language: str, num_questions: int) -> List[Dict]:
-        """Fallback questions when API is not available"""
-        return []
+    def _get_fallback_questions(self, topic: str, difficulty: int, language: str, num_questions: int,
+                                search_index: Optional[SearchIndex] = None) -> List[Dict]:
+        """Fallback questions when API is not available: previously generated questions from the search index"""
+        return (search_index or get_search_index()).question_pool(topic, language, num_questions)
     
     def _get_fallback_study_plan(self, user_data: Dict, language: str) -> Dict:
         """Fallback study plan when API is not available"""
@@ -244,21 +330,7 @@ class AIServices:
                 "study_tips": ["Practice regularly", "Make notes", "Regular revision"]
             }
     
-    def _get_fallback_interview_feedback(self, question: str, answer: str, language: str) -> Dict:
-        """Fallback interview feedback when API is not available"""
-        if language == 'hi':
-            return {
-                "score": 75,
-                "strengths": ["अच्छी समझ", "स्पष्ट उत्तर"],
-                "improvements": ["और विस्तार से बताएं", "उदाहरण दें"],
-                "model_answer": "इस प्रश्न का बेहतर उत्तर होगा...",
-                "overall_feedback": "अच्छी कोशिश, और सुधार की गुंजाइश है"
-            }
-        else:
-            return {
-                "score": 75,
-                "strengths": ["Good understanding", "Clear response"],
-                "improvements": ["Provide more details", "Add examples"],
-                "model_answer": "A better answer would be...",
-                "overall_feedback": "Good attempt, room for improvement"
-            }
+    def _get_fallback_interview_feedback(self, question: str, answer: str, language: str, topic: str = '',
+                                         key_points: Optional[List[str]] = None) -> Dict:
+        """Fallback interview feedback when API is not available: the local rubric score"""
+        return score_answer(question, answer, language, topic, key_points or ())
@@ -0,0 +1,228 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, Any, Iterable, Optional, Sequence, Tuple
+
+from utils.news_store import detect_language
+from utils.search_index import analyze
+
+# Answers shorter than this are scored locally only; the model is not worth calling for them
+MIN_SUBSTANTIVE_WORDS = 25
+
+# Below this share of distinct words an answer is mostly repetition
+MIN_DIVERSITY = 0.35
+
+IDEAL_WORDS = (60, 250)
+IDEAL_SENTENCE_WORDS = (8, 25)
+
+# Rubric terms that indicate a well-informed answer, per interview topic (matched as stems, so
+# inflected forms count)
+TOPIC_TERMS = {
+    'Personal Background': {
+        'en': ['family', 'education', 'experience', 'learned', 'values', 'strength', 'weakness', 'example', 'service'],
+        'hi': ['परिवार', 'शिक्षा', 'अनुभव', 'सीखा', 'मूल्य', 'शक्ति', 'कमजोरी', 'उदाहरण', 'सेवा']
+    },
+    'Career Goals': {
+        'en': ['public service', 'goal', 'contribute', 'citizens', 'department', 'growth', 'skills', 'responsibility'],
+        'hi': ['लोक सेवा', 'लक्ष्य', 'योगदान', 'नागरिक', 'विभाग', 'विकास', 'कौशल', 'जिम्मेदारी']
+    },
+    'Current Affairs': {
+        'en': ['government', 'policy', 'economy', 'impact', 'data', 'recent', 'international', 'challenge', 'reform'],
+        'hi': ['सरकार', 'नीति', 'अर्थव्यवस्था', 'प्रभाव', 'आंकड़े', 'हाल', 'अंतर्राष्ट्रीय', 'चुनौती', 'सुधार']
+    },
+    'Government Policies': {
+        'en': ['scheme', 'implementation', 'beneficiaries', 'budget', 'centre', 'state', 'outcome', 'monitoring'],
+        'hi': ['योजना', 'क्रियान्वयन', 'लाभार्थी', 'बजट', 'केंद्र', 'राज्य', 'परिणाम', 'निगरानी']
+    },
+    'Social Issues': {
+        'en': ['equality', 'education', 'health', 'poverty', 'women', 'community', 'awareness', 'inclusion'],
+        'hi': ['समानता', 'शिक्षा', 'स्वास्थ्य', 'गरीबी', 'महिला', 'समुदाय', 'जागरूकता', 'समावेश']
+    },
+    'Leadership': {
+        'en': ['team', 'decision', 'responsibility', 'motivate', 'communication', 'conflict', 'example', 'trust'],
+        'hi': ['टीम', 'निर्णय', 'जिम्मेदारी', 'प्रेरित', 'संवाद', 'संघर्ष', 'उदाहरण', 'विश्वास']
+    },
+    'Problem Solving': {
+        'en': ['cause', 'priority', 'stakeholders', 'plan', 'data', 'solution', 'review', 'immediate', 'long term'],
+        'hi': ['कारण', 'प्राथमिकता', 'हितधारक', 'योजना', 'आंकड़े', 'समाधान', 'समीक्षा', 'तत्काल', 'दीर्घकालिक']
+    },
+    'Ethics': {
+        'en': ['integrity', 'honesty', 'transparency', 'accountability', 'law', 'rules', 'conscience', 'public interest'],
+        'hi': ['ईमानदारी', 'सत्यनिष्ठा', 'पारदर्शिता', 'जवाबदेही', 'कानून', 'नियम', 'अंतरात्मा', 'जनहित']
+    },
+    'Public Administration': {
+        'en': ['citizens', 'accountability', 'efficiency', 'governance', 'district', 'e-governance', 'delivery', 'rules'],
+        'hi': ['नागरिक', 'जवाबदेही', 'दक्षता', 'शासन', 'जिला', 'ई-गवर्नेंस', 'सेवा वितरण', 'नियम']
+    }
+}
+
+# Words that make up the question's frame rather than its subject
+QUESTION_FRAME_WORDS = [
+    'how', 'why', 'do', 'does', 'you', 'your', 'yourself', 'me', 'us', 'tell', 'describe', 'discuss', 'give', 'would',
+    'should', 'can', 'if', 'about', 'this', 'that', 'there', 'have', 'had', 'be', 'been', 'it', 'its', 'they',
+    'their', 'group', 'example', 'situation', 'opinion', 'think', 'explain', 'when', 'where', 'not',
+    'क्या', 'कैसे', 'क्यों', 'आप', 'आपके', 'आपकी', 'अपने', 'अपनी', 'बताएं', 'करें', 'करेंगे', 'हो', 'एक', 'कोई', 'किस',
+    'समूह', 'चर्चा', 'उदाहरण', 'स्थिति', 'राय'
+]
+
+# Phrases that signal an organised answer: sequencing, examples, contrast and conclusions
+STRUCTURE_MARKERS = {
+    'en': ['first', 'second', 'secondly', 'third', 'finally', 'for example', 'for instance', 'such as', 'however',
+           'on the other hand', 'therefore', 'because', 'in conclusion', 'overall', 'to sum up', 'in my view'],
+    'hi': ['पहला', 'पहले', 'दूसरा', 'तीसरा', 'अंत में', 'उदाहरण के लिए', 'जैसे', 'लेकिन', 'हालांकि', 'दूसरी ओर',
+           'इसलिए', 'क्योंकि', 'निष्कर्ष', 'कुल मिलाकर', 'मेरे विचार में']
+}
+
+_SENTENCE_RE = re.compile(r'[.!?।]+')
+_WORD_RE = re.compile(r'\w+')
+
+# English suffixes stripped for matching, longest first; Hindi is stemmed by analyze()
+ENGLISH_SUFFIXES = ('ations', 'ation', 'ities', 'ical', 'ness', 'ment', 'ity', 'ing', 'ies', 'ed', 'es', 'al', 'ly', 's')
+
+def stem_english(word: str) -> str:
+    """Strip one common suffix, keeping at least four characters of stem"""
+    for suffix in ENGLISH_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+def match_terms(text: str) -> List[str]:
+    """Stemmed terms of a text, for comparing answers with questions and rubrics"""
+    return [stem_english(term) if term.isascii() else term for term in analyze(text)]
+
+_FRAME_TERMS = frozenset(term for word in QUESTION_FRAME_WORDS for term in match_terms(word))
+
+# Weights of the checks in the provisional score
+WEIGHTS = {'length': 0.2, 'structure': 0.15, 'coverage': 0.3, 'relevance': 0.2, 'readability': 0.15}
+
+@lru_cache(maxsize=4096)
+def rubric_terms(question: str, topic: str, language: str,
+                 key_points: Tuple[str, ...] = ()) -> Tuple[frozenset, frozenset]:
+    """Analyzed subject terms of a question, and the rubric terms an answer to it should cover"""
+    language = 'hi' if language == 'hi' else 'en'
+    question_terms = frozenset(term for term in match_terms(question) if term not in _FRAME_TERMS)
+    rubric = set()
+    for phrase in [*TOPIC_TERMS.get(topic, {}).get(language, []), *key_points]:
+        rubric.update(match_terms(phrase))
+    return question_terms, frozenset(rubric - _FRAME_TERMS)
+
+def _band(value: float, low: float, high: float, floor: float = 0.0) -> float:
+    """1 inside [low, high], falling linearly to `floor` at zero below and at twice `high` above"""
+    if value < low:
+        return max(floor, value / low)
+    if value > high:
+        return max(floor, 1 - (value - high) / high)
+    return 1.0
+
+def score_answer(question: str, answer: str, language: str = 'en', topic: str = '',
+                 key_points: Sequence[str] = ()) -> Dict[str, Any]:
+    """Provisional feedback from length, structure, rubric coverage, relevance and readability.
+
+    Returns feedback in the shape of the model's, plus `substantive` (worth a model evaluation),
+    `dimensions` (0-100 per check), `checks` and `provisional`.
+    """
+    language = 'hi' if language == 'hi' else 'en'
+    question_terms, rubric = rubric_terms(question, topic, language, tuple(key_points))
+    words = _WORD_RE.findall(answer)
+    word_count = len(words)
+    terms = set(match_terms(answer))
+    sentences = [s for s in _SENTENCE_RE.split(answer) if s.strip()]
+    lowered = answer.lower()
+    
+    rubric_hits = len(rubric & terms)
+    question_hits = len(question_terms & terms)
+    markers = sum(1 for marker in STRUCTURE_MARKERS[language] if marker in lowered)
+    sentence_words = word_count / len(sentences) if sentences else 0
+    diversity = len({word.lower() for word in words}) / word_count if word_count else 0
+    answer_language = detect_language(answer) if word_count else language
+    
+    checks = {
+        'words': word_count,
+        'sentences': len(sentences),
+        'structure_markers': markers,
+        'rubric_hits': rubric_hits,
+        'rubric_size': len(rubric),
+        'question_hits': question_hits,
+        'avg_sentence_words': round(sentence_words, 1),
+        'diversity': round(diversity, 2),
+        'language': answer_language
+    }
+    parts = {
+        'length': _band(word_count, *IDEAL_WORDS, floor=0.5) if word_count >= 5 else 0.0,
+        'structure': min(1.0, 0.4 * (len(sentences) >= 3) + 0.2 * min(markers, 3)),
+        'coverage': min(1.0, rubric_hits / min(len(rubric), 4)) if rubric else 0.5,
+        'relevance': min(1.0, question_hits / min(len(question_terms), 2)) if question_terms else 0.5,
+        'readability': _band(sentence_words, *IDEAL_SENTENCE_WORDS) if sentences else 0.0
+    }
+    score = 100 * sum(WEIGHTS[name] * value for name, value in parts.items())
+    if answer_language != language:
+        score *= 0.5
+    if word_count and diversity < MIN_DIVERSITY:
+        score *= 0.6
+    
+    substantive = (word_count >= MIN_SUBSTANTIVE_WORDS and answer_language == language
+                   and diversity >= MIN_DIVERSITY and (rubric_hits + question_hits) > 0)
+    return {
+        'score': int(round(min(score, 100))),
+        'strengths': _strengths(parts, language),
+        'improvements': _improvements(parts, checks, language),
+        'model_answer': '',
+        'overall_feedback': _overall(substantive, checks, language),
+        'substantive': substantive,
+        'provisional': True,
+        'dimensions': {name: int(round(100 * value)) for name, value in parts.items()},
+        'checks': checks
+    }
+
+def score_answers(items: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Score many answers; each item has question, answer and optionally language, topic and key_points"""
+    return [score_answer(item['question'], item['answer'], item.get('language', 'en'), item.get('topic', ''),
+                         item.get('key_points', ())) for item in items]
+
+def _strengths(parts: Dict[str, float], language: str) -> List[str]:
+    messages = {
+        'length': ("Well-developed answer", "अच्छी तरह विकसित उत्तर"),
+        'structure': ("Clearly organised", "स्पष्ट रूप से व्यवस्थित"),
+        'coverage': ("Covers the key points", "मुख्य बिंदुओं को शामिल किया"),
+        'relevance': ("Stays on the question", "प्रश्न पर केंद्रित"),
+        'readability': ("Easy to follow", "समझने में आसान")
+    }
+    return [messages[name][language == 'hi'] for name, value in parts.items() if value >= 0.8]
+
+def _improvements(parts: Dict[str, float], checks: Dict[str, Any], language: str) -> List[str]:
+    improvements = []
+    if checks['language'] != language:
+        improvements.append("Answer in the language of the interview" if language == 'en'
+                            else "साक्षात्कार की भाषा में उत्तर दें")
+    if parts['length'] < 0.8:
+        if checks['words'] < IDEAL_WORDS[0]:
+            improvements.append("Develop the answer further" if language == 'en' else "उत्तर को और विस्तार दें")
+        else:
+            improvements.append("Be more concise" if language == 'en' else "अधिक संक्षिप्त रहें")
+    if parts['relevance'] < 0.8:
+        improvements.append("Address the question directly" if language == 'en' else "प्रश्न का सीधा उत्तर दें")
+    if parts['coverage'] < 0.8:
+        improvements.append("Bring in more relevant points and terms" if language == 'en'
+                            else "अधिक प्रासंगिक बिंदु और शब्द जोड़ें")
+    if parts['structure'] < 0.8:
+        improvements.append("Structure it: main point, example, conclusion" if language == 'en'
+                            else "संरचना दें: मुख्य बिंदु, उदाहरण, निष्कर्ष")
+    if parts['readability'] < 0.8 and checks['sentences']:
+        if checks['avg_sentence_words'] > IDEAL_SENTENCE_WORDS[1]:
+            improvements.append("Use shorter, clearer sentences" if language == 'en' else "छोटे, स्पष्ट वाक्य लिखें")
+        else:
+            improvements.append("Write in complete sentences" if language == 'en' else "पूरे वाक्यों में लिखें")
+    if checks['diversity'] < MIN_DIVERSITY and checks['words']:
+        improvements.append("Avoid repeating the same words" if language == 'en' else "एक ही शब्द दोहराने से बचें")
+    return improvements
+
+def _overall(substantive: bool, checks: Dict[str, Any], language: str) -> str:
+    if substantive:
+        return ("A developed answer that addresses the question." if language == 'en'
+                else "उत्तर विकसित है और प्रश्न को संबोधित करता है।")
+    if checks['language'] != language:
+        return ("The answer is not in the interview language, so it was not evaluated in detail." if language == 'en'
+                else "उत्तर साक्षात्कार की भाषा में नहीं है, इसलिए इसका विस्तृत मूल्यांकन नहीं हुआ।")
+    return (f"The answer is too brief or off the question for a detailed evaluation. "
+            f"Aim for at least {MIN_SUBSTANTIVE_WORDS} words on the question asked." if language == 'en'
+            else f"उत्तर विस्तृत मूल्यांकन के लिए बहुत छोटा है या प्रश्न से हटकर है। "
+                 f"पूछे गए प्रश्न पर कम से कम {MIN_SUBSTANTIVE_WORDS} शब्द लिखें।")
@@ -0,0 +1,215 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Any, Iterable, Optional, Set
+
+from utils.event_store import DEFAULT_DB_PATH
+from utils.news_store import NewsStore
+from utils.search_index import SearchIndex
+
+# Articles packed into one prompt, and questions asked per article
+ARTICLES_PER_PROMPT = 5
+QUESTIONS_PER_ARTICLE = 2
+
+# Upper bound on articles sent to the model in one generation pass
+MAX_ARTICLES_PER_RUN = 40
+
+# Only articles this recent are turned into questions
+LOOKBACK_DAYS = 180
+
+def valid_question(question: Dict[str, Any], article_ids: Set[str]) -> bool:
+    """Whether a generated question is well-formed and tied to one of the prompt's articles"""
+    options = question.get('options')
+    answer = question.get('correct_answer')
+    return (
+        question.get('article_id') in article_ids
+        and bool(str(question.get('question', '')).strip())
+        and isinstance(options, list) and len(options) >= 2
+        and isinstance(answer, int) and 0 <= answer < len(options)
+    )
+
+class CAQuestionBank:
+    """Current affairs questions generated ahead of time from stored articles, cached per article"""
+    
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        if db_path != ':memory:' and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self._lock, self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS ca_questions (
+                    id INTEGER PRIMARY KEY,
+                    article_id TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    published_date TEXT NOT NULL,
+                    difficulty INTEGER NOT NULL,
+                    question TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_ca_questions_pool
+                    ON ca_questions (language, category, published_date);
+                CREATE INDEX IF NOT EXISTS idx_ca_questions_article ON ca_questions (article_id);
+                CREATE TABLE IF NOT EXISTS ca_question_articles (
+                    article_id TEXT PRIMARY KEY,
+                    question_count INTEGER NOT NULL,
+                    generated_at TEXT NOT NULL
+                );
+            """)
+    
+    def processed(self, article_ids: Iterable[str]) -> Set[str]:
+        """The given articles that already have questions generated (possibly none)"""
+        article_ids = list(article_ids)
+        if not article_ids:
+            return set()
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT article_id FROM ca_question_articles WHERE article_id IN ({','.join('?' * len(article_ids))})",
+                article_ids
+            ).fetchall()
+        return {row[0] for row in rows}
+    
+    def add(self, articles: List[Dict[str, Any]], questions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Store questions for a batch of articles and mark every article processed; returns the stored questions"""
+        by_id = {article['id']: article for article in articles}
+        stored = []
+        counts = {article_id: 0 for article_id in by_id}
+        for question in questions:
+            if not valid_question(question, set(by_id)):
+                continue
+            article = by_id[question['article_id']]
+            stored.append({
+                'question': question['question'].strip(),
+                'options': [str(option) for option in question['options']],
+                'correct_answer': question['correct_answer'],
+                'explanation': question.get('explanation', ''),
+                'difficulty': min(max(question['difficulty'], 1), 5) if isinstance(question.get('difficulty'), int) else 3,
+                'article_id': article['id'],
+                'source_title': article['title'],
+                'source_url': article.get('url', ''),
+                'date_relevance': article['date']
+            })
+            counts[article['id']] += 1
+        
+        now = datetime.now().isoformat()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                'INSERT INTO ca_questions (article_id, language, category, published_date, difficulty, question) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(q['article_id'], by_id[q['article_id']]['language'], by_id[q['article_id']]['category'],
+                  q['date_relevance'], q['difficulty'], json.dumps(q, ensure_ascii=False)) for q in stored]
+            )
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO ca_question_articles (article_id, question_count, generated_at) VALUES (?, ?, ?)',
+                [(article_id, count, now) for article_id, count in counts.items()]
+            )
+        return stored
+    
+    def sample(self, num_questions: int, language: str, category: Optional[str] = None,
+               since: Optional[date] = None, difficulty: Optional[int] = None,
+               article_ids: Optional[Iterable[str]] = None, exclude: Iterable[int] = ()) -> List[Dict[str, Any]]:
+        """Up to num_questions pooled questions matching the filters, closest to the difficulty first"""
+        clauses, params = ['language = ?'], [language]
+        if category:
+            clauses.append('category = ?')
+            params.append(category)
+        if since:
+            clauses.append('published_date >= ?')
+            params.append(since.isoformat())
+        if article_ids is not None:
+            article_ids = list(article_ids)
+            if not article_ids:
+                return []
+            clauses.append(f"article_id IN ({','.join('?' * len(article_ids))})")
+            params.extend(article_ids)
+        exclude = list(exclude)
+        if exclude:
+            clauses.append(f"id NOT IN ({','.join('?' * len(exclude))})")
+            params.extend(exclude)
+        
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT id, question FROM ca_questions WHERE {' AND '.join(clauses)} "
+                f"ORDER BY ABS(difficulty - ?), RANDOM() LIMIT ?",
+                params + [difficulty or 3, num_questions]
+            ).fetchall()
+        
+        questions = [{**json.loads(question), 'id': question_id} for question_id, question in rows]
+        random.shuffle(questions)
+        return questions
+    
+    def pool_size(self, language: Optional[str] = None) -> int:
+        with self._lock:
+            if language:
+                return self.conn.execute('SELECT COUNT(*) FROM ca_questions WHERE language = ?', (language,)).fetchone()[0]
+            return self.conn.execute('SELECT COUNT(*) FROM ca_questions').fetchone()[0]
+
+class CAQuestionGenerator:
+    """Turns stored articles without questions into pooled questions, several articles per model call"""
+    
+    def __init__(self, news_store: NewsStore, bank: CAQuestionBank, ai_services,
+                 search_index: Optional[SearchIndex] = None):
+        self.news_store = news_store
+        self.bank = bank
+        self.ai_services = ai_services
+        self.search_index = search_index
+    
+    def pending_articles(self, limit: int = MAX_ARTICLES_PER_RUN) -> List[Dict[str, Any]]:
+        """Most recently stored articles (published within LOOKBACK_DAYS) that have not been sent for questions yet"""
+        since = date.today() - timedelta(days=LOOKBACK_DAYS)
+        pending = []
+        for articles in self.news_store.iter_articles(200, since=since, newest_first=True):
+            done = self.bank.processed(article['id'] for article in articles)
+            # Same shape as NewsStore.query rows, which the prompt and the bank read the date from
+            pending.extend({**article, 'date': article['published_date']} for article in articles
+                           if article['id'] not in done)
+            if len(pending) >= limit:
+                break
+        return pending[:limit]
+    
+    def run_once(self, limit: int = MAX_ARTICLES_PER_RUN) -> Dict[str, Any]:
+        """One generation pass; articles in a failed batch stay pending for the next pass"""
+        stats = {'articles': 0, 'questions': 0, 'errors': []}
+        if not getattr(self.ai_services, 'client', None):
+            return stats
+        
+        by_language: Dict[str, List[Dict[str, Any]]] = {}
+        for article in self.pending_articles(limit):
+            by_language.setdefault(article['language'], []).append(article)
+        
+        for language, articles in by_language.items():
+            for i in range(0, len(articles), ARTICLES_PER_PROMPT):
+                batch = articles[i:i + ARTICLES_PER_PROMPT]
+                try:
+                    generated = self.ai_services.generate_current_affairs_questions(
+                        batch, language, QUESTIONS_PER_ARTICLE
+                    )
+                except Exception as e:
+                    stats['errors'].append(str(e))
+                    continue
+                stored = self.bank.add(batch, generated)
+                if self.search_index:
+                    for article in batch:
+                        self.search_index.add_questions(
+                            [q for q in stored if q['article_id'] == article['id']], article['category'], language
+                        )
+                stats['articles'] += len(batch)
+                stats['questions'] += len(stored)
+        return stats
+
+_default_bank = None
+_default_bank_lock = threading.Lock()
+
+def get_ca_question_bank() -> CAQuestionBank:
+    """Process-wide current affairs question bank"""
+    global _default_bank
+    with _default_bank_lock:
+        if _default_bank is None:
+            _default_bank = CAQuestionBank()
+        return _default_bank
@@ -0,0 +1,323 @@
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from utils.event_store import DEFAULT_DB_PATH, QUIZ_COMPLETED
+
+# Pseudo-topic that aggregates all topics of a user
+ALL_TOPICS = '*'
+
+# Scores are percentages, so a 101-bucket histogram answers percentile queries exactly
+# (to the nearest percent) with bounded work, however many users there are.
+NUM_BUCKETS = 101
+
+def week_start(day: date) -> str:
+    """Monday of the week containing `day`, as an ISO date string"""
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+def score_bucket(percentage: float) -> int:
+    return min(max(int(round(percentage)), 0), NUM_BUCKETS - 1)
+
+def histogram_percentile(histogram: List[Tuple[int, int]], percentile: float) -> Optional[int]:
+    """Score at `percentile` (0-100) from sorted (bucket, count) rows"""
+    total = sum(count for _, count in histogram)
+    if not total:
+        return None
+    target = max(percentile / 100 * total, 1)
+    cumulative = 0
+    for bucket, count in histogram:
+        cumulative += count
+        if cumulative >= target:
+            return bucket
+    return histogram[-1][0]
+
+def histogram_rank(histogram: List[Tuple[int, int]], bucket: int) -> Optional[float]:
+    """Percentile rank (0-100) of `bucket`: share below it plus half the ties"""
+    total = sum(count for _, count in histogram)
+    if not total:
+        return None
+    below = sum(count for b, count in histogram if b < bucket)
+    equal = sum(count for b, count in histogram if b == bucket)
+    return (below + equal / 2) / total * 100
+
+class CohortAnalytics:
+    """Cross-user quiz rollups kept next to the event store.
+
+    Rollup tables are updated incrementally as quizzes are saved:
+    - cohort_weekly: attempts and score sums per (topic, exam type, week)
+    - cohort_score_hist: attempt score histogram per (topic, exam type, week)
+    - cohort_user_topic: each user's attempts and score sum per topic (plus ALL_TOPICS)
+    - cohort_user_hist: histogram of users' average scores per (topic, exam type)
+    - cohort_users: totals per user for the points leaderboard
+    Queries read the histograms or an index, never the full user list.
+    """
+    
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        if db_path != ':memory:' and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self._create_tables()
+    
+    def _create_tables(self):
+        with self._lock, self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS cohort_weekly (
+                    topic TEXT NOT NULL, exam_type TEXT NOT NULL, week TEXT NOT NULL,
+                    attempts INTEGER NOT NULL, score_sum REAL NOT NULL, points_sum INTEGER NOT NULL,
+                    PRIMARY KEY (topic, exam_type, week)
+                );
+                CREATE TABLE IF NOT EXISTS cohort_score_hist (
+                    topic TEXT NOT NULL, exam_type TEXT NOT NULL, week TEXT NOT NULL,
+                    bucket INTEGER NOT NULL, count INTEGER NOT NULL,
+                    PRIMARY KEY (topic, exam_type, week, bucket)
+                );
+                CREATE TABLE IF NOT EXISTS cohort_user_topic (
+                    user_id TEXT NOT NULL, topic TEXT NOT NULL, exam_type TEXT NOT NULL,
+                    attempts INTEGER NOT NULL, score_sum REAL NOT NULL,
+                    PRIMARY KEY (user_id, topic)
+                );
+                CREATE TABLE IF NOT EXISTS cohort_user_hist (
+                    topic TEXT NOT NULL, exam_type TEXT NOT NULL, bucket INTEGER NOT NULL, count INTEGER NOT NULL,
+                    PRIMARY KEY (topic, exam_type, bucket)
+                );
+                CREATE TABLE IF NOT EXISTS cohort_users (
+                    user_id TEXT PRIMARY KEY, name TEXT, exam_type TEXT NOT NULL,
+                    total_points INTEGER NOT NULL, quizzes INTEGER NOT NULL, updated_at TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_cohort_users_points ON cohort_users (total_points DESC);
+                CREATE INDEX IF NOT EXISTS idx_cohort_users_exam_points ON cohort_users (exam_type, total_points DESC);
+            """)
+    
+    def record_quiz_events(self, user_id: str, events: Iterable[Dict[str, Any]], user_data: Dict[str, Any]):
+        """Fold a user's new QuizCompleted events into the rollups (other event types are ignored)"""
+        self.record_many([(user_id, list(events), {'user_data': user_data})])
+    
+    def record_many(self, batch: List[Tuple[str, List[Dict[str, Any]], Dict[str, Any]]]):
+        """Fold (user_id, events, state after those events) for many users in one transaction"""
+        with self._lock, self.conn:
+            for user_id, events, state in batch:
+                self._record(user_id, [event['data'] for event in events if event['type'] == QUIZ_COMPLETED], state)
+    
+    def replace_user(self, user_id: str, previous_history: List[Dict[str, Any]], state: Dict[str, Any]):
+        """Swap a user's contribution for that of a new full state (after a full-state import).
+
+        `previous_history` is the quiz history the rollups were built from. Its attempts are taken back
+        out of the weekly tables under the exam the user was last recorded with.
+        """
+        with self._lock, self.conn:
+            row = self.conn.execute('SELECT exam_type FROM cohort_users WHERE user_id = ?', (user_id,)).fetchone()
+            if row:
+                for result in previous_history:
+                    self._add_weekly(row[0], result, -1)
+                self.conn.execute('DELETE FROM cohort_weekly WHERE attempts <= 0')
+                self.conn.execute('DELETE FROM cohort_score_hist WHERE count <= 0')
+            
+            for topic, exam_type, attempts, score_sum in self.conn.execute(
+                'SELECT topic, exam_type, attempts, score_sum FROM cohort_user_topic WHERE user_id = ?', (user_id,)
+            ).fetchall():
+                self._bump('cohort_user_hist', (topic, exam_type, score_bucket(score_sum / attempts)), -1)
+            self.conn.execute('DELETE FROM cohort_user_topic WHERE user_id = ?', (user_id,))
+            self.conn.execute('DELETE FROM cohort_users WHERE user_id = ?', (user_id,))
+            
+            self._record(user_id, state['quiz_history'], state)
+    
+    def _record(self, user_id: str, quizzes: List[Dict[str, Any]], state: Dict[str, Any]):
+        if not quizzes:
+            return
+        user_data = state['user_data']
+        exam_type = user_data.get('exam_type') or ''
+        
+        for result in quizzes:
+            self._add_attempt(user_id, exam_type, result)
+        
+        self.conn.execute("""
+            INSERT INTO cohort_users (user_id, name, exam_type, total_points, quizzes, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (user_id) DO UPDATE SET
+                name = excluded.name, exam_type = excluded.exam_type,
+                total_points = excluded.total_points, quizzes = excluded.quizzes,
+                updated_at = excluded.updated_at
+        """, (user_id, user_data.get('name') or '', exam_type, int(user_data.get('total_points', 0)),
+              len(user_data.get('quiz_scores', [])), datetime.now().isoformat()))
+    
+    def _add_weekly(self, exam_type: str, result: Dict[str, Any], sign: int = 1):
+        """Add (sign 1) or take back (sign -1) one attempt in the weekly tables"""
+        percentage = float(result['percentage'])
+        week = week_start(datetime.fromisoformat(result['date']).date())
+        topic = result['topic']
+        
+        self.conn.execute("""
+            INSERT INTO cohort_weekly (topic, exam_type, week, attempts, score_sum, points_sum)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (topic, exam_type, week) DO UPDATE SET
+                attempts = attempts + excluded.attempts, score_sum = score_sum + excluded.score_sum,
+                points_sum = points_sum + excluded.points_sum
+        """, (topic, exam_type, week, sign, sign * percentage, sign * int(result.get('points_earned', 0))))
+        self._bump('cohort_score_hist', (topic, exam_type, week, score_bucket(percentage)), sign)
+    
+    def _add_attempt(self, user_id: str, exam_type: str, result: Dict[str, Any]):
+        self._add_weekly(exam_type, result)
+        percentage = float(result['percentage'])
+        topic = result['topic']
+        
+        for key in (topic, ALL_TOPICS):
+            row = self.conn.execute(
+                'SELECT exam_type, attempts, score_sum FROM cohort_user_topic WHERE user_id = ? AND topic = ?',
+                (user_id, key)
+            ).fetchone()
+            attempts, score_sum = (row[1], row[2]) if row else (0, 0.0)
+            if row:
+                # Move the user out of their old average's bucket
+                self._bump('cohort_user_hist', (key, row[0], score_bucket(score_sum / attempts)), -1)
+            attempts += 1
+            score_sum += percentage
+            self.conn.execute(
+                'INSERT OR REPLACE INTO cohort_user_topic (user_id, topic, exam_type, attempts, score_sum) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (user_id, key, exam_type, attempts, score_sum)
+            )
+            self._bump('cohort_user_hist', (key, exam_type, score_bucket(score_sum / attempts)), 1)
+    
+    def _bump(self, table: str, key: Tuple, delta: int):
+        columns = {'cohort_score_hist': 'topic, exam_type, week, bucket', 'cohort_user_hist': 'topic, exam_type, bucket'}
+        self.conn.execute(
+            f"INSERT INTO {table} ({columns[table]}, count) VALUES ({', '.join('?' * len(key))}, ?) "
+            f"ON CONFLICT ({columns[table]}) DO UPDATE SET count = count + excluded.count",
+            (*key, delta)
+        )
+    
+    def rebuild(self, event_store) -> int:
+        """Recompute all rollups from the event store (after bulk loads or full-state imports)"""
+        with self._lock, self.conn:
+            for table in ('cohort_weekly', 'cohort_score_hist', 'cohort_user_topic', 'cohort_user_hist', 'cohort_users'):
+                self.conn.execute(f'DELETE FROM {table}')
+        
+        user_ids = event_store.user_ids()
+        batch = []
+        for user_id in user_ids:
+            state, _, _ = event_store.rebuild(user_id)
+            events = [{'type': QUIZ_COMPLETED, 'data': result} for result in state['quiz_history']]
+            batch.append((user_id, events, state))
+            if len(batch) >= 200:
+                self.record_many(batch)
+                batch = []
+        self.record_many(batch)
+        return len(user_ids)
+    
+    def _query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+    
+    def _filters(self, topic: Optional[str], exam_type: Optional[str], since_week: Optional[str] = None) -> Tuple[str, Tuple]:
+        clauses, params = [], []
+        if topic is not None:
+            clauses.append('topic = ?')
+            params.append(topic)
+        if exam_type is not None:
+            clauses.append('exam_type = ?')
+            params.append(exam_type)
+        if since_week is not None:
+            clauses.append('week >= ?')
+            params.append(since_week)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', tuple(params)
+    
+    def score_distribution(self, topic: Optional[str] = None, exam_type: Optional[str] = None,
+                           weeks: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Attempt score histogram as sorted (score, count) rows, optionally for the last `weeks` weeks"""
+        since = week_start(datetime.now().date() - timedelta(weeks=weeks - 1)) if weeks else None
+        where, params = self._filters(topic, exam_type, since)
+        return self._query(
+            f'SELECT bucket, SUM(count) FROM cohort_score_hist{where} GROUP BY bucket HAVING SUM(count) > 0 ORDER BY bucket',
+            params
+        )
+    
+    def score_percentiles(self, topic: Optional[str] = None, exam_type: Optional[str] = None,
+                          weeks: Optional[int] = None, percentiles: Iterable[float] = (25, 50, 75, 90)) -> Dict[float, Optional[int]]:
+        """Quiz score at each percentile across all attempts"""
+        histogram = self.score_distribution(topic, exam_type, weeks)
+        return {p: histogram_percentile(histogram, p) for p in percentiles}
+    
+    def user_average(self, user_id: str, topic: str = ALL_TOPICS) -> Optional[Tuple[str, int, float]]:
+        """(exam type, attempts, average score) of a user for a topic"""
+        rows = self._query(
+            'SELECT exam_type, attempts, score_sum FROM cohort_user_topic WHERE user_id = ? AND topic = ?', (user_id, topic)
+        )
+        if not rows:
+            return None
+        exam_type, attempts, score_sum = rows[0]
+        return exam_type, attempts, score_sum / attempts
+    
+    def percentile_rank(self, user_id: str, topic: str = ALL_TOPICS, same_exam: bool = True) -> Optional[float]:
+        """Where the user's average score ranks among all users' averages (0-100)"""
+        user = self.user_average(user_id, topic)
+        if not user:
+            return None
+        where, params = self._filters(topic, user[0] if same_exam else None)
+        histogram = self._query(
+            f'SELECT bucket, SUM(count) FROM cohort_user_hist{where} GROUP BY bucket HAVING SUM(count) > 0 ORDER BY bucket',
+            params
+        )
+        return histogram_rank(histogram, score_bucket(user[2]))
+    
+    def topic_comparison(self, user_id: str, same_exam: bool = True) -> List[Dict[str, Any]]:
+        """Per topic: the user's average, the cohort average and the user's percentile rank"""
+        rows = self._query(
+            'SELECT topic, exam_type, attempts, score_sum FROM cohort_user_topic WHERE user_id = ? AND topic != ?',
+            (user_id, ALL_TOPICS)
+        )
+        comparison = []
+        for topic, exam_type, attempts, score_sum in rows:
+            where, params = self._filters(topic, exam_type if same_exam else None)
+            cohort = self._query(f'SELECT SUM(attempts), SUM(score_sum) FROM cohort_weekly{where}', params)[0]
+            comparison.append({
+                'topic': topic,
+                'attempts': attempts,
+                'user_average': score_sum / attempts,
+                'cohort_average': cohort[1] / cohort[0] if cohort[0] else None,
+                'percentile_rank': self.percentile_rank(user_id, topic, same_exam)
+            })
+        return sorted(comparison, key=lambda row: row['topic'])
+    
+    def weekly_trend(self, topic: Optional[str] = None, exam_type: Optional[str] = None,
+                     weeks: int = 12) -> List[Dict[str, Any]]:
+        """Cohort attempts and average score per week"""
+        since = week_start(datetime.now().date() - timedelta(weeks=weeks - 1))
+        where, params = self._filters(topic, exam_type, since)
+        rows = self._query(
+            f'SELECT week, SUM(attempts), SUM(score_sum) FROM cohort_weekly{where} GROUP BY week ORDER BY week', params
+        )
+        return [{'week': week, 'attempts': attempts, 'average_score': score_sum / attempts}
+                for week, attempts, score_sum in rows]
+    
+    def leaderboard(self, exam_type: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Top users by total points (read from the points index)"""
+        where, params = self._filters(None, exam_type)
+        rows = self._query(
+            f'SELECT user_id, name, exam_type, total_points, quizzes FROM cohort_users{where} '
+            f'ORDER BY total_points DESC LIMIT ?',
+            params + (limit,)
+        )
+        return [{'rank': i, 'user_id': r[0], 'name': r[1], 'exam_type': r[2], 'total_points': r[3], 'quizzes': r[4]}
+                for i, r in enumerate(rows, start=1)]
+    
+    def cohort_size(self, exam_type: Optional[str] = None) -> int:
+        """Number of users with at least one quiz"""
+        where, params = self._filters(ALL_TOPICS, exam_type)
+        return self._query(f'SELECT COALESCE(SUM(count), 0) FROM cohort_user_hist{where}', params)[0][0]
+
+_default_analytics = None
+_default_analytics_lock = threading.Lock()
+
+def get_cohort_analytics() -> CohortAnalytics:
+    """Process-wide cohort analytics over the default database"""
+    global _default_analytics
+    with _default_analytics_lock:
+        if _default_analytics is None:
+            _default_analytics = CohortAnalytics()
+        return _default_analytics
@@ -0,0 +1,229 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+
+from utils.ca_questions import CAQuestionBank
+from utils.event_store import DEFAULT_DB_PATH
+from utils.news_store import NewsStore, CATEGORY_KEYWORDS
+from utils.search_index import SearchIndex, STOPWORDS, normalize_text
+
+LANGUAGES = ('en', 'hi')
+
+# Digest covering every category (used for the important topics on the progress tab)
+ALL_CATEGORIES = '*'
+
+HEADLINES_PER_DIGEST = 8
+QUESTIONS_PER_DIGEST = 10
+IMPORTANT_TOPICS = 10
+
+# Quiz topic whose indexed questions fill the practice set when no article-grounded questions exist yet
+FALLBACK_QUESTION_TOPIC = 'Current Affairs'
+
+# Days of news behind each part of a digest, ending the day before the digest date
+HEADLINE_DAYS = 1
+QUESTION_DAYS = 7
+TOPIC_DAYS = 30
+
+# Words too common in government news to make a topic on their own
+GENERIC_WORDS = {
+    'india', 'indian', 'government', 'govt', 'minister', 'ministry', 'union', 'prime', 'pm', 'shri', 'smt',
+    'national', 'new', 'day', 'says', 'held', 'today', 'year', 'launches', 'inaugurates', 'chairs', 'meeting',
+    'भारत', 'भारतीय', 'सरकार', 'मंत्री', 'मंत्रालय', 'केंद्रीय', 'प्रधानमंत्री', 'श्री', 'राष्ट्रीय', 'नई', 'नए', 'दिवस',
+    'आज', 'वर्ष', 'बैठक'
+}
+
+_WORD_RE = re.compile(r'[\wऀ-ॣ०-ॿ]+')
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?।])\s')
+
+def first_sentence(text: str, max_length: int = 240) -> str:
+    """Opening sentence of an article summary, as the one-line gist shown in the digest"""
+    sentence = _SENTENCE_END_RE.split(text.strip(), maxsplit=1)[0] if text else ''
+    if len(sentence) > max_length:
+        sentence = sentence[:max_length].rsplit(' ', 1)[0] + '…'
+    return sentence
+
+def important_topics(titles: List[str], limit: int = IMPORTANT_TOPICS) -> List[Dict[str, Any]]:
+    """Phrases that recur across different headlines, most widespread first.
+
+    Two-word phrases are preferred; single words fill the remaining places.
+    """
+    phrase_articles: Dict[Tuple[str, ...], int] = Counter()
+    surface_forms: Dict[Tuple[str, ...], Counter] = defaultdict(Counter)
+    for title in titles:
+        seen = set()
+        words = _WORD_RE.findall(title)
+        keys = [normalize_text(word) for word in words]
+        for n in (1, 2):
+            for i in range(len(words) - n + 1):
+                key = tuple(keys[i:i + n])
+                if any(k in STOPWORDS or k.isdigit() or len(k) < 3 for k in key):
+                    continue
+                if n == 1 and key[0] in GENERIC_WORDS:
+                    continue
+                if key not in seen:
+                    seen.add(key)
+                    phrase_articles[key] += 1
+                surface_forms[key][' '.join(words[i:i + n])] += 1
+    
+    ranked = sorted((key for key, count in phrase_articles.items() if count >= 2),
+                    key=lambda key: (len(key) == 2, phrase_articles[key]), reverse=True)
+    topics, covered = [], set()
+    for key in ranked:
+        # Skip words already shown as part of a phrase, and phrases made only of generic words
+        if (len(key) == 1 and key[0] in covered) or all(k in GENERIC_WORDS for k in key):
+            continue
+        covered.update(key)
+        topics.append({'topic': surface_forms[key].most_common(1)[0][0], 'articles': phrase_articles[key]})
+        if len(topics) == limit:
+            break
+    return topics
+
+class DigestStore:
+    """Daily digests per (category, language), written once and served from memory afterwards"""
+    
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        if db_path != ':memory:' and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        # Digests never change once written, so lookups are cached for the life of the process
+        self._cache: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS ca_daily_digests (
+                    digest_date TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    PRIMARY KEY (digest_date, category, language)
+                )
+            """)
+    
+    def put(self, digest: Dict[str, Any]) -> bool:
+        """Store a digest unless one already exists for its day, category and language"""
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                'INSERT OR IGNORE INTO ca_daily_digests (digest_date, category, language, digest, created_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (digest['date'], digest['category'], digest['language'], json.dumps(digest, ensure_ascii=False),
+                 datetime.now().isoformat())
+            )
+        return bool(cursor.rowcount)
+    
+    def exists(self, day: date, category: str, language: str) -> bool:
+        if (day.isoformat(), category, language) in self._cache:
+            return True
+        with self._lock:
+            return self.conn.execute(
+                'SELECT 1 FROM ca_daily_digests WHERE digest_date = ? AND category = ? AND language = ?',
+                (day.isoformat(), category, language)
+            ).fetchone() is not None
+    
+    def latest(self, category: str, language: str, day: Optional[date] = None) -> Optional[Dict[str, Any]]:
+        """The digest for a day, or the most recent earlier one while that day's is not built yet"""
+        day = day or date.today()
+        key = (day.isoformat(), category, language)
+        if key in self._cache:
+            return self._cache[key]
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT digest_date, digest FROM ca_daily_digests WHERE category = ? AND language = ? AND digest_date <= ? '
+                'ORDER BY digest_date DESC LIMIT 1',
+                (category, language, day.isoformat())
+            ).fetchone()
+        if not row:
+            return None
+        digest = json.loads(row[1])
+        # Only an exact-day hit is final; a fallback may be superseded once today's digest is built
+        if row[0] == day.isoformat():
+            self._cache[key] = digest
+        return digest
+
+class DigestBuilder:
+    """Builds each day's digests from stored articles and the pre-generated question pool"""
+    
+    def __init__(self, news_store: NewsStore, bank: CAQuestionBank, store: DigestStore,
+                 search_index: Optional[SearchIndex] = None):
+        self.news_store = news_store
+        self.bank = bank
+        self.store = store
+        self.search_index = search_index
+    
+    def _articles(self, category: Optional[str], language: str, start: date, end: date,
+                  limit: int) -> List[Dict[str, Any]]:
+        articles, _ = self.news_store.query(category=category, start_date=start, end_date=end, language=language,
+                                            page_size=limit)
+        return articles
+    
+    def build(self, day: date, category: str, language: str) -> Optional[Dict[str, Any]]:
+        """Digest for a day, covering news up to the day before; None when there is no news to digest"""
+        end = day - timedelta(days=1)
+        category_filter = None if category == ALL_CATEGORIES else category
+        
+        headlines = self._articles(category_filter, language, end - timedelta(days=HEADLINE_DAYS - 1), end,
+                                   HEADLINES_PER_DIGEST)
+        topic_titles = [article['title'] for article in
+                        self._articles(category_filter, language, end - timedelta(days=TOPIC_DAYS - 1), end, 2000)]
+        if not topic_titles:
+            return None
+        
+        questions = self.bank.sample(QUESTIONS_PER_DIGEST, language, category_filter,
+                                     since=end - timedelta(days=QUESTION_DAYS - 1))
+        if not questions and self.search_index:
+            # No grounded questions yet (no model key, or generation behind): use the general current affairs pool
+            questions = self.search_index.question_pool(FALLBACK_QUESTION_TOPIC, language, QUESTIONS_PER_DIGEST)
+        return {
+            'date': day.isoformat(),
+            'category': category,
+            'language': language,
+            'news_through': end.isoformat(),
+            'headlines': [{
+                'id': article['id'],
+                'title': article['title'],
+                'gist': first_sentence(article['summary']),
+                'url': article['url'],
+                'source': article['source'],
+                'date': article['date']
+            } for article in headlines],
+            'important_topics': important_topics(topic_titles),
+            'questions': questions
+        }
+    
+    def run(self, day: Optional[date] = None) -> Dict[str, int]:
+        """Build the day's missing digests for every category and language"""
+        day = day or date.today()
+        stats = {'built': 0, 'existing': 0, 'empty': 0, 'without_questions': 0}
+        for language in LANGUAGES:
+            for category in [ALL_CATEGORIES, *CATEGORY_KEYWORDS]:
+                if self.store.exists(day, category, language):
+                    stats['existing'] += 1
+                    continue
+                digest = self.build(day, category, language)
+                if digest is None:
+                    # Nothing is stored, so the digest is built once news arrives
+                    stats['empty'] += 1
+                elif self.store.put(digest):
+                    stats['built'] += 1
+                    if not digest['questions']:
+                        stats['without_questions'] += 1
+        return stats
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def get_digest_store() -> DigestStore:
+    """Process-wide digest store"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = DigestStore()
+        return _default_store
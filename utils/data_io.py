@@ -0,0 +1,316 @@
+import gzip
+import hashlib
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Dict, List, Any, Iterable, Iterator, Optional, IO, Set, Tuple, Union
+
+from utils.event_store import (
+    PROFILE_UPDATED, QUIZ_COMPLETED, INTERVIEW_COMPLETED, MOCK_EXAM_COMPLETED, BADGE_AWARDED, STUDY_PLAN_GENERATED
+)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Line-delimited export format. Every line is one JSON object with a "record" field.
+SCHEMA_VERSION = 1
+
+PROFILE_FIELDS = ['name', 'exam_type', 'target_date', 'study_hours_per_day']
+
+NONE = type(None)
+
+# Required fields and accepted types per record kind
+RECORD_SCHEMAS = {
+    'header': {'schema_version': (int,)},
+    'profile': {
+        'name': (str, NONE), 'exam_type': (str, NONE), 'target_date': (str, NONE),
+        'study_hours_per_day': (int, float, NONE)
+    },
+    'quiz': {
+        'attempt_id': (str,), 'topic': (str,), 'score': (int, float), 'total_questions': (int,),
+        'percentage': (int, float), 'date': (str,), 'points_earned': (int, float)
+    },
+    'interview': {
+        'attempt_id': (str,), 'score': (int, float), 'topic': (str,), 'date': (str,), 'points_earned': (int, float)
+    },
+    'mock_exam': {
+        'attempt_id': (str,), 'exam': (str,), 'score': (int, float), 'max_score': (int, float),
+        'sections': (list,), 'date': (str,), 'points_earned': (int, float)
+    },
+    'badge': {'badge': (str,)},
+    'study_plan': {},
+    'response': {'question_id': (str,), 'topic': (str,), 'is_correct': (bool,), 'date': (str,)},
+    'review_item': {'question': (dict,), 'due': (str, NONE)},
+    'footer': {'records': (int,)}
+}
+
+# Record kinds whose fields may be left out; only the fields present are imported
+PARTIAL_RECORDS = {'profile'}
+
+# Fields holding ISO 8601 text, with the parser the reducers use on them
+ISO_FIELDS = {
+    'profile': {'target_date': date.fromisoformat},
+    'quiz': {'date': datetime.fromisoformat},
+    'interview': {'date': datetime.fromisoformat},
+    'mock_exam': {'date': datetime.fromisoformat},
+    'response': {'date': datetime.fromisoformat},
+    'review_item': {'due': datetime.fromisoformat}
+}
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+class RecordValidationError(ValueError):
+    """Raised when an import line doesn't match the export schema"""
+
+def attempt_id(result: Dict[str, Any]) -> str:
+    """Id of a quiz or interview attempt; older attempts without one get a content hash"""
+    if result.get('attempt_id'):
+        return result['attempt_id']
+    key = f"{result.get('date', '')}|{result.get('topic', '')}|{result.get('score', '')}|{result.get('total_questions', '')}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+def iter_export_records(state: Dict[str, Any], user_id: str = '', response_log: Iterable[Dict] = (),
+                        review_items: Optional[Dict[str, Dict]] = None) -> Iterator[Dict[str, Any]]:
+    """Yield export records one at a time without building the whole payload"""
+    user_data = state['user_data']
+    count = 0
+    
+    yield {'record': 'header', 'schema_version': SCHEMA_VERSION, 'user_id': user_id,
+           'export_date': datetime.now().isoformat()}
+    
+    profile = {field: user_data.get(field) for field in PROFILE_FIELDS}
+    if profile.get('target_date') and not isinstance(profile['target_date'], str):
+        profile['target_date'] = profile['target_date'].isoformat()
+    yield {'record': 'profile', 'data': profile}
+    count += 1
+    
+    for result in state['quiz_history']:
+        yield {'record': 'quiz', 'data': {**result, 'attempt_id': attempt_id(result)}}
+        count += 1
+    
+    for result in user_data.get('interview_scores', []):
+        yield {'record': 'interview', 'data': {**result, 'attempt_id': attempt_id(result)}}
+        count += 1
+    
+    for result in user_data.get('mock_exams', []):
+        yield {'record': 'mock_exam', 'data': result}
+        count += 1
+    
+    for badge in user_data.get('badges', []):
+        yield {'record': 'badge', 'data': {'badge': badge}}
+        count += 1
+    
+    if state.get('study_plan'):
+        yield {'record': 'study_plan', 'data': state['study_plan']}
+        count += 1
+    
+    for response in response_log:
+        yield {'record': 'response', 'data': response}
+        count += 1
+    
+    for card in (review_items or {}).values():
+        yield {'record': 'review_item', 'data': card}
+        count += 1
+    
+    yield {'record': 'footer', 'records': count}
+
+def iter_ndjson(records: Iterable[Dict[str, Any]], compression: Optional[str] = None) -> Iterator[bytes]:
+    """Encode records as NDJSON chunks, optionally gzip or zstd compressed"""
+    if compression == 'zstd' and zstandard is None:
+        raise ValueError("zstd compression needs the 'zstandard' package")
+    
+    if compression == 'gzip':
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 writes a gzip header
+    elif compression == 'zstd':
+        compressor = zstandard.ZstdCompressor().compressobj()
+    elif compression is None:
+        compressor = None
+    else:
+        raise ValueError(f"Unsupported compression: {compression}")
+    
+    for record in records:
+        line = (json.dumps(record, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+        if compressor is None:
+            yield line
+        else:
+            chunk = compressor.compress(line)
+            if chunk:
+                yield chunk
+    
+    if compressor is not None:
+        yield compressor.flush()
+
+def _open_stream(stream: Union[IO[bytes], bytes]) -> IO[bytes]:
+    """Binary line reader over a raw, gzip or zstd stream (detected from the magic bytes)"""
+    if isinstance(stream, (bytes, bytearray)):
+        stream = io.BytesIO(stream)
+    if not hasattr(stream, 'peek'):
+        stream = io.BufferedReader(stream)
+    
+    magic = stream.peek(4)[:4]
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=stream)
+    if magic == ZSTD_MAGIC:
+        if zstandard is None:
+            raise ValueError("zstd-compressed import needs the 'zstandard' package")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(stream))
+    return stream
+
+def validate_record(record: Any, line_number: int = 0) -> Dict[str, Any]:
+    """Check one decoded line against the export schema"""
+    if not isinstance(record, dict) or record.get('record') not in RECORD_SCHEMAS:
+        raise RecordValidationError(f"Line {line_number}: unknown record type")
+    
+    kind = record['record']
+    if kind == 'header':
+        if record.get('schema_version') != SCHEMA_VERSION:
+            raise RecordValidationError(f"Line {line_number}: unsupported schema version {record.get('schema_version')}")
+        return record
+    if kind == 'footer':
+        return record
+    
+    data = record.get('data')
+    if not isinstance(data, dict):
+        raise RecordValidationError(f"Line {line_number}: '{kind}' record has no data object")
+    
+    for field, types in RECORD_SCHEMAS[kind].items():
+        if field not in data:
+            if kind in PARTIAL_RECORDS:
+                continue
+            raise RecordValidationError(f"Line {line_number}: '{kind}' record is missing '{field}'")
+        # bool is an int subclass; only accept it where bool is expected
+        if not isinstance(data[field], types) or (isinstance(data[field], bool) and bool not in types):
+            raise RecordValidationError(f"Line {line_number}: '{kind}.{field}' has the wrong type")
+    
+    # A stored event with an unparseable date would break every later rebuild of the user's state
+    for field, parse in ISO_FIELDS.get(kind, {}).items():
+        if data.get(field) is None:
+            continue
+        try:
+            parse(data[field])
+        except ValueError:
+            raise RecordValidationError(f"Line {line_number}: '{kind}.{field}' is not an ISO 8601 date")
+    
+    return record
+
+def iter_import_records(stream: Union[IO[bytes], bytes], include_header: bool = False) -> Iterator[Dict[str, Any]]:
+    """Decode and validate an NDJSON export one line at a time"""
+    reader = _open_stream(stream)
+    seen_header = False
+    
+    for line_number, line in enumerate(reader, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise RecordValidationError(f"Line {line_number}: invalid JSON ({e.msg})")
+        
+        record = validate_record(record, line_number)
+        if not seen_header:
+            if record['record'] != 'header':
+                raise RecordValidationError("Export does not start with a header record")
+            seen_header = True
+            if not include_header:
+                continue
+        yield record
+
+def iter_batches(records: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group records into lists of at most `batch_size`"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class ImportMerger:
+    """Turns validated import records into events, skipping anything the user already has.
+
+    Quiz, mock exam and interview attempts are merged by attempt id, badges by name. Profile fields and the
+    study plan are only filled in when empty. Response log entries are collected for the caller to
+    store (see take_responses) when `import_responses` is set; review cards are merged straight into
+    `review_items`. Either is ignored when left out.
+    """
+    
+    def __init__(self, state: Dict[str, Any], badge_set: Set[str], import_responses: bool = False,
+                 review_items: Optional[Dict[str, Dict]] = None):
+        self.state = state
+        self.badge_set = badge_set
+        self.import_responses = import_responses
+        self.pending_responses: List[Dict[str, Any]] = []
+        self.review_items = review_items
+        self.known_attempts = {attempt_id(r) for r in state['quiz_history']}
+        self.known_attempts.update(attempt_id(r) for r in state['user_data'].get('interview_scores', []))
+        self.known_attempts.update(r['attempt_id'] for r in state['user_data'].get('mock_exams', []))
+        self.summary = {'imported': {}, 'skipped': 0, 'ignored': 0, 'error': None}
+    
+    def merge(self, record: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Event (type, data) for one record, or None when it is a duplicate or merged in place"""
+        kind = record['record']
+        data = record.get('data')
+        event = None
+        
+        if kind in ('quiz', 'interview', 'mock_exam'):
+            if data['attempt_id'] in self.known_attempts:
+                return self._skip()
+            self.known_attempts.add(data['attempt_id'])
+            event = ({'quiz': QUIZ_COMPLETED, 'interview': INTERVIEW_COMPLETED, 'mock_exam': MOCK_EXAM_COMPLETED}[kind],
+                     data)
+        elif kind == 'profile':
+            user_data = self.state['user_data']
+            profile = {f: data[f] for f in PROFILE_FIELDS if data.get(f) and not user_data.get(f)}
+            if not profile:
+                return self._skip()
+            event = (PROFILE_UPDATED, profile)
+        elif kind == 'badge':
+            if data['badge'] in self.badge_set:
+                return self._skip()
+            self.badge_set.add(data['badge'])
+            event = (BADGE_AWARDED, data)
+        elif kind == 'study_plan':
+            if self.state.get('study_plan'):
+                return self._skip()
+            event = (STUDY_PLAN_GENERATED, {'plan': data})
+        elif kind == 'response':
+            if not self.import_responses:
+                self.summary['ignored'] += 1
+            else:
+                # Duplicates are dropped by the response store, which reports what it added
+                self.pending_responses.append(data)
+            return None
+        elif kind == 'review_item':
+            if self.review_items is None:
+                self.summary['ignored'] += 1
+                return None
+            qid = data['question'].get('id')
+            if not qid or qid in self.review_items:
+                return self._skip()
+            self.review_items[qid] = data
+        else:
+            return None
+        
+        self.summary['imported'][kind] = self.summary['imported'].get(kind, 0) + 1
+        return event
+    
+    def take_responses(self) -> List[Dict[str, Any]]:
+        """Response log entries collected since the last call"""
+        responses, self.pending_responses = self.pending_responses, []
+        return responses
+    
+    def count_responses(self, added: int, offered: int):
+        """Record how many of the taken responses the store added"""
+        if added:
+            self.summary['imported']['response'] = self.summary['imported'].get('response', 0) + added
+        self.summary['skipped'] += offered - added
+    
+    def _skip(self) -> None:
+        self.summary['skipped'] += 1
+        return None
@@ -1,31 +1,59 @@
 import streamlit as st
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Iterator, IO, Tuple, Union
 import json
+import uuid
+
+from utils.activity_calendar import ActivityCalendar
+from utils.adaptive_store import AdaptiveStore, get_adaptive_store
+from utils.review_store import ReviewStore, get_review_store
+from utils.interview_stats import InterviewStats
+from utils.achievements import AchievementEngine
+from utils.cohort_analytics import CohortAnalytics, get_cohort_analytics
+from utils.leaderboard import Leaderboard, get_leaderboard
+from utils.data_io import (
+    ImportMerger, RecordValidationError, iter_export_records, iter_ndjson, iter_import_records, iter_batches,
+    validate_record
+)
+from utils.event_store import (
+    EventStore, get_event_store, make_event, apply_event, validate_event,
+    PROFILE_UPDATED, QUIZ_COMPLETED, INTERVIEW_COMPLETED, MOCK_EXAM_COMPLETED, CURRENT_AFFAIRS_COMPLETED,
+    ACTIVITY_RECORDED, BADGE_AWARDED, STUDY_PLAN_GENERATED, ABILITY_UPDATED, STATE_IMPORTED
+)
 
 class DataManager:
-    """Manages user data and application state using Streamlit session state"""
+    """Manages user data and application state using Streamlit session state.
+    
+    Every change is written as an event to the append-only event store and then applied to
+    session state, so the state can be rebuilt from the latest snapshot plus the log tail.
+    """
     
-    def __init__(self):
+    def __init__(self, event_store: Optional[EventStore] = None, cohort_analytics: Optional[CohortAnalytics] = None,
+                 leaderboard: Optional[Leaderboard] = None, adaptive_store: Optional[AdaptiveStore] = None,
+                 review_store: Optional[ReviewStore] = None):
+        self.event_store = event_store or get_event_store()
+        self.adaptive_store = adaptive_store or get_adaptive_store()
+        self.review_store = review_store or get_review_store()
+        self.cohort_analytics = cohort_analytics or get_cohort_analytics()
+        self.leaderboard = leaderboard or get_leaderboard()
+        self.achievement_engine = AchievementEngine()
         self.initialize_session_state()
     
+    @property
+    def activity_calendar(self) -> ActivityCalendar:
+        """Activity calendar over the current user_data (which an import may replace)"""
+        return ActivityCalendar()
+    
     def initialize_session_state(self):
         """Initialize session state variables if they don't exist"""
+        if 'user_id' not in st.session_state:
+            st.session_state.user_id = self._resolve_user_id()
+        
         if 'user_data' not in st.session_state:
-            st.session_state.user_data = {
-                'name': '',
-                'exam_type': '',
-                'target_date': None,
-                'study_hours_per_day': 2,
-                'quiz_scores': [],
-                'study_streaks': 0,
-                'badges': [],
-                'total_points': 0,
-                'last_activity': None,
-                'topics_studied': {},
-                'interview_scores': [],
-                'current_affairs_score': 0
-            }
+            # Recover the user's state from the event log (bounded by the latest snapshot)
+            state, last_seq, replayed = self.event_store.rebuild(st.session_state.user_id)
+            self._set_state(state)
+            st.session_state.event_meta = {'last_seq': last_seq, 'since_snapshot': replayed}
         
         if 'quiz_history' not in st.session_state:
             st.session_state.quiz_history = []
@@ -35,10 +63,127 @@ class DataManager:
         
         if 'achievements' not in st.session_state:
             st.session_state.achievements = []
+        
+        if 'event_meta' not in st.session_state:
+            st.session_state.event_meta = {'last_seq': 0, 'since_snapshot': 0}
+        
+        if 'badge_set' not in st.session_state:
+            st.session_state.badge_set = set(st.session_state.user_data.get('badges', []))
+        
+        # Thresholds already checked per counter; derived state, so kept out of the event log
+        if 'achievement_cursors' not in st.session_state:
+            st.session_state.achievement_cursors = {}
+    
+    def _resolve_user_id(self) -> str:
+        """User id from the `uid` query parameter, or a new one that is written back to the URL"""
+        try:
+            user_id = st.query_params.get('uid')
+            if not user_id:
+                user_id = uuid.uuid4().hex
+                st.query_params['uid'] = user_id
+            return user_id
+        except Exception:
+            return uuid.uuid4().hex
+    
+    def _get_state(self) -> Dict[str, Any]:
+        """Current state as a dict of the session state entries covered by the event log"""
+        return {
+            'user_data': st.session_state.user_data,
+            'quiz_history': st.session_state.quiz_history,
+            'study_plan': st.session_state.study_plan
+        }
+    
+    def _set_state(self, state: Dict[str, Any]):
+        """Write a state dict back into session state"""
+        st.session_state.user_data = state['user_data']
+        st.session_state.quiz_history = state['quiz_history']
+        st.session_state.study_plan = state['study_plan']
+    
+    def _emit(self, event_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Append an event to the log, apply it to session state and snapshot periodically.
+        
+        Raises ValueError, before anything is written, if the event would not apply.
+        """
+        event = make_event(event_type, data)
+        validate_event(event)
+        user_id = st.session_state.user_id
+        seq = self.event_store.append(user_id, event)
+        
+        previous_history = st.session_state.quiz_history
+        state = apply_event(self._get_state(), event)
+        self._set_state(state)
+        self._update_rollups([event], previous_history)
+        
+        meta = st.session_state.event_meta
+        meta['last_seq'] = seq
+        meta['since_snapshot'] += 1
+        if meta['since_snapshot'] >= self.event_store.SNAPSHOT_INTERVAL:
+            self.event_store.save_snapshot(user_id, seq, state)
+            meta['since_snapshot'] = 0
+        
+        return event
+    
+    def _emit_batch(self, events: List[Tuple[str, Dict[str, Any]]]):
+        """Append several events in one write, then apply them in order; nothing is written if one would not apply"""
+        if not events:
+            return
+        
+        built = [make_event(event_type, data) for event_type, data in events]
+        for event in built:
+            validate_event(event)
+        user_id = st.session_state.user_id
+        seqs = self.event_store.append_many(user_id, built)
+        
+        state = self._get_state()
+        for event in built:
+            apply_event(state, event)
+        self._set_state(state)
+        self._update_rollups(built)
+        
+        meta = st.session_state.event_meta
+        meta['last_seq'] = seqs[-1]
+        meta['since_snapshot'] += len(built)
+        if meta['since_snapshot'] >= self.event_store.SNAPSHOT_INTERVAL:
+            self.event_store.save_snapshot(user_id, seqs[-1], state)
+            meta['since_snapshot'] = 0
+    
+    def _update_rollups(self, events: List[Dict[str, Any]], previous_history: Optional[List[Dict]] = None):
+        """Fold saved results into the cross-user cohort rollups and the leaderboard"""
+        user_id = st.session_state.user_id
+        if any(event['type'] == STATE_IMPORTED for event in events):
+            # The whole state was replaced: swap the user's contribution instead of adding to it
+            state = self._get_state()
+            self.cohort_analytics.replace_user(user_id, previous_history or [], state)
+            self.leaderboard.replace_user(user_id, state)
+            return
+        
+        batch = [(user_id, events, {'user_data': st.session_state.user_data})]
+        if any(event['type'] == QUIZ_COMPLETED for event in events):
+            self.cohort_analytics.record_many(batch)
+        if any(event['data'].get('points_earned') for event in events):
+            self.leaderboard.record_many(batch)
+    
+    def update_profile(self, name: str, exam_type: str, target_date, study_hours_per_day: int):
+        """Save profile form fields"""
+        self._emit(PROFILE_UPDATED, {
+            'name': name,
+            'exam_type': exam_type,
+            'target_date': target_date.isoformat() if target_date else None,
+            'study_hours_per_day': study_hours_per_day
+        })
+    
+    def save_study_plan(self, study_plan: Dict[str, Any]):
+        """Save a generated study plan"""
+        self._emit(STUDY_PLAN_GENERATED, {'plan': study_plan})
+    
+    def save_ability(self, topic: str, ability: float):
+        """Save the adaptive engine's new ability estimate for a topic"""
+        self._emit(ABILITY_UPDATED, {'topic': topic, 'ability': ability})
     
     def save_quiz_result(self, topic: str, score: int, total_questions: int, difficulty: int, language: str):
         """Save quiz result to user data"""
         quiz_result = {
+            'attempt_id': uuid.uuid4().hex,
             'topic': topic,
             'score': score,
             'total_questions': total_questions,
@@ -49,35 +194,91 @@ class DataManager:
             'points_earned': self._calculate_points(score, total_questions, difficulty)
         }
         
-        st.session_state.quiz_history.append(quiz_result)
-        st.session_state.user_data['quiz_scores'].append(quiz_result['percentage'])
-        st.session_state.user_data['total_points'] += quiz_result['points_earned']
-        
-        # Update topics studied
-        if topic not in st.session_state.user_data['topics_studied']:
-            st.session_state.user_data['topics_studied'][topic] = []
-        st.session_state.user_data['topics_studied'][topic].append(quiz_result['percentage'])
+        # Updates history, scores, topics studied and the study streak
+        self._emit(QUIZ_COMPLETED, quiz_result)
         
         # Check for achievements
-        self._check_achievements()
-        
-        # Update study streak
-        self._update_study_streak()
+        self._check_achievements(QUIZ_COMPLETED)
+    
+    def save_mock_exam_result(self, exam_name: str, paper: Dict[str, Any], result: Dict[str, Any]):
+        """Save a graded mock exam as one attempt with its per-section breakdown"""
+        difficulty = paper.get('difficulty', 3)
+        exam_result = {
+            'attempt_id': uuid.uuid4().hex,
+            'exam': exam_name,
+            'blueprint': paper['blueprint'],
+            'language': paper['language'],
+            'difficulty': difficulty,
+            'marks_correct': paper['marks_correct'],
+            'negative': paper['negative'],
+            'score': result['score'],
+            'max_score': result['max_score'],
+            'percentage': result['score'] / result['max_score'] * 100 if result['max_score'] else 0.0,
+            'correct': result['correct'],
+            'wrong': result['wrong'],
+            'unanswered': result['unanswered'],
+            'date': datetime.now().isoformat(),
+            # Net marks after negative marking; a paper scored below zero earns nothing
+            'points_earned': self._calculate_points(max(result['score'], 0), result['max_score'], difficulty)
+                             if result['max_score'] else 0,
+            'sections': [{
+                **section,
+                'percentage': section['correct'] / section['questions'] * 100 if section['questions'] else 0.0
+            } for section in result['sections']]
+        }
+        self._emit(MOCK_EXAM_COMPLETED, exam_result)
+        self._check_achievements(MOCK_EXAM_COMPLETED)
     
-    def save_interview_result(self, score: int, topic: str, language: str):
-        """Save mock interview result"""
+    def save_interview_result(self, score: int, topic: str, language: str, question_ids: Optional[List[str]] = None,
+                              answers: Optional[List[Dict[str, Any]]] = None):
+        """Save mock interview result with its per-question feedback"""
         interview_result = {
+            'attempt_id': uuid.uuid4().hex,
             'score': score,
             'topic': topic,
             'language': language,
             'date': datetime.now().isoformat(),
-            'points_earned': score // 10  # 1 point per 10 score points
+            'points_earned': int(score) // 10,  # 1 point per 10 score points
+            'question_ids': question_ids or [],
+            'answers': answers or []
         }
         
-        st.session_state.user_data['interview_scores'].append(interview_result)
-        st.session_state.user_data['total_points'] += interview_result['points_earned']
-        
-        self._check_achievements()
+        self._emit(INTERVIEW_COMPLETED, interview_result)
+        self._check_achievements(INTERVIEW_COMPLETED)
+    
+    def get_answered_interview_questions(self) -> set:
+        """Ids of the interview bank questions asked in the user's past interviews"""
+        return {question_id for result in st.session_state.user_data.get('interview_scores', [])
+                for question_id in result.get('question_ids', [])}
+    
+    def get_interview_stats(self) -> InterviewStats:
+        """Get the incrementally kept interview rollup"""
+        return InterviewStats()
+    
+    def save_current_affairs_result(self, score: int, total_questions: int, category: str, language: str) -> int:
+        """Save current affairs quiz result and return the points earned"""
+        points_earned = score * 10  # 10 points per correct answer
+        self._emit(CURRENT_AFFAIRS_COMPLETED, {
+            'category': category,
+            'score': score,
+            'total_questions': total_questions,
+            'language': language,
+            'date': datetime.now().isoformat(),
+            'points_earned': points_earned
+        })
+        self._check_achievements(CURRENT_AFFAIRS_COMPLETED)
+        return points_earned
+    
+    def record_activity(self, kind: str) -> int:
+        """Record non-quiz activity (e.g. current affairs reading) in the activity calendar"""
+        if not self.activity_calendar.is_active(datetime.now().date(), kind):
+            self._emit(ACTIVITY_RECORDED, {'kind': kind})
+            self._check_achievements(ACTIVITY_RECORDED)
+        return self.activity_calendar.current_streak(kind)
+    
+    def get_activity_calendar(self) -> ActivityCalendar:
+        """Get the per-day activity calendar"""
+        return self.activity_calendar
     
     def get_user_stats(self) -> Dict[str, Any]:
         """Get comprehensive user statistics"""
@@ -88,8 +289,10 @@ class DataManager:
             'average_score': sum(quiz_scores) / len(quiz_scores) if quiz_scores else 0,
             'best_score': max(quiz_scores) if quiz_scores else 0,
             'total_points': st.session_state.user_data['total_points'],
-            'study_streak': st.session_state.user_data['study_streaks'],
+            'study_streak': self.activity_calendar.current_streak(),
+            'longest_streak': self.activity_calendar.longest_streak(),
             'badges_count': len(st.session_state.user_data['badges']),
+            'next_badges': self.achievement_engine.get_progress(st.session_state.user_data),
             'topics_mastered': len([topic for topic, scores in st.session_state.user_data['topics_studied'].items() 
                                   if sum(scores) / len(scores) >= 80]),
             'recent_activity': self._get_recent_activity(),
@@ -100,6 +303,29 @@ class DataManager:
         
         return stats
     
+    def get_cohort_comparison(self) -> Dict[str, Any]:
+        """How the current user compares with other users preparing for the same exam"""
+        user_id = st.session_state.user_id
+        exam_type = st.session_state.user_data.get('exam_type') or ''
+        return {
+            'cohort_size': self.cohort_analytics.cohort_size(exam_type),
+            'percentile_rank': self.cohort_analytics.percentile_rank(user_id),
+            'score_percentiles': self.cohort_analytics.score_percentiles(exam_type=exam_type),
+            'topics': self.cohort_analytics.topic_comparison(user_id),
+            'weekly_trend': self.cohort_analytics.weekly_trend(exam_type=exam_type),
+            'leaderboard': self.cohort_analytics.leaderboard(exam_type, limit=10)
+        }
+    
+    def get_leaderboard_standing(self, window: str = 'all_time', k: int = 10) -> Dict[str, Any]:
+        """Top `k` users, the current user's rank and neighbours for a leaderboard window"""
+        user_id = st.session_state.user_id
+        return {
+            'top': self.leaderboard.top(window, k),
+            'rank': self.leaderboard.rank(user_id, window),
+            'around': self.leaderboard.around(user_id, window),
+            'size': self.leaderboard.size(window)
+        }
+    
     def get_quiz_history(self, limit: int = None) -> List[Dict]:
         """Get quiz history with optional limit"""
         history = st.session_state.quiz_history
@@ -128,61 +354,18 @@ class DataManager:
         difficulty_multiplier = 1 + (difficulty - 1) * 0.2  # 1.0 to 1.8 multiplier
         return int(base_points * difficulty_multiplier)
     
-    def _check_achievements(self):
-        """Check and award achievements based on performance"""
-        badges = st.session_state.user_data['badges']
-        total_points = st.session_state.user_data['total_points']
-        quiz_count = len(st.session_state.user_data['quiz_scores'])
-        
-        # Points-based badges
-        if total_points >= 1000 and "🏆 Point Master" not in badges:
-            badges.append("🏆 Point Master")
-            st.success("Achievement Unlocked: 🏆 Point Master (1000+ points)")
-        
-        if total_points >= 500 and "⭐ Rising Star" not in badges:
-            badges.append("⭐ Rising Star")
-            st.success("Achievement Unlocked: ⭐ Rising Star (500+ points)")
-        
-        # Quiz-based badges
-        if quiz_count >= 50 and "📚 Quiz Master" not in badges:
-            badges.append("📚 Quiz Master")
-            st.success("Achievement Unlocked: 📚 Quiz Master (50+ quizzes)")
-        
-        if quiz_count >= 10 and "🎯 Dedicated Learner" not in badges:
-            badges.append("🎯 Dedicated Learner")
-            st.success("Achievement Unlocked: 🎯 Dedicated Learner (10+ quizzes)")
-        
-        # Perfect score badges
-        perfect_scores = [score for score in st.session_state.user_data['quiz_scores'] if score == 100]
-        if len(perfect_scores) >= 5 and "💯 Perfectionist" not in badges:
-            badges.append("💯 Perfectionist")
-            st.success("Achievement Unlocked: 💯 Perfectionist (5 perfect scores)")
-        
-        # Streak badges
-        if st.session_state.user_data['study_streaks'] >= 7 and "🔥 Week Warrior" not in badges:
-            badges.append("🔥 Week Warrior")
-            st.success("Achievement Unlocked: 🔥 Week Warrior (7-day streak)")
-    
-    def _update_study_streak(self):
-        """Update study streak based on activity"""
-        today = datetime.now().date()
-        last_activity = st.session_state.user_data.get('last_activity')
-        
-        if last_activity:
-            last_date = datetime.fromisoformat(last_activity).date()
-            days_diff = (today - last_date).days
-            
-            if days_diff == 1:
-                # Consecutive day
-                st.session_state.user_data['study_streaks'] += 1
-            elif days_diff > 1:
-                # Streak broken
-                st.session_state.user_data['study_streaks'] = 1
-        else:
-            # First activity
-            st.session_state.user_data['study_streaks'] = 1
-        
-        st.session_state.user_data['last_activity'] = today.isoformat()
+    def _check_achievements(self, event_type: str):
+        """Evaluate the badge rule table against the counters changed by `event_type`"""
+        user_data = st.session_state.user_data
+        badge_set = st.session_state.badge_set
+        changed = self.achievement_engine.changed_counters(event_type)
+        
+        cursors = st.session_state.achievement_cursors
+        
+        for rule in self.achievement_engine.evaluate(user_data, changed, badge_set, cursors):
+            badge_set.add(rule['badge'])
+            self._emit(BADGE_AWARDED, {'badge': rule['badge']})
+            st.success(f"Achievement Unlocked: {rule['badge']} ({rule['description']})")
     
     def _get_recent_activity(self) -> List[Dict]:
         """Get recent user activity"""
@@ -230,17 +413,80 @@ class DataManager:
             'user_data': st.session_state.user_data,
             'quiz_history': st.session_state.quiz_history,
             'study_plan': st.session_state.study_plan,
+            'response_log': self.adaptive_store.responses(st.session_state.user_id),
+            'review_items': self.review_store.cards(st.session_state.user_id),
             'export_date': datetime.now().isoformat()
         }
-        return json.dumps(export_data, indent=2)
+        return json.dumps(export_data, indent=2, default=str)
+    
+    def export_user_data_stream(self, compression: Optional[str] = None) -> Iterator[bytes]:
+        """Stream user data as NDJSON (one record per line), optionally 'gzip' or 'zstd' compressed"""
+        records = iter_export_records(
+            self._get_state(),
+            user_id=st.session_state.user_id,
+            response_log=self.adaptive_store.responses(st.session_state.user_id),
+            review_items=self.review_store.cards(st.session_state.user_id)
+        )
+        return iter_ndjson(records, compression)
+    
+    def import_user_data_stream(self, stream: Union[IO[bytes], bytes], batch_size: int = 500) -> Dict[str, Any]:
+        """Merge an NDJSON export into the current user's data.
+        
+        Records are validated line by line and applied in batches of `batch_size` events, so the
+        file is never held in memory whole (the merged history itself is kept, as for any save).
+        Quiz, mock exam and interview attempts are merged by attempt id, which makes re-running an
+        interrupted import safe.
+        """
+        review_items = self.review_store.cards(st.session_state.user_id)
+        merger = ImportMerger(
+            self._get_state(),
+            st.session_state.badge_set,
+            import_responses=True,
+            review_items=review_items
+        )
+        known_reviews = set(review_items)
+        
+        try:
+            for batch in iter_batches(iter_import_records(stream), batch_size):
+                # The merger reads the live state, so apply each batch before merging the next
+                self._emit_batch([event for event in map(merger.merge, batch) if event])
+                responses = merger.take_responses()
+                merger.count_responses(self.adaptive_store.add_responses(st.session_state.user_id, responses),
+                                       len(responses))
+        except (RecordValidationError, ValueError, OSError) as e:
+            merger.summary['error'] = str(e)
+            st.error(f"Error importing data: {str(e)}")
+        
+        new_reviews = [(qid, card) for qid, card in review_items.items() if qid not in known_reviews]
+        if new_reviews:
+            self.review_store.save(st.session_state.user_id, new_reviews)
+            # The review scheduler reloads its cards and due-time heap from the store
+            st.session_state.pop('review_items', None)
+        
+        self._check_achievements(STATE_IMPORTED)
+        return merger.summary
     
     def import_user_data(self, data_json: str) -> bool:
         """Import user data from JSON string"""
         try:
             data = json.loads(data_json)
-            st.session_state.user_data = data.get('user_data', {})
-            st.session_state.quiz_history = data.get('quiz_history', [])
-            st.session_state.study_plan = data.get('study_plan', {})
+            responses = [validate_record({'record': 'response', 'data': response}, number)['data']
+                         for number, response in enumerate(data.get('response_log', []), start=1)]
+            review_items = {qid: validate_record({'record': 'review_item', 'data': card}, number)['data']
+                            for number, (qid, card) in enumerate(data.get('review_items', {}).items(), start=1)}
+            # Recorded as one event carrying the full imported state
+            self._emit(STATE_IMPORTED, {
+                'user_data': data.get('user_data', {}),
+                'quiz_history': data.get('quiz_history', []),
+                'study_plan': data.get('study_plan', {})
+            })
+            st.session_state.badge_set = set(st.session_state.user_data['badges'])
+            st.session_state.achievement_cursors = {}
+            self._check_achievements(STATE_IMPORTED)
+            self.adaptive_store.add_responses(st.session_state.user_id, responses)
+            self.review_store.replace_user(st.session_state.user_id, review_items)
+            # The review scheduler reloads its cards and due-time heap from the store
+            st.session_state.pop('review_items', None)
             return True
         except Exception as e:
             st.error(f"Error importing data: {str(e)}")
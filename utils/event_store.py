@@ -0,0 +1,322 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+from utils.activity_calendar import ActivityCalendar
+from utils.interview_stats import InterviewStats
+
+# Event types recorded in the activity log
+PROFILE_UPDATED = 'ProfileUpdated'
+QUIZ_COMPLETED = 'QuizCompleted'
+INTERVIEW_COMPLETED = 'InterviewCompleted'
+MOCK_EXAM_COMPLETED = 'MockExamCompleted'
+CURRENT_AFFAIRS_COMPLETED = 'CurrentAffairsCompleted'
+ACTIVITY_RECORDED = 'ActivityRecorded'
+BADGE_AWARDED = 'BadgeAwarded'
+STUDY_PLAN_GENERATED = 'StudyPlanGenerated'
+ABILITY_UPDATED = 'AbilityUpdated'
+STATE_IMPORTED = 'StateImported'
+
+DEFAULT_DB_PATH = os.getenv('APP_DB_PATH', os.path.join('data', 'app.db'))
+
+logger = logging.getLogger(__name__)
+
+def empty_state() -> Dict[str, Any]:
+    """Initial state for a user with no events"""
+    return {
+        'user_data': {
+            'name': '',
+            'exam_type': '',
+            'target_date': None,
+            'study_hours_per_day': 2,
+            'quiz_scores': [],
+            'study_streaks': 0,
+            'badges': [],
+            'total_points': 0,
+            'last_activity': None,
+            'topics_studied': {},
+            'interview_scores': [],
+            'mock_exams': [],
+            'current_affairs_score': 0,
+            'ability': {},
+            'counters': {'perfect_scores': 0, 'current_affairs_quizzes': 0}
+        },
+        'quiz_history': [],
+        'study_plan': {}
+    }
+
+def make_event(event_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build an event with a timestamp"""
+    return {'type': event_type, 'ts': datetime.now().isoformat(), 'data': data}
+
+def event_day(event: Dict) -> date:
+    """Day an event counts for: results carry their own date (imports replay old attempts), else the event time"""
+    return datetime.fromisoformat(event['data'].get('date') or event['ts']).date()
+
+def _apply_profile_updated(state: Dict, event: Dict):
+    data = dict(event['data'])
+    if data.get('target_date'):
+        data['target_date'] = date.fromisoformat(data['target_date'])
+    state['user_data'].update(data)
+
+def _apply_quiz_completed(state: Dict, event: Dict):
+    result = event['data']
+    user_data = state['user_data']
+    state['quiz_history'].append(result)
+    user_data['quiz_scores'].append(result['percentage'])
+    user_data['total_points'] += result['points_earned']
+    user_data['topics_studied'].setdefault(result['topic'], []).append(result['percentage'])
+    if result['percentage'] == 100:
+        user_data['counters']['perfect_scores'] += 1
+    ActivityCalendar(user_data).mark('quiz', event_day(event))
+
+def _apply_interview_completed(state: Dict, event: Dict):
+    user_data = state['user_data']
+    # Built before the append, so a rollup created here from older results does not count this one twice
+    stats = InterviewStats(user_data)
+    user_data['interview_scores'].append(event['data'])
+    stats.add(event['data'])
+    user_data['total_points'] += event['data']['points_earned']
+    ActivityCalendar(user_data).mark('interview', event_day(event))
+
+def _apply_mock_exam_completed(state: Dict, event: Dict):
+    # One exam is one attempt: it is kept apart from quiz history, so quiz counts and averages are untouched
+    result = event['data']
+    user_data = state['user_data']
+    user_data.setdefault('mock_exams', []).append(result)
+    user_data['total_points'] += result['points_earned']
+    for section in result['sections']:
+        user_data['topics_studied'].setdefault(section['topic'], []).append(section['percentage'])
+    ActivityCalendar(user_data).mark('quiz', event_day(event))
+
+def _apply_current_affairs_completed(state: Dict, event: Dict):
+    user_data = state['user_data']
+    user_data['current_affairs_score'] = user_data.get('current_affairs_score', 0) + event['data']['points_earned']
+    user_data['total_points'] += event['data']['points_earned']
+    user_data['counters']['current_affairs_quizzes'] += 1
+    ActivityCalendar(user_data).mark('current_affairs', event_day(event))
+
+def _apply_activity_recorded(state: Dict, event: Dict):
+    ActivityCalendar(state['user_data']).mark(event['data']['kind'], event_day(event))
+
+def _apply_badge_awarded(state: Dict, event: Dict):
+    # The achievement engine never awards a badge twice, so this is a plain append
+    state['user_data']['badges'].append(event['data']['badge'])
+
+def _apply_study_plan_generated(state: Dict, event: Dict):
+    state['study_plan'] = event['data']['plan']
+
+def _apply_ability_updated(state: Dict, event: Dict):
+    state['user_data'].setdefault('ability', {})[event['data']['topic']] = float(event['data']['ability'])
+
+def _apply_state_imported(state: Dict, event: Dict):
+    imported = restore_state(event['data'])
+    state.clear()
+    state.update(imported)
+
+_REDUCERS = {
+    PROFILE_UPDATED: _apply_profile_updated,
+    QUIZ_COMPLETED: _apply_quiz_completed,
+    INTERVIEW_COMPLETED: _apply_interview_completed,
+    MOCK_EXAM_COMPLETED: _apply_mock_exam_completed,
+    CURRENT_AFFAIRS_COMPLETED: _apply_current_affairs_completed,
+    ACTIVITY_RECORDED: _apply_activity_recorded,
+    BADGE_AWARDED: _apply_badge_awarded,
+    STUDY_PLAN_GENERATED: _apply_study_plan_generated,
+    ABILITY_UPDATED: _apply_ability_updated,
+    STATE_IMPORTED: _apply_state_imported
+}
+
+def apply_event(state: Dict[str, Any], event: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply one event to the state in place and return it"""
+    reducer = _REDUCERS.get(event['type'])
+    if reducer:
+        reducer(state, event)
+    return state
+
+def validate_event(event: Dict[str, Any]):
+    """Raise ValueError if the event's reducer would fail on it.
+
+    Reducers only add to the state, so a dry run on an empty state exercises all of their parsing
+    (dates, required fields) without copying the user's state. Run before an event is appended:
+    a stored event that breaks its reducer would break every later rebuild.
+    """
+    try:
+        apply_event(empty_state(), event)
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        raise ValueError(f"Invalid {event.get('type')} event: {e!r}") from e
+
+def restore_state(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn JSON-decoded state back into the in-memory form"""
+    state = empty_state()
+    state['user_data'].update(data.get('user_data') or {})
+    state['quiz_history'] = list(data.get('quiz_history') or [])
+    state['study_plan'] = data.get('study_plan') or {}
+    imported = data.get('user_data') or {}
+    if 'counters' not in imported:
+        # Older exports have no counters; derive them from the stored history instead of keeping the zero defaults
+        state['user_data']['counters'] = {
+            'perfect_scores': sum(1 for score in state['user_data']['quiz_scores'] if score == 100),
+            'current_affairs_quizzes': 0
+        }
+    else:
+        state['user_data']['counters'] = {**empty_state()['user_data']['counters'], **imported['counters']}
+    target_date = state['user_data'].get('target_date')
+    if isinstance(target_date, str) and target_date:
+        state['user_data']['target_date'] = date.fromisoformat(target_date[:10])
+    return state
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+class EventStore:
+    """Append-only per-user event log with periodic state snapshots, backed by SQLite"""
+    
+    # Take a snapshot after this many events so replay stays bounded
+    SNAPSHOT_INTERVAL = 50
+    
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        if db_path != ':memory:' and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self._create_tables()
+    
+    def _create_tables(self):
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS events (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    ts TEXT NOT NULL,
+                    data TEXT NOT NULL
+                )
+            """)
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_events_user_seq ON events (user_id, seq)')
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    user_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    state TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    PRIMARY KEY (user_id, seq)
+                )
+            """)
+    
+    def append(self, user_id: str, event: Dict[str, Any]) -> int:
+        """Append an event and return its sequence number"""
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                'INSERT INTO events (user_id, type, ts, data) VALUES (?, ?, ?, ?)',
+                (user_id, event['type'], event['ts'], _dumps(event['data']))
+            )
+            return cursor.lastrowid
+    
+    def append_many(self, user_id: str, events: List[Dict[str, Any]]) -> List[int]:
+        """Append several events in one transaction and return their sequence numbers"""
+        seqs = []
+        with self._lock, self.conn:
+            for event in events:
+                cursor = self.conn.execute(
+                    'INSERT INTO events (user_id, type, ts, data) VALUES (?, ?, ?, ?)',
+                    (user_id, event['type'], event['ts'], _dumps(event['data']))
+                )
+                seqs.append(cursor.lastrowid)
+        return seqs
+    
+    def bulk_write(self, batch: List[Tuple[str, List[Dict[str, Any]], Dict[str, Any]]]) -> int:
+        """Append events and a fresh snapshot for many users in one transaction.
+
+        `batch` holds (user_id, events, state after those events). Returns the number of events written.
+        """
+        written = 0
+        now = datetime.now().isoformat()
+        with self._lock, self.conn:
+            for user_id, events, state in batch:
+                last_seq = None
+                for event in events:
+                    cursor = self.conn.execute(
+                        'INSERT INTO events (user_id, type, ts, data) VALUES (?, ?, ?, ?)',
+                        (user_id, event['type'], event['ts'], _dumps(event['data']))
+                    )
+                    last_seq = cursor.lastrowid
+                    written += 1
+                if last_seq is not None:
+                    self.conn.execute(
+                        'INSERT OR REPLACE INTO snapshots (user_id, seq, state, created_at) VALUES (?, ?, ?, ?)',
+                        (user_id, last_seq, _dumps(state), now)
+                    )
+                    self.conn.execute('DELETE FROM snapshots WHERE user_id = ? AND seq < ?', (user_id, last_seq))
+        return written
+    
+    def user_ids(self) -> List[str]:
+        """All users with at least one event"""
+        with self._lock:
+            return [row[0] for row in self.conn.execute('SELECT DISTINCT user_id FROM events ORDER BY user_id')]
+    
+    def save_snapshot(self, user_id: str, seq: int, state: Dict[str, Any]):
+        """Store the state as of event `seq` and drop older snapshots"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO snapshots (user_id, seq, state, created_at) VALUES (?, ?, ?, ?)',
+                (user_id, seq, _dumps(state), datetime.now().isoformat())
+            )
+            self.conn.execute('DELETE FROM snapshots WHERE user_id = ? AND seq < ?', (user_id, seq))
+    
+    def latest_snapshot(self, user_id: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        """Latest snapshot state and its sequence number (None, 0 when there is none)"""
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT seq, state FROM snapshots WHERE user_id = ? ORDER BY seq DESC LIMIT 1', (user_id,)
+            ).fetchone()
+        if not row:
+            return None, 0
+        return json.loads(row[1]), row[0]
+    
+    def events_since(self, user_id: str, seq: int = 0) -> List[Dict[str, Any]]:
+        """Events for a user after sequence number `seq`, in order"""
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT seq, type, ts, data FROM events WHERE user_id = ? AND seq > ? ORDER BY seq',
+                (user_id, seq)
+            ).fetchall()
+        return [{'seq': r[0], 'type': r[1], 'ts': r[2], 'data': json.loads(r[3])} for r in rows]
+    
+    def rebuild(self, user_id: str) -> Tuple[Dict[str, Any], int, int]:
+        """Rebuild state from the latest snapshot plus the log tail.
+
+        Returns the state, the last applied sequence number and the number of events replayed.
+        """
+        snapshot, snapshot_seq = self.latest_snapshot(user_id)
+        state = restore_state(snapshot) if snapshot else empty_state()
+        tail = self.events_since(user_id, snapshot_seq)
+        
+        for event in tail:
+            # Events stored before appends were validated may not apply; skip them rather than lock the user out
+            try:
+                validate_event(event)
+            except ValueError as e:
+                logger.warning("Skipping event %s for user %s: %s", event['seq'], user_id, e)
+                continue
+            apply_event(state, event)
+        
+        return state, tail[-1]['seq'] if tail else snapshot_seq, len(tail)
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def get_event_store() -> EventStore:
+    """Process-wide event store"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = EventStore()
+        return _default_store
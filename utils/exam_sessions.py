@@ -0,0 +1,215 @@
+import atexit
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Any, Optional, Tuple
+
+from utils.event_store import DEFAULT_DB_PATH
+
+# Session kinds
+MOCK_EXAM = 'mock_exam'
+QUIZ = 'quiz'
+INTERVIEW = 'interview'
+
+ACTIVE = 'active'
+SUBMITTED = 'submitted'
+ABANDONED = 'abandoned'
+
+# Buffered answers are written at least this often, or as soon as this many are waiting
+FLUSH_INTERVAL = 1.0
+FLUSH_BATCH = 50
+
+# Answers arriving shortly after the deadline were given in time but delayed in transit
+GRACE_SECONDS = 5
+
+logger = logging.getLogger(__name__)
+
+class ExamSessionStore:
+    """Timed attempts kept on the server: deadlines, autosaved answers and resume after a reconnect.
+
+    Each answer is saved as one (session, item) row, so a write is the same small size whatever the
+    length of the paper. Answers are buffered and written in batches; the buffer keeps only the latest
+    answer per item.
+    """
+    
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        if db_path != ':memory:' and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, int], Tuple[str, float]] = {}
+        self._deadlines: Dict[str, Optional[float]] = {}
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self._lock, self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS exam_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    started_at REAL NOT NULL,
+                    deadline REAL,
+                    status TEXT NOT NULL,
+                    finished_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_exam_sessions_user ON exam_sessions (user_id, kind, status);
+                CREATE TABLE IF NOT EXISTS exam_answers (
+                    session_id TEXT NOT NULL,
+                    item INTEGER NOT NULL,
+                    answer TEXT NOT NULL,
+                    saved_at REAL NOT NULL,
+                    PRIMARY KEY (session_id, item)
+                ) WITHOUT ROWID;
+            """)
+    
+    def start(self, user_id: str, kind: str, state: Dict[str, Any],
+              time_limit: Optional[float] = None) -> Dict[str, Any]:
+        """Open a new attempt, abandoning the user's unfinished one of the same kind"""
+        now = time.time()
+        session = {
+            'id': uuid.uuid4().hex,
+            'kind': kind,
+            'state': state,
+            'started_at': now,
+            'deadline': now + time_limit if time_limit else None,
+            'answers': {}
+        }
+        with self._lock, self.conn:
+            self.conn.execute(
+                'UPDATE exam_sessions SET status = ?, finished_at = ? WHERE user_id = ? AND kind = ? AND status = ?',
+                (ABANDONED, now, user_id, kind, ACTIVE)
+            )
+            self.conn.execute(
+                'INSERT INTO exam_sessions (session_id, user_id, kind, state, started_at, deadline, status) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (session['id'], user_id, kind, json.dumps(state, ensure_ascii=False), now, session['deadline'], ACTIVE)
+            )
+            self._deadlines[session['id']] = session['deadline']
+        return session
+    
+    def record(self, session_id: str, item: int, answer: Any) -> bool:
+        """Buffer an answer for autosave; answers after the deadline are refused"""
+        now = time.time()
+        with self._lock:
+            if session_id not in self._deadlines:
+                row = self.conn.execute(
+                    'SELECT deadline FROM exam_sessions WHERE session_id = ? AND status = ?', (session_id, ACTIVE)
+                ).fetchone()
+                if row is None:
+                    return False
+                self._deadlines[session_id] = row[0]
+            deadline = self._deadlines[session_id]
+            if deadline is not None and now > deadline + GRACE_SECONDS:
+                return False
+            self._pending[(session_id, item)] = (json.dumps(answer, ensure_ascii=False), now)
+            full = len(self._pending) >= FLUSH_BATCH
+        if full:
+            self.flush()
+        return True
+    
+    def flush(self) -> int:
+        """Write buffered answers in one transaction; if the write fails they stay buffered for the next flush"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            try:
+                with self.conn:
+                    self.conn.executemany(
+                        'INSERT INTO exam_answers (session_id, item, answer, saved_at) VALUES (?, ?, ?, ?) '
+                        'ON CONFLICT (session_id, item) DO UPDATE SET answer = excluded.answer, saved_at = excluded.saved_at',
+                        [(session_id, item, answer, saved_at) for (session_id, item), (answer, saved_at) in pending.items()]
+                    )
+            except sqlite3.Error:
+                self._pending = pending
+                raise
+        return len(pending)
+    
+    def resume(self, user_id: str, kind: str) -> Optional[Dict[str, Any]]:
+        """The user's unfinished attempt of a kind with its saved answers, if there is one"""
+        self.flush()
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT session_id, state, started_at, deadline FROM exam_sessions '
+                'WHERE user_id = ? AND kind = ? AND status = ? ORDER BY started_at DESC LIMIT 1',
+                (user_id, kind, ACTIVE)
+            ).fetchone()
+            if row is None:
+                return None
+            session_id, state, started_at, deadline = row
+            answers = self.conn.execute(
+                'SELECT item, answer FROM exam_answers WHERE session_id = ?', (session_id,)
+            ).fetchall()
+            self._deadlines[session_id] = deadline
+        return {
+            'id': session_id,
+            'kind': kind,
+            'state': json.loads(state),
+            'started_at': started_at,
+            'deadline': deadline,
+            'answers': {item: json.loads(answer) for item, answer in answers}
+        }
+    
+    def finish(self, session_id: str, status: str = SUBMITTED) -> float:
+        """Close an attempt once its answers are saved; returns the finishing time, capped at the deadline"""
+        self.flush()
+        now = time.time()
+        with self._lock, self.conn:
+            deadline = self._deadlines.pop(session_id, None)
+            finished_at = min(now, deadline) if deadline else now
+            self.conn.execute(
+                'UPDATE exam_sessions SET status = ?, finished_at = ? WHERE session_id = ? AND status = ?',
+                (status, finished_at, session_id, ACTIVE)
+            )
+        return finished_at
+    
+    def active_count(self, kind: Optional[str] = None) -> int:
+        with self._lock:
+            if kind:
+                return self.conn.execute('SELECT COUNT(*) FROM exam_sessions WHERE status = ? AND kind = ?',
+                                         (ACTIVE, kind)).fetchone()[0]
+            return self.conn.execute('SELECT COUNT(*) FROM exam_sessions WHERE status = ?', (ACTIVE,)).fetchone()[0]
+    
+    def start_flusher(self, interval: float = FLUSH_INTERVAL) -> threading.Thread:
+        """Write buffered answers every interval from a daemon thread, so autosave needs no rerun"""
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.flush()
+                except sqlite3.Error:
+                    logger.exception("Autosave failed; %d answers kept for the next attempt", len(self._pending))
+        
+        thread = threading.Thread(target=loop, name='exam-autosave', daemon=True)
+        thread.start()
+        return thread
+
+def time_left(session: Dict[str, Any]) -> float:
+    """Seconds until a session's deadline (negative once past), or infinity when untimed"""
+    if session.get('deadline') is None:
+        return math.inf
+    return session['deadline'] - time.time()
+
+def ordered_answers(answers: Dict[int, Any]) -> List[Any]:
+    """Saved answers of a sequential session, in the order they were given"""
+    return [answers[item] for item in sorted(answers)]
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def get_exam_sessions() -> ExamSessionStore:
+    """Process-wide exam session store with its autosave thread running"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ExamSessionStore()
+            _default_store.start_flusher()
+            atexit.register(_default_store.flush)
+        return _default_store
@@ -0,0 +1,95 @@
+import json
+import os
+import random
+import threading
+from collections import defaultdict
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+DEFAULT_BANK_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'datasets',
+                                 'interview_questions.jsonl')
+
+# Topic used when the dataset has no questions for the requested one
+FALLBACK_TOPIC = 'Personal Background'
+
+DIFFICULTY_LEVELS = range(1, 6)
+
+REQUIRED_FIELDS = ('id', 'language', 'topic', 'interview_type', 'difficulty', 'question')
+
+class InterviewQuestionBank:
+    """Interview questions indexed by (language, topic, interview_type, difficulty)"""
+    
+    def __init__(self, questions: Iterable[Dict[str, Any]]):
+        self._index: Dict[Tuple[str, str, str, int], List[Dict[str, Any]]] = defaultdict(list)
+        self._types: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+        self._ids = set()
+        for question in questions:
+            self.add(question)
+    
+    @classmethod
+    def from_file(cls, path: str) -> 'InterviewQuestionBank':
+        """Load a JSON Lines dataset, one question per line"""
+        questions = []
+        with open(path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                question = json.loads(line)
+                missing = [field for field in REQUIRED_FIELDS if field not in question]
+                if missing:
+                    raise ValueError(f"{path}:{line_number}: missing {', '.join(missing)}")
+                questions.append(question)
+        return cls(questions)
+    
+    def add(self, question: Dict[str, Any]) -> bool:
+        """Add one question; a question whose id is already present is skipped"""
+        if question['id'] in self._ids:
+            return False
+        self._ids.add(question['id'])
+        language, topic, interview_type = question['language'], question['topic'], question['interview_type']
+        self._index[(language, topic, interview_type, int(question['difficulty']))].append(question)
+        if interview_type not in self._types[(language, topic)]:
+            self._types[(language, topic)].append(interview_type)
+        return True
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def select(self, language: str, topic: str, interview_type: str, difficulty: int, count: int,
+               exclude: Iterable[str] = ()) -> List[Dict[str, Any]]:
+        """Random questions for an interview, easiest first.
+
+        Questions of the requested type nearest the requested difficulty are preferred, then other types.
+        Excluded (already answered) questions are only reused once everything else is taken.
+        """
+        language = 'hi' if language == 'hi' else 'en'
+        if (language, topic) not in self._types:
+            topic = FALLBACK_TOPIC
+        exclude = set(exclude)
+        types = [interview_type] + [t for t in self._types.get((language, topic), []) if t != interview_type]
+        levels = sorted(DIFFICULTY_LEVELS, key=lambda level: (abs(level - difficulty), level))
+        
+        chosen, chosen_ids = [], set()
+        for allow_seen in (False, True):
+            for question_type in types:
+                for level in levels:
+                    bucket = [q for q in self._index.get((language, topic, question_type, level), ())
+                              if q['id'] not in chosen_ids and (allow_seen or q['id'] not in exclude)]
+                    for question in random.sample(bucket, min(len(bucket), count - len(chosen))):
+                        chosen.append(question)
+                        chosen_ids.add(question['id'])
+                    if len(chosen) == count:
+                        return sorted(chosen, key=lambda q: q['difficulty'])
+        return sorted(chosen, key=lambda q: q['difficulty'])
+
+_default_bank = None
+_default_bank_lock = threading.Lock()
+
+def get_interview_bank(path: Optional[str] = None) -> InterviewQuestionBank:
+    """Process-wide interview question bank, loaded once from INTERVIEW_QUESTIONS_FILE or the bundled dataset"""
+    global _default_bank
+    with _default_bank_lock:
+        if _default_bank is None:
+            _default_bank = InterviewQuestionBank.from_file(
+                path or os.getenv('INTERVIEW_QUESTIONS_FILE') or DEFAULT_BANK_PATH
+            )
+        return _default_bank
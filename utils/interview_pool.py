@@ -0,0 +1,189 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Callable, Iterable, Optional, Tuple
+
+from utils.event_store import DEFAULT_DB_PATH
+from utils.search_index import question_ref
+
+# Questions kept per (exam type, topic, interview type, difficulty, language) pool
+POOL_TARGET = 30
+
+# Upper bound a pool may grow to when users keep exhausting it
+MAX_POOL_SIZE = 200
+
+# Questions requested from the model per call
+GENERATION_BATCH = 10
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, str, str, int, str]
+
+def pool_key(exam_type: str, topic: str, interview_type: str, difficulty: int, language: str) -> PoolKey:
+    return (exam_type or 'Other', topic, interview_type, int(difficulty), 'hi' if language == 'hi' else 'en')
+
+def valid_interview_question(question: Dict[str, Any]) -> bool:
+    key_points = question.get('key_points', [])
+    return bool(str(question.get('question', '')).strip()) and isinstance(key_points, list)
+
+class InterviewQuestionPool:
+    """AI-generated interview questions per pool, stored once per distinct question"""
+    
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        if db_path != ':memory:' and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self._lock, self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS interview_questions (
+                    id TEXT PRIMARY KEY,
+                    exam_type TEXT NOT NULL,
+                    topic TEXT NOT NULL,
+                    interview_type TEXT NOT NULL,
+                    difficulty INTEGER NOT NULL,
+                    language TEXT NOT NULL,
+                    question TEXT NOT NULL,
+                    key_points TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_interview_questions_pool
+                    ON interview_questions (exam_type, topic, interview_type, difficulty, language);
+            """)
+    
+    def add(self, key: PoolKey, questions: Iterable[Dict[str, Any]]) -> int:
+        """Store generated questions in a pool; repeats of a stored question are skipped"""
+        now = datetime.now().isoformat()
+        rows = [
+            # Ids are content hashes so a reworded-only-in-punctuation repeat is caught too
+            ('ai-' + question_ref(question['question'])[:20], *key, question['question'].strip(),
+             json.dumps([str(point) for point in question.get('key_points', [])], ensure_ascii=False), now)
+            for question in questions if valid_interview_question(question)
+        ]
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO interview_questions (id, exam_type, topic, interview_type, difficulty, '
+                'language, question, key_points, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            return self.conn.total_changes - before
+    
+    def sample(self, key: PoolKey, count: int, exclude: Iterable[str] = ()) -> List[Dict[str, Any]]:
+        """Random questions from a pool, skipping excluded ids"""
+        exclude = list(exclude)
+        params: List[Any] = list(key)
+        clause = ''
+        if exclude:
+            clause = f" AND id NOT IN ({','.join('?' * len(exclude))})"
+            params.extend(exclude)
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT id, question, key_points FROM interview_questions WHERE exam_type = ? AND topic = ? '
+                f'AND interview_type = ? AND difficulty = ? AND language = ?{clause} ORDER BY RANDOM() LIMIT ?',
+                params + [count]
+            ).fetchall()
+        exam_type, topic, interview_type, difficulty, language = key
+        return [{
+            'id': question_id,
+            'language': language,
+            'topic': topic,
+            'interview_type': interview_type,
+            'difficulty': difficulty,
+            'question': question,
+            'key_points': json.loads(key_points)
+        } for question_id, question, key_points in rows]
+    
+    def size(self, key: PoolKey) -> int:
+        with self._lock:
+            return self.conn.execute(
+                'SELECT COUNT(*) FROM interview_questions WHERE exam_type = ? AND topic = ? AND interview_type = ? '
+                'AND difficulty = ? AND language = ?', key
+            ).fetchone()[0]
+
+class InterviewPoolFiller:
+    """Tops up pools from a background thread, so the model is never called while a user waits.
+    
+    The AI services are looked up through `ai_services_provider` for every request and fill, so a client
+    released and rebuilt after the filler was created is picked up.
+    """
+    
+    def __init__(self, pool: InterviewQuestionPool, ai_services_provider: Callable[[], Any]):
+        self.pool = pool
+        self.ai_services_provider = ai_services_provider
+        self._queue: 'queue.Queue[Tuple[PoolKey, bool]]' = queue.Queue()
+        self._queued = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    def request(self, key: PoolKey, grow: bool = False):
+        """Queue a top-up; grow adds a batch beyond the target for users who have seen the whole pool"""
+        if not getattr(self.ai_services_provider(), 'client', None):
+            return
+        with self._lock:
+            if key in self._queued:
+                return
+            self._queued.add(key)
+            self._queue.put((key, grow))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='interview-pool', daemon=True)
+                self._thread.start()
+    
+    def fill(self, key: PoolKey, grow: bool = False) -> int:
+        """Generate batches until the pool reaches its target; returns the number of questions added"""
+        exam_type, topic, interview_type, difficulty, language = key
+        ai_services = self.ai_services_provider()
+        size = self.pool.size(key)
+        target = min(max(POOL_TARGET, size + GENERATION_BATCH) if grow else POOL_TARGET, MAX_POOL_SIZE)
+        added = 0
+        while size < target:
+            questions = ai_services.generate_interview_questions(
+                exam_type, topic, interview_type, difficulty, language, GENERATION_BATCH
+            )
+            new = self.pool.add(key, questions)
+            if not new:
+                # The model is only repeating stored questions; try again on a later request
+                break
+            added += new
+            size += new
+        return added
+    
+    def _run(self):
+        while True:
+            key, grow = self._queue.get()
+            try:
+                self.fill(key, grow)
+            except Exception:
+                # A failed call leaves the pool as it was; the next low pool request retries
+                logger.exception("Filling interview question pool %s failed", key)
+            finally:
+                with self._lock:
+                    self._queued.discard(key)
+
+_default_pool = None
+_default_filler = None
+_default_lock = threading.Lock()
+
+def get_interview_pool() -> InterviewQuestionPool:
+    """Process-wide AI interview question pool"""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = InterviewQuestionPool()
+        return _default_pool
+
+def get_interview_pool_filler(ai_services_provider: Callable[[], Any]) -> InterviewPoolFiller:
+    """Process-wide pool filler; `ai_services_provider` (e.g. utils.services.get_ai_services) is called per fill"""
+    global _default_filler
+    pool = get_interview_pool()
+    with _default_lock:
+        if _default_filler is None:
+            _default_filler = InterviewPoolFiller(pool, ai_services_provider)
+        return _default_filler
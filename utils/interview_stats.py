@@ -0,0 +1,111 @@
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
+
+import streamlit as st
+
+# Words of improvement advice that say how, not what; they would top every theme count
+THEME_FILLER_WORDS = [
+    'more', 'less', 'use', 'make', 'try', 'be', 'your', 'you', 'own', 'answer', 'response', 'it', 'add', 'give',
+    'bring', 'avoid', 'same', 'into', 'than', 'instead', 'also', 'should', 'could', 'need', 'needs', 'further',
+    'करें', 'दें', 'अधिक', 'उत्तर', 'अपने', 'अपना', 'अपनी', 'एक', 'ही', 'और', 'बचें', 'लिखें', 'जोड़ें', 'रहें'
+]
+
+def theme_terms(text: str) -> List[str]:
+    """Stemmed terms of an improvement suggestion, the same way answers are matched against rubrics"""
+    # Imported here: the scorer's imports lead back to the event store, which imports this module
+    from utils.answer_scorer import match_terms
+    return match_terms(text)
+
+@lru_cache(maxsize=1)
+def _filler_terms() -> frozenset:
+    return frozenset(term for word in THEME_FILLER_WORDS for term in theme_terms(word))
+
+class InterviewStats:
+    """Per-user interview rollup kept in user_data and updated as each interview is saved.
+
+    - series: one point per interview (date, topic, score, mean per-dimension scores, mean seconds per answer)
+    - themes: term frequencies over all improvement suggestions, with a readable phrase per term
+    The analytics view reads only this rollup, never the per-question feedback history.
+    """
+    
+    def __init__(self, user_data: Optional[Dict] = None):
+        self.user_data = user_data if user_data is not None else st.session_state.user_data
+        self.initialize_session_state()
+    
+    def initialize_session_state(self):
+        """Create the rollup inside user_data if it doesn't exist, folding in interviews saved before it did"""
+        user_data = self.user_data
+        if 'interview_stats' not in user_data:
+            user_data['interview_stats'] = {'series': [], 'themes': {}, 'theme_labels': {},
+                                            'answers': 0, 'answer_seconds': 0.0}
+            self.stats = user_data['interview_stats']
+            for result in user_data.get('interview_scores', []):
+                self.add(result)
+        self.stats = user_data['interview_stats']
+    
+    def add(self, result: Dict[str, Any]):
+        """Fold one saved interview result into the rollup"""
+        stats = self.stats
+        answers = [answer for answer in result.get('answers', []) if not answer.get('skipped')]
+        
+        dimensions = defaultdict(list)
+        seconds = []
+        for answer in answers:
+            for name, value in (answer.get('dimensions') or {}).items():
+                dimensions[name].append(value)
+            if answer.get('seconds') is not None:
+                seconds.append(answer['seconds'])
+            for improvement in answer.get('improvements', []):
+                self._add_theme(str(improvement))
+        
+        stats['series'].append({
+            'date': result['date'],
+            'topic': result['topic'],
+            'score': result['score'],
+            'dimensions': {name: sum(values) / len(values) for name, values in dimensions.items()},
+            'seconds': sum(seconds) / len(seconds) if seconds else None
+        })
+        stats['answers'] += len(seconds)
+        stats['answer_seconds'] += sum(seconds)
+    
+    def _add_theme(self, improvement: str):
+        # Each suggestion counts once per term, however often the term repeats inside it
+        for term in set(theme_terms(improvement)) - _filler_terms():
+            self.stats['themes'][term] = self.stats['themes'].get(term, 0) + 1
+            self.stats['theme_labels'].setdefault(term, improvement)
+    
+    def topic_trends(self) -> Dict[str, List[Tuple[str, float]]]:
+        """(date, score) per interview, by topic"""
+        trends = defaultdict(list)
+        for point in self.stats['series']:
+            trends[point['topic']].append((point['date'], point['score']))
+        return dict(trends)
+    
+    def dimension_series(self) -> Dict[str, List[Tuple[str, float]]]:
+        """(date, mean score) per interview for each answer dimension (length, coverage, ...)"""
+        series = defaultdict(list)
+        for point in self.stats['series']:
+            for name, value in point['dimensions'].items():
+                series[name].append((point['date'], value))
+        return dict(series)
+    
+    def answer_time_series(self) -> List[Tuple[str, float]]:
+        """(date, mean seconds per answer) per interview with timing data"""
+        return [(point['date'], point['seconds']) for point in self.stats['series'] if point['seconds'] is not None]
+    
+    def average_answer_seconds(self) -> Optional[float]:
+        return self.stats['answer_seconds'] / self.stats['answers'] if self.stats['answers'] else None
+    
+    def top_themes(self, k: int = 8) -> List[Tuple[str, int]]:
+        """Most frequent improvement themes as (example suggestion, count)"""
+        top, labels = [], set()
+        # Terms from the same suggestion share its label; the most frequent term speaks for it
+        for term, count in sorted(self.stats['themes'].items(), key=lambda item: (-item[1], item[0])):
+            label = self.stats['theme_labels'][term]
+            if label not in labels:
+                labels.add(label)
+                top.append((label, count))
+                if len(top) == k:
+                    break
+        return top
@@ -18,6 +18,8 @@ class LanguageManager:
                 'analytics': 'Analytics',
                 'mock_interview': 'Mock Interview',
                 'current_affairs': 'Current Affairs',
+                'leaderboard': 'Leaderboard',
+                'mock_exam': 'Mock Exam',
                 
                 # Profile
                 'profile_setup': 'Profile Setup',
@@ -125,6 +127,8 @@ class LanguageManager:
                 'analytics': 'विश्लेषण',
                 'mock_interview': 'मॉक इंटरव्यू',
                 'current_affairs': 'समसामयिकी',
+                'leaderboard': 'लीडरबोर्ड',
+                'mock_exam': 'मॉक परीक्षा',
                 
                 # Profile
                 'profile_setup': 'प्रोफाइल सेटअप',
@@ -233,7 +237,9 @@ class LanguageManager:
             self.get_text('study_plan', language): 'study_plan',
             self.get_text('analytics', language): 'analytics',
             self.get_text('mock_interview', language): 'mock_interview',
-            self.get_text('current_affairs', language): 'current_affairs'
+            self.get_text('current_affairs', language): 'current_affairs',
+            self.get_text('leaderboard', language): 'leaderboard',
+            self.get_text('mock_exam', language): 'mock_exam'
         }
     
     def get_exam_types(self, language: str = 'en') -> Dict[str, str]:
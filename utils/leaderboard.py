@@ -0,0 +1,387 @@
+import os
+import random
+import sqlite3
+import threading
+from datetime import date, datetime
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+from utils.cohort_analytics import week_start
+from utils.event_store import DEFAULT_DB_PATH, event_day
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+WINDOWS = ['daily', 'weekly', 'all_time']
+
+# Seconds to keep finished daily/weekly boards in Redis
+WINDOW_TTL = {'daily': 2 * 86400, 'weekly': 15 * 86400}
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+    
+    def __init__(self, key: Any, level: int):
+        self.key = key
+        self.next = [None] * level
+        # width[i] = how many positions the link next[i] skips
+        self.width = [1] * level
+
+class SkipList:
+    """Indexable skip list of unique, comparable keys.
+
+    Insert, remove, rank and positional lookup are O(log n) expected.
+    """
+    
+    MAX_LEVEL = 24
+    
+    def __init__(self):
+        self.head = _Node(None, self.MAX_LEVEL)
+        self.size = 0
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.MAX_LEVEL and random.random() < 0.5:
+            level += 1
+        return level
+    
+    def _find_chain(self, key: Any) -> Tuple[List[_Node], List[int]]:
+        """Last node before `key` on every level, and the steps taken on each level"""
+        chain = [None] * self.MAX_LEVEL
+        steps = [0] * self.MAX_LEVEL
+        node = self.head
+        for i in reversed(range(self.MAX_LEVEL)):
+            while node.next[i] is not None and node.next[i].key < key:
+                steps[i] += node.width[i]
+                node = node.next[i]
+            chain[i] = node
+        return chain, steps
+    
+    def insert(self, key: Any):
+        chain, steps_at_level = self._find_chain(key)
+        level = self._random_level()
+        new = _Node(key, level)
+        steps = 0
+        for i in range(level):
+            prev = chain[i]
+            new.next[i] = prev.next[i]
+            prev.next[i] = new
+            new.width[i] = prev.width[i] - steps
+            prev.width[i] = steps + 1
+            steps += steps_at_level[i]
+        for i in range(level, self.MAX_LEVEL):
+            chain[i].width[i] += 1
+        self.size += 1
+    
+    def remove(self, key: Any):
+        chain, _ = self._find_chain(key)
+        target = chain[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        for i in range(len(target.next)):
+            prev = chain[i]
+            prev.width[i] += target.width[i] - 1
+            prev.next[i] = target.next[i]
+        for i in range(len(target.next), self.MAX_LEVEL):
+            chain[i].width[i] -= 1
+        self.size -= 1
+    
+    def rank(self, key: Any) -> Optional[int]:
+        """0-based position of `key`, or None if it is not present"""
+        node = self.head
+        position = -1
+        for i in reversed(range(self.MAX_LEVEL)):
+            while node.next[i] is not None and node.next[i].key < key:
+                position += node.width[i]
+                node = node.next[i]
+        following = node.next[0]
+        return position + 1 if following is not None and following.key == key else None
+    
+    def iter_from(self, index: int) -> Iterator[Any]:
+        """Keys from position `index` onwards"""
+        if index < 0 or index >= self.size:
+            return
+        node = self.head
+        position = -1
+        for i in reversed(range(self.MAX_LEVEL)):
+            while node.next[i] is not None and position + node.width[i] <= index:
+                position += node.width[i]
+                node = node.next[i]
+        while node is not None:
+            yield node.key
+            node = node.next[0]
+
+class LocalSortedSets:
+    """In-process stand-in for the Redis sorted-set commands the leaderboard uses"""
+    
+    def __init__(self):
+        self._sets = {}
+    
+    def _get(self, name: str) -> Tuple[SkipList, Dict[str, float]]:
+        if name not in self._sets:
+            # Members are ordered by (-score, member) so position 0 is the highest score
+            self._sets[name] = (SkipList(), {})
+        return self._sets[name]
+    
+    def zincrby(self, name: str, amount: float, value: str) -> float:
+        ordered, scores = self._get(name)
+        old = scores.get(value)
+        if old is not None:
+            ordered.remove((-old, value))
+        new = (old or 0) + amount
+        scores[value] = new
+        ordered.insert((-new, value))
+        return new
+    
+    def zrem(self, name: str, value: str) -> int:
+        ordered, scores = self._get(name)
+        if value not in scores:
+            return 0
+        ordered.remove((-scores.pop(value), value))
+        return 1
+    
+    def zscore(self, name: str, value: str) -> Optional[float]:
+        return self._get(name)[1].get(value)
+    
+    def zrevrank(self, name: str, value: str) -> Optional[int]:
+        ordered, scores = self._get(name)
+        if value not in scores:
+            return None
+        return ordered.rank((-scores[value], value))
+    
+    def zrevrange(self, name: str, start: int, end: int, withscores: bool = False) -> List[Any]:
+        ordered, _ = self._get(name)
+        if end < 0:
+            end += len(ordered)
+        result = []
+        for score, value in ordered.iter_from(max(start, 0)):
+            if start + len(result) > end:
+                break
+            result.append((value, -score) if withscores else value)
+        return result
+    
+    def zcard(self, name: str) -> int:
+        return len(self._get(name)[1])
+    
+    def delete(self, *names: str):
+        for name in names:
+            self._sets.pop(name, None)
+    
+    def keys(self) -> List[str]:
+        return list(self._sets)
+
+def board_key(window: str, day: date) -> str:
+    """Sorted-set name of a window's board for the period containing `day`"""
+    if window == 'daily':
+        return f"lb:day:{day.isoformat()}"
+    if window == 'weekly':
+        return f"lb:week:{week_start(day)}"
+    return "lb:all"
+
+class Leaderboard:
+    """Points leaderboard with daily, weekly and all-time windows.
+
+    Rankings live in sorted sets: a local skip list per board by default, or a shared Redis
+    server when `redis_url` is given and the redis package is installed. Points are also written
+    to SQLite so the local boards for the current periods can be reloaded after a restart.
+    """
+    
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, redis_url: Optional[str] = None):
+        self.db_path = db_path
+        if db_path != ':memory:' and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self._create_tables()
+        
+        if redis_url and redis is not None:
+            self.client = redis.Redis.from_url(redis_url, decode_responses=True)
+            self.local = False
+        else:
+            self.client = LocalSortedSets()
+            self.local = True
+        self._current_keys = set()
+        self._roll(datetime.now().date())
+    
+    def _create_tables(self):
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS leaderboard_points (
+                    board TEXT NOT NULL, user_id TEXT NOT NULL, points INTEGER NOT NULL,
+                    PRIMARY KEY (board, user_id)
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS leaderboard_names (
+                    user_id TEXT PRIMARY KEY, name TEXT NOT NULL
+                )
+            """)
+    
+    def _roll(self, today: date):
+        """Make sure the boards for the current day and week are loaded; drop finished local ones"""
+        keys = {board_key(window, today) for window in WINDOWS}
+        with self._lock:
+            if keys == self._current_keys:
+                return
+            if self.local:
+                self.client.delete(*[key for key in self.client.keys() if key not in keys])
+                new_keys = tuple(keys - self._current_keys)
+                rows = self.conn.execute(
+                    f"SELECT board, user_id, points FROM leaderboard_points WHERE board IN ({', '.join('?' * len(new_keys))})",
+                    new_keys
+                ).fetchall()
+                for board, user_id, points in rows:
+                    self.client.zincrby(board, points, user_id)
+            self._current_keys = keys
+    
+    def record_many(self, batch: List[Tuple[str, List[Dict[str, Any]], Dict[str, Any]]]):
+        """Add points from (user_id, events, state after those events) for many users"""
+        today = datetime.now().date()
+        self._roll(today)
+        upserts = []
+        names = []
+        
+        for user_id, events, state in batch:
+            name = state['user_data'].get('name')
+            if name:
+                names.append((user_id, name))
+            for event in events:
+                points = event['data'].get('points_earned')
+                if not points:
+                    continue
+                day = event_day(event)
+                for window in WINDOWS:
+                    key = board_key(window, day)
+                    upserts.append((key, user_id, int(points)))
+                    # Imported attempts from earlier periods only count towards all-time
+                    if key in self._current_keys:
+                        self._incr(window, key, points, user_id)
+        
+        if upserts or names:
+            with self._lock, self.conn:
+                self.conn.executemany("""
+                    INSERT INTO leaderboard_points (board, user_id, points) VALUES (?, ?, ?)
+                    ON CONFLICT (board, user_id) DO UPDATE SET points = points + excluded.points
+                """, upserts)
+                self.conn.executemany('INSERT OR REPLACE INTO leaderboard_names (user_id, name) VALUES (?, ?)', names)
+    
+    def replace_user(self, user_id: str, state: Dict[str, Any]):
+        """Swap a user's points for those of a new full state (after a full-state import).
+
+        Quiz, mock exam and interview results count on their own days; points the state has no dated result
+        for (e.g. current affairs quizzes) count towards all-time only.
+        """
+        today = datetime.now().date()
+        self._roll(today)
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM leaderboard_points WHERE user_id = ?', (user_id,))
+        for key in self._current_keys:
+            self._rem(key, user_id)
+        
+        user_data = state['user_data']
+        results = (list(state['quiz_history']) + list(user_data.get('mock_exams', []))
+                   + list(user_data.get('interview_scores', [])))
+        now = datetime.now().isoformat()
+        self.record_many([(user_id, [{'type': 'Result', 'ts': now, 'data': result} for result in results], state)])
+        
+        undated = int(user_data.get('total_points', 0)) - sum(int(r.get('points_earned') or 0) for r in results)
+        if undated > 0:
+            key = board_key('all_time', today)
+            with self._lock, self.conn:
+                self.conn.execute("""
+                    INSERT INTO leaderboard_points (board, user_id, points) VALUES (?, ?, ?)
+                    ON CONFLICT (board, user_id) DO UPDATE SET points = points + excluded.points
+                """, (key, user_id, undated))
+            self._incr('all_time', key, undated, user_id)
+    
+    def _rem(self, key: str, user_id: str):
+        if self.local:
+            with self._lock:
+                self.client.zrem(key, user_id)
+        else:
+            self.client.zrem(key, user_id)
+    
+    def _incr(self, window: str, key: str, points: int, user_id: str):
+        if self.local:
+            with self._lock:
+                self.client.zincrby(key, points, user_id)
+        else:
+            self.client.zincrby(key, points, user_id)
+            if window in WINDOW_TTL:
+                self.client.expire(key, WINDOW_TTL[window])
+    
+    def _range(self, key: str, start: int, end: int) -> List[Tuple[str, float]]:
+        if self.local:
+            with self._lock:
+                return self.client.zrevrange(key, start, end, withscores=True)
+        return self.client.zrevrange(key, start, end, withscores=True)
+    
+    def _names(self, user_ids: List[str]) -> Dict[str, str]:
+        if not user_ids:
+            return {}
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT user_id, name FROM leaderboard_names WHERE user_id IN ({', '.join('?' * len(user_ids))})",
+                tuple(user_ids)
+            ).fetchall()
+        return dict(rows)
+    
+    def _entries(self, key: str, start: int, end: int) -> List[Dict[str, Any]]:
+        members = self._range(key, start, end)
+        names = self._names([user_id for user_id, _ in members])
+        return [
+            {'rank': start + i + 1, 'user_id': user_id, 'name': names.get(user_id, ''), 'points': int(points)}
+            for i, (user_id, points) in enumerate(members)
+        ]
+    
+    def top(self, window: str = 'all_time', k: int = 10) -> List[Dict[str, Any]]:
+        """Top `k` users of the current period"""
+        today = datetime.now().date()
+        self._roll(today)
+        return self._entries(board_key(window, today), 0, k - 1)
+    
+    def rank(self, user_id: str, window: str = 'all_time') -> Optional[int]:
+        """1-based rank of a user in the current period, or None without points"""
+        today = datetime.now().date()
+        self._roll(today)
+        key = board_key(window, today)
+        if self.local:
+            with self._lock:
+                position = self.client.zrevrank(key, user_id)
+        else:
+            position = self.client.zrevrank(key, user_id)
+        return None if position is None else position + 1
+    
+    def around(self, user_id: str, window: str = 'all_time', radius: int = 2) -> List[Dict[str, Any]]:
+        """Entries within `radius` places of the user"""
+        rank = self.rank(user_id, window)
+        if rank is None:
+            return []
+        start = max(rank - 1 - radius, 0)
+        return self._entries(board_key(window, datetime.now().date()), start, rank - 1 + radius)
+    
+    def size(self, window: str = 'all_time') -> int:
+        """Number of users with points in the current period"""
+        today = datetime.now().date()
+        self._roll(today)
+        key = board_key(window, today)
+        if self.local:
+            with self._lock:
+                return self.client.zcard(key)
+        return self.client.zcard(key)
+
+_default_leaderboard = None
+_default_leaderboard_lock = threading.Lock()
+
+def get_leaderboard() -> Leaderboard:
+    """Process-wide leaderboard (uses Redis when LEADERBOARD_REDIS_URL is set)"""
+    global _default_leaderboard
+    with _default_leaderboard_lock:
+        if _default_leaderboard is None:
+            _default_leaderboard = Leaderboard(redis_url=os.getenv('LEADERBOARD_REDIS_URL'))
+        return _default_leaderboard
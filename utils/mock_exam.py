@@ -0,0 +1,164 @@
+import math
+import uuid
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from utils.search_index import SearchIndex
+
+# Exam patterns: sections are quiz topics with a question count; marks per correct answer and the
+# penalty per wrong answer follow each exam's published scheme
+BLUEPRINTS = {
+    'ssc_cgl_tier1': {
+        'name': {'en': 'SSC CGL Tier I', 'hi': 'एसएससी सीजीएल टियर I'},
+        'minutes': 60,
+        'marks_correct': 2.0,
+        'negative': 0.5,
+        'sections': [('Reasoning', 25), ('General Knowledge', 25), ('Mathematics', 25), ('English', 25)]
+    },
+    'ibps_po_prelims': {
+        'name': {'en': 'IBPS PO Prelims', 'hi': 'आईबीपीएस पीओ प्रारंभिक'},
+        'minutes': 60,
+        'marks_correct': 1.0,
+        'negative': 0.25,
+        'sections': [('English', 30), ('Mathematics', 35), ('Reasoning', 35)]
+    },
+    'upsc_prelims_gs1': {
+        'name': {'en': 'UPSC Prelims GS Paper I', 'hi': 'यूपीएससी प्रारंभिक सामान्य अध्ययन प्रश्नपत्र I'},
+        'minutes': 120,
+        'marks_correct': 2.0,
+        'negative': 2.0 / 3,
+        'sections': [('Indian History', 15), ('Geography', 15), ('Indian Polity', 15), ('Economics', 15),
+                     ('Environment', 15), ('Science & Technology', 10), ('Current Affairs', 15)]
+    },
+    'state_psc_prelims': {
+        'name': {'en': 'State PSC Prelims', 'hi': 'राज्य पीएससी प्रारंभिक'},
+        'minutes': 120,
+        'marks_correct': 1.0,
+        'negative': 1.0 / 3,
+        'sections': [('General Knowledge', 30), ('Indian History', 20), ('Geography', 20), ('Indian Polity', 20),
+                     ('Economics', 20), ('Science & Technology', 15), ('Current Affairs', 25)]
+    },
+    'full_length_gs': {
+        'name': {'en': 'Full-Length General Studies (200)', 'hi': 'पूर्ण सामान्य अध्ययन (200)'},
+        'minutes': 180,
+        'marks_correct': 1.0,
+        'negative': 0.25,
+        'sections': [('General Knowledge', 30), ('Indian History', 25), ('Geography', 25), ('Indian Polity', 25),
+                     ('Economics', 25), ('Science & Technology', 20), ('Environment', 15), ('Current Affairs', 20),
+                     ('Reasoning', 15)]
+    }
+}
+
+# Questions requested from the model per call when a section has to be topped up
+TOP_UP_CHUNK = 20
+
+UNANSWERED = -1
+
+def blueprint_size(blueprint_id: str) -> int:
+    return sum(count for _, count in BLUEPRINTS[blueprint_id]['sections'])
+
+def new_answer_sheet(paper: Dict[str, Any]) -> np.ndarray:
+    """One int8 per question: the chosen option, or UNANSWERED"""
+    return np.full(len(paper['questions']), UNANSWERED, dtype=np.int8)
+
+def index_paper(paper: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the answer key and section of every question as arrays, for grading in one pass"""
+    paper['key'] = np.array([q['correct_answer'] for q in paper['questions']], dtype=np.int8)
+    paper['section_index'] = np.repeat(np.arange(len(paper['sections']), dtype=np.int16),
+                                       [s['count'] for s in paper['sections']])
+    return paper
+
+def paper_state(paper: Dict[str, Any]) -> Dict[str, Any]:
+    """The paper without its derived arrays, as saved with an exam session"""
+    return {key: value for key, value in paper.items() if key not in ('key', 'section_index')}
+
+class MockExamEngine:
+    """Assembles full-length papers from the shared question bank and grades them"""
+    
+    def __init__(self, search_index: SearchIndex, ai_services=None):
+        self.search_index = search_index
+        self.ai_services = ai_services
+    
+    def _section_questions(self, topic: str, count: int, language: str, difficulty: int,
+                           exclude: List[str]) -> List[Dict[str, Any]]:
+        questions = self.search_index.question_pool(topic, language, count, exclude)
+        # Top up thin sections with new questions; generated questions are indexed, so later papers reuse them
+        for _ in range(math.ceil(count / TOP_UP_CHUNK)):
+            if len(questions) >= count or not (self.ai_services and self.ai_services.client):
+                break
+            self.ai_services.generate_quiz_questions(topic, difficulty, language, min(TOP_UP_CHUNK, count - len(questions)))
+            questions += self.search_index.question_pool(topic, language, count - len(questions),
+                                                         exclude + [q['ref'] for q in questions])
+        return questions
+    
+    def assemble(self, blueprint_id: str, language: str, difficulty: int = 3,
+                 exclude: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Build a paper following a blueprint; sections may come out short when the bank runs dry"""
+        blueprint = BLUEPRINTS[blueprint_id]
+        exclude = list(exclude or [])
+        questions, sections = [], []
+        for topic, count in blueprint['sections']:
+            section_questions = [
+                q for q in self._section_questions(topic, count, language, difficulty, exclude)
+                if isinstance(q.get('correct_answer'), int) and 0 <= q['correct_answer'] < len(q.get('options', []))
+            ]
+            if not section_questions:
+                continue
+            sections.append({'topic': topic, 'start': len(questions), 'count': len(section_questions),
+                             'planned': count})
+            questions.extend(section_questions)
+        
+        return index_paper({
+            'exam_id': uuid.uuid4().hex,
+            'blueprint': blueprint_id,
+            'language': language,
+            'minutes': blueprint['minutes'],
+            'marks_correct': blueprint['marks_correct'],
+            'negative': blueprint['negative'],
+            'difficulty': difficulty,
+            'sections': sections,
+            'questions': questions
+        })
+    
+    @staticmethod
+    def grade(paper: Dict[str, Any], answers: np.ndarray) -> Dict[str, Any]:
+        """Score a whole answer sheet with negative marking, overall and per section"""
+        attempted = answers != UNANSWERED
+        correct = attempted & (answers == paper['key'])
+        wrong = attempted & ~correct
+        marks = correct * paper['marks_correct'] - wrong * paper['negative']
+        
+        n_sections = len(paper['sections'])
+        section_index = paper['section_index']
+        per_section = {
+            name: np.bincount(section_index, weights=values, minlength=n_sections)
+            for name, values in (('correct', correct), ('wrong', wrong), ('attempted', attempted), ('marks', marks))
+        }
+        
+        sections = []
+        for i, section in enumerate(paper['sections']):
+            attempted_i = int(per_section['attempted'][i])
+            sections.append({
+                'topic': section['topic'],
+                'questions': section['count'],
+                'attempted': attempted_i,
+                'correct': int(per_section['correct'][i]),
+                'wrong': int(per_section['wrong'][i]),
+                'marks': round(float(per_section['marks'][i]), 2),
+                'max_marks': section['count'] * paper['marks_correct'],
+                'accuracy': round(float(per_section['correct'][i]) / attempted_i * 100, 1) if attempted_i else 0.0
+            })
+        
+        total_attempted = int(attempted.sum())
+        return {
+            'score': round(float(marks.sum()), 2),
+            'max_score': len(paper['questions']) * paper['marks_correct'],
+            'correct': int(correct.sum()),
+            'wrong': int(wrong.sum()),
+            'unanswered': int((~attempted).sum()),
+            'accuracy': round(int(correct.sum()) / total_attempted * 100, 1) if total_attempted else 0.0,
+            'sections': sections,
+            'correct_mask': correct,
+            'wrong_mask': wrong
+        }
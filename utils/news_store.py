@@ -0,0 +1,415 @@
+import hashlib
+import html
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Any, Callable, Iterable, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+
+from utils.event_store import DEFAULT_DB_PATH
+from utils.search_index import SearchIndex, get_search_index
+
+# Feeds polled by the ingestion worker. Override with a JSON list in CA_FEEDS_FILE.
+DEFAULT_FEEDS = [
+    {'name': 'PIB', 'url': 'https://pib.gov.in/RssMain.aspx?ModId=6&Lang=1&Regid=3', 'language': 'en'},
+    {'name': 'PIB (हिंदी)', 'url': 'https://pib.gov.in/RssMain.aspx?ModId=6&Lang=2&Regid=3', 'language': 'hi'}
+]
+
+# Directory of saved feed files that replaces the network (tests, offline demos)
+FEED_DIR = os.getenv('CA_FEED_DIR')
+
+INGEST_INTERVAL_SECONDS = 15 * 60
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_CATEGORY = 'National Politics'
+
+# Keywords per current affairs category (keys match LanguageManager.get_current_affairs_categories)
+CATEGORY_KEYWORDS = {
+    'National Politics': ['parliament', 'lok sabha', 'rajya sabha', 'election', 'cabinet', 'minister', 'bill',
+                          'governor', 'chief minister', 'संसद', 'लोकसभा', 'राज्यसभा', 'चुनाव', 'मंत्रिमंडल', 'विधेयक'],
+    'International Relations': ['bilateral', 'summit', 'g20', 'united nations', 'foreign', 'embassy', 'treaty',
+                                'visit of', 'brics', 'quad', 'द्विपक्षीय', 'शिखर सम्मेलन', 'विदेश', 'संयुक्त राष्ट्र'],
+    'Economy & Business': ['gdp', 'inflation', 'rbi', 'budget', 'gst', 'export', 'import', 'investment', 'bank',
+                           'fiscal', 'repo rate', 'economy', 'अर्थव्यवस्था', 'बजट', 'निवेश', 'मुद्रास्फीति', 'बैंक'],
+    'Science & Technology': ['isro', 'satellite', 'research', 'technology', 'digital', 'space', 'ai ', 'drdo lab',
+                             'launch vehicle', 'इसरो', 'उपग्रह', 'अनुसंधान', 'प्रौद्योगिकी', 'अंतरिक्ष'],
+    'Sports': ['olympic', 'medal', 'cricket', 'championship', 'tournament', 'athlete', 'khelo india',
+               'ओलंपिक', 'पदक', 'क्रिकेट', 'चैंपियनशिप', 'खेल'],
+    'Awards & Recognition': ['award', 'prize', 'honour', 'honor', 'padma', 'conferred', 'पुरस्कार', 'सम्मान', 'पद्म'],
+    'Government Schemes': ['scheme', 'yojana', 'mission', 'abhiyan', 'beneficiar', 'launched', 'initiative',
+                           'योजना', 'मिशन', 'अभियान', 'लाभार्थी'],
+    'Environment': ['climate', 'forest', 'wildlife', 'pollution', 'biodiversity', 'renewable', 'tiger', 'emission',
+                    'जलवायु', 'वन', 'प्रदूषण', 'पर्यावरण', 'वन्यजीव'],
+    'Defense': ['defence', 'defense', 'army', 'navy', 'air force', 'military', 'drdo', 'missile', 'exercise',
+                'रक्षा', 'सेना', 'नौसेना', 'वायु सेना', 'मिसाइल'],
+    'Education': ['education', 'school', 'university', 'students', 'nep', 'ugc', 'scholarship', 'exam',
+                  'शिक्षा', 'विद्यालय', 'विश्वविद्यालय', 'छात्र', 'छात्रवृत्ति']
+}
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+_TAG_RE = re.compile(r'<[^>]+>')
+_SPACE_RE = re.compile(r'\s+')
+_DEVANAGARI_RE = re.compile(r'[ऀ-ॿ]')
+_TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid')
+
+def clean_text(text: Optional[str]) -> str:
+    """Strip markup and entities and collapse whitespace"""
+    if not text:
+        return ''
+    return _SPACE_RE.sub(' ', html.unescape(_TAG_RE.sub(' ', text))).strip()
+
+def canonical_url(url: str) -> str:
+    """URL without tracking parameters or fragment, for deduplication"""
+    parts = urlsplit(url.strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith(_TRACKING_PARAMS)]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), ''))
+
+def title_key(title: str) -> str:
+    """Hash of the title's letters and digits, to catch the same story under different URLs"""
+    normalized = ''.join(ch for ch in title.lower() if ch.isalnum())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+def detect_language(text: str) -> str:
+    """'hi' when the text is mostly Devanagari, else 'en'"""
+    letters = [ch for ch in text if ch.isalpha()]
+    if not letters:
+        return 'en'
+    return 'hi' if len(_DEVANAGARI_RE.findall(text)) / len(letters) > 0.3 else 'en'
+
+def categorize(title: str, summary: str, feed_categories: Iterable[str] = (), default: Optional[str] = None) -> str:
+    """Best-matching current affairs category by keyword counts (title hits count double)"""
+    for name in feed_categories:
+        if name in CATEGORY_KEYWORDS:
+            return name
+    title, summary = f" {title.lower()} ", f" {summary.lower()} "
+    scores = {
+        category: sum(2 * title.count(word) + summary.count(word) for word in words)
+        for category, words in CATEGORY_KEYWORDS.items()
+    }
+    best = max(scores, key=scores.get)
+    return best if scores[best] else (default or FALLBACK_CATEGORY)
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)  # RSS (RFC 822)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))  # Atom (RFC 3339)
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+def parse_feed(content: bytes) -> List[Dict[str, Any]]:
+    """Raw entries from an RSS 2.0 or Atom document"""
+    root = ET.fromstring(content)
+    entries = []
+    
+    if root.tag == f'{ATOM_NS}feed':
+        for entry in root.iter(f'{ATOM_NS}entry'):
+            link = entry.find(f"{ATOM_NS}link[@rel='alternate']")
+            if link is None:
+                link = entry.find(f'{ATOM_NS}link')
+            entries.append({
+                'guid': entry.findtext(f'{ATOM_NS}id'),
+                'title': entry.findtext(f'{ATOM_NS}title'),
+                'url': link.get('href') if link is not None else None,
+                'summary': entry.findtext(f'{ATOM_NS}summary') or entry.findtext(f'{ATOM_NS}content'),
+                'published': entry.findtext(f'{ATOM_NS}published') or entry.findtext(f'{ATOM_NS}updated'),
+                'categories': [c.get('term', '') for c in entry.findall(f'{ATOM_NS}category')]
+            })
+    else:
+        for item in root.iter('item'):
+            entries.append({
+                'guid': item.findtext('guid'),
+                'title': item.findtext('title'),
+                'url': item.findtext('link'),
+                'summary': item.findtext('description'),
+                'published': item.findtext('pubDate'),
+                'categories': [c.text or '' for c in item.findall('category')]
+            })
+    
+    return entries
+
+def normalize_entry(entry: Dict[str, Any], source: Dict[str, Any], fetched_at: datetime) -> Optional[Dict[str, Any]]:
+    """Article record from a raw feed entry, or None when it has no title or link"""
+    title = clean_text(entry.get('title'))
+    url = (entry.get('url') or '').strip()
+    if not title or not url:
+        return None
+    
+    summary = clean_text(entry.get('summary'))
+    if len(summary) > 600:
+        summary = summary[:600].rsplit(' ', 1)[0] + '…'
+    published = _parse_date(entry.get('published')) or fetched_at.astimezone(timezone.utc)
+    url = canonical_url(url)
+    
+    return {
+        'id': hashlib.sha1(url.encode('utf-8')).hexdigest(),
+        'title': title,
+        'summary': summary,
+        'url': url,
+        'source': source.get('name', ''),
+        'language': source.get('language') or detect_language(title + ' ' + summary),
+        'category': categorize(title, summary, entry.get('categories', []), source.get('category')),
+        'published': published.astimezone(timezone.utc).isoformat(),
+        # Day as printed by the publisher (IST for Indian feeds), so late-night releases keep their date
+        'published_date': published.date().isoformat(),
+        'title_key': title_key(title)
+    }
+
+class NewsStore:
+    """Current affairs articles in SQLite, indexed by date and category"""
+    
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        if db_path != ':memory:' and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self._lock, self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS ca_articles (
+                    id TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    published TEXT NOT NULL,
+                    published_date TEXT NOT NULL,
+                    title_key TEXT NOT NULL,
+                    fetched_at TEXT NOT NULL,
+                    UNIQUE (title_key, language)
+                );
+                CREATE INDEX IF NOT EXISTS idx_ca_articles_date ON ca_articles (published_date DESC, published DESC);
+                CREATE INDEX IF NOT EXISTS idx_ca_articles_category_date
+                    ON ca_articles (category, published_date DESC, published DESC);
+                CREATE TABLE IF NOT EXISTS ca_feed_state (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    last_run TEXT
+                );
+            """)
+    
+    def add_articles(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert articles, skipping ones already stored (same URL, or same title in the same language).
+        
+        Returns the articles that were actually added.
+        """
+        now = datetime.now().isoformat()
+        added = []
+        with self._lock, self.conn:
+            for article in articles:
+                cursor = self.conn.execute("""
+                    INSERT OR IGNORE INTO ca_articles
+                        (id, title, summary, url, source, language, category, published, published_date, title_key, fetched_at)
+                    VALUES (:id, :title, :summary, :url, :source, :language, :category, :published, :published_date,
+                            :title_key, :fetched_at)
+                """, {**article, 'fetched_at': now})
+                if cursor.rowcount:
+                    added.append(article)
+        return added
+    
+    def iter_articles(self, batch_size: int = 1000, since: Optional[date] = None,
+                      newest_first: bool = False) -> Iterable[List[Dict[str, Any]]]:
+        """Stored articles (published on or after `since`, if given) in batches, oldest stored first by default"""
+        keys = ['id', 'title', 'summary', 'url', 'source', 'language', 'category', 'published', 'published_date']
+        # Keyset paging on rowid: every batch is one index range scan, however deep into the table
+        cursor_clause, order = ('rowid < ?', 'DESC') if newest_first else ('rowid > ?', 'ASC')
+        date_clause = ' AND published_date >= ?' if since else ''
+        last_rowid = (1 << 63) - 1 if newest_first else 0
+        while True:
+            params = [last_rowid] + ([since.isoformat()] if since else []) + [batch_size]
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT rowid, {', '.join(keys)} FROM ca_articles WHERE {cursor_clause}{date_clause} "
+                    f"ORDER BY rowid {order} LIMIT ?",
+                    params
+                ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            yield [dict(zip(keys, row[1:])) for row in rows]
+    
+    def query(self, category: Optional[str] = None, start_date: Optional[date] = None, end_date: Optional[date] = None,
+              language: Optional[str] = None, page: int = 1, page_size: int = 10) -> Tuple[List[Dict[str, Any]], int]:
+        """One page of articles (newest first) and the total number matching the filters"""
+        clauses, params = [], []
+        if category:
+            clauses.append('category = ?')
+            params.append(category)
+        if start_date:
+            clauses.append('published_date >= ?')
+            params.append(start_date.isoformat())
+        if end_date:
+            clauses.append('published_date <= ?')
+            params.append(end_date.isoformat())
+        if language:
+            clauses.append('language = ?')
+            params.append(language)
+        where = (' WHERE ' + ' AND '.join(clauses)) if clauses else ''
+        
+        with self._lock:
+            total = self.conn.execute(f'SELECT COUNT(*) FROM ca_articles{where}', params).fetchone()[0]
+            rows = self.conn.execute(
+                f'SELECT id, title, summary, url, source, language, category, published, published_date '
+                f'FROM ca_articles{where} ORDER BY published_date DESC, published DESC LIMIT ? OFFSET ?',
+                params + [page_size, (max(page, 1) - 1) * page_size]
+            ).fetchall()
+        
+        keys = ['id', 'title', 'summary', 'url', 'source', 'language', 'category', 'published', 'date']
+        return [dict(zip(keys, row)) for row in rows], total
+    
+    def get_feed_state(self, url: str) -> Dict[str, Optional[str]]:
+        with self._lock:
+            row = self.conn.execute('SELECT etag, last_modified, last_run FROM ca_feed_state WHERE url = ?', (url,)).fetchone()
+        return dict(zip(['etag', 'last_modified', 'last_run'], row)) if row else {}
+    
+    def set_feed_state(self, url: str, etag: Optional[str], last_modified: Optional[str]):
+        with self._lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO ca_feed_state (url, etag, last_modified, last_run) VALUES (?, ?, ?, ?)',
+                (url, etag, last_modified, datetime.now().isoformat())
+            )
+
+def load_feed_sources() -> List[Dict[str, Any]]:
+    """Feed list from CA_FEEDS_FILE, or the defaults"""
+    path = os.getenv('CA_FEEDS_FILE')
+    if path and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    return DEFAULT_FEEDS
+
+def _feed_label(source: Dict[str, Any]) -> str:
+    if 'url' in source:
+        return f"{source.get('name')} <{source['url']}>"
+    return source.get('path') or source.get('name')
+
+class FeedIngestor:
+    """Fetches feeds (or reads a directory of feed files), normalizes entries and stores new articles"""
+    
+    def __init__(self, store: NewsStore, sources: Optional[List[Dict[str, Any]]] = None,
+                 feed_dir: Optional[str] = None, timeout: float = 10, search_index: Optional[SearchIndex] = None):
+        self.store = store
+        self.search_index = search_index
+        self.sources = sources if sources is not None else load_feed_sources()
+        self.feed_dir = feed_dir
+        self.timeout = timeout
+    
+    def run_once(self) -> Dict[str, Any]:
+        """One ingestion pass; returns counts of entries seen, new articles and failed feeds"""
+        stats = {'entries': 0, 'new': 0, 'errors': []}
+        for source, content, validators in self._iter_documents(stats):
+            try:
+                fetched_at = datetime.now(timezone.utc)
+                articles = [a for a in (normalize_entry(e, source, fetched_at) for e in parse_feed(content)) if a]
+            except ET.ParseError as e:
+                stats['errors'].append(f"{_feed_label(source)}: {e}")
+                continue
+            try:
+                added = self.store.add_articles(articles)
+                if self.search_index and added:
+                    self.search_index.add_articles(added)
+            except Exception as e:
+                logger.exception("Storing articles from %s failed", _feed_label(source))
+                stats['errors'].append(f"{_feed_label(source)}: {e}")
+                continue
+            stats['entries'] += len(articles)
+            stats['new'] += len(added)
+            # Only once the articles are stored, so a feed that failed half way is fetched in full next time
+            if validators is not None:
+                self.store.set_feed_state(source['url'], *validators)
+        return stats
+    
+    def _iter_documents(self, stats: Dict[str, Any]):
+        if self.feed_dir:
+            for name in sorted(os.listdir(self.feed_dir)):
+                if name.endswith(('.xml', '.rss', '.atom')):
+                    path = os.path.join(self.feed_dir, name)
+                    with open(path, 'rb') as f:
+                        yield {'name': os.path.splitext(name)[0], 'path': path}, f.read(), None
+            return
+        
+        for source in self.sources:
+            # Conditional GET so unchanged feeds cost one round trip and no parsing
+            state = self.store.get_feed_state(source['url'])
+            headers = {}
+            if state.get('etag'):
+                headers['If-None-Match'] = state['etag']
+            if state.get('last_modified'):
+                headers['If-Modified-Since'] = state['last_modified']
+            try:
+                response = requests.get(source['url'], headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                stats['errors'].append(f"{_feed_label(source)}: {e}")
+                continue
+            if response.status_code == 304:
+                continue
+            if response.status_code != 200:
+                stats['errors'].append(f"{_feed_label(source)}: HTTP {response.status_code}")
+                continue
+            yield source, response.content, (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+
+_default_store = None
+_worker_thread = None
+_default_lock = threading.Lock()
+
+def get_news_store() -> NewsStore:
+    """Process-wide news store"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = NewsStore()
+        return _default_store
+
+def get_feed_ingestor() -> FeedIngestor:
+    """Ingestor over the configured feeds (or CA_FEED_DIR when set)"""
+    return FeedIngestor(get_news_store(), feed_dir=FEED_DIR, search_index=get_search_index())
+
+def ensure_ingestion_worker(interval: int = INGEST_INTERVAL_SECONDS,
+                            after_pass: Iterable[Callable[[], Any]] = ()) -> threading.Thread:
+    """Start the background ingestion thread once per process; after_pass steps run after every ingestion pass"""
+    global _worker_thread
+    with _default_lock:
+        if _worker_thread is None or not _worker_thread.is_alive():
+            _worker_thread = threading.Thread(target=_ingest_forever, args=(interval, list(after_pass)),
+                                              name='ca-ingest', daemon=True)
+            _worker_thread.start()
+        return _worker_thread
+
+def _ingest_forever(interval: int, after_pass: List[Callable[[], Any]]):
+    ingestor = get_feed_ingestor()
+    while True:
+        # A bad feed, a network outage or a failed follow-up must not kill the worker; the next pass retries
+        try:
+            stats = ingestor.run_once()
+            for error in stats['errors']:
+                logger.warning("Feed ingestion failed for %s", error)
+        except Exception:
+            logger.exception("Ingestion pass failed")
+        for step in after_pass:
+            try:
+                step()
+            except Exception:
+                logger.exception("%s failed after ingestion", getattr(step, '__qualname__', step))
+        time.sleep(interval)
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+from utils.event_store import DEFAULT_DB_PATH
+
+# Quiz counts are bucketed so a plan is only regenerated when the user moves to a new stage
+QUIZ_COUNT_BUCKETS = [0, 1, 5, 20, 50, 100]
+
+# Cached plans older than this are regenerated even if the fingerprint still matches
+MAX_AGE = timedelta(days=30)
+
+def _quiz_count_label(count: int) -> str:
+    index = bisect_right(QUIZ_COUNT_BUCKETS, count) - 1
+    if index == len(QUIZ_COUNT_BUCKETS) - 1:
+        return f"{QUIZ_COUNT_BUCKETS[index]}+"
+    low, high = QUIZ_COUNT_BUCKETS[index], QUIZ_COUNT_BUCKETS[index + 1] - 1
+    return str(low) if low == high else f"{low}-{high}"
+
+def study_plan_inputs(user_data: Dict[str, Any], language: str) -> Dict[str, Any]:
+    """Profile inputs that go into the study plan prompt, bucketed"""
+    scores = user_data.get('quiz_scores', [])
+    average = sum(scores) / len(scores) if scores else 0
+    # 10-point bands; 90-100 is one band
+    low = min(int(average) // 10 * 10, 90)
+    return {
+        'exam_type': user_data.get('exam_type') or 'General',
+        'study_hours_per_day': user_data.get('study_hours_per_day', 2),
+        'quiz_count': _quiz_count_label(len(scores)),
+        'average_score': f"{low}-{100 if low == 90 else low + 9}%",
+        'language': language
+    }
+
+def study_plan_fingerprint(inputs: Dict[str, Any]) -> str:
+    """Stable key for a set of study plan inputs"""
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+class StudyPlanCache:
+    """Generated study plans shared across sessions and users, keyed by input fingerprint"""
+    
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        if db_path != ':memory:' and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS study_plan_cache (
+                    fingerprint TEXT PRIMARY KEY,
+                    inputs TEXT NOT NULL,
+                    plan TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+    
+    def get(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Cached plan for a fingerprint, or None when missing or expired"""
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                'SELECT plan, created_at FROM study_plan_cache WHERE fingerprint = ?', (fingerprint,)
+            ).fetchone()
+            if not row or datetime.fromisoformat(row[1]) < datetime.now() - MAX_AGE:
+                return None
+            self.conn.execute('UPDATE study_plan_cache SET hits = hits + 1 WHERE fingerprint = ?', (fingerprint,))
+        return json.loads(row[0])
+    
+    def put(self, fingerprint: str, inputs: Dict[str, Any], plan: Dict[str, Any]):
+        """Store a generated plan"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO study_plan_cache (fingerprint, inputs, plan, created_at, hits) VALUES (?, ?, ?, ?, 0)',
+                (fingerprint, json.dumps(inputs, ensure_ascii=False), json.dumps(plan, ensure_ascii=False),
+                 datetime.now().isoformat())
+            )
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_study_plan_cache() -> StudyPlanCache:
+    """Process-wide study plan cache"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = StudyPlanCache()
+        return _default_cache
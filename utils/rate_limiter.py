@@ -0,0 +1,235 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+from utils.event_store import DEFAULT_DB_PATH
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Budgets per scope as (burst, refill per hour), for requests and for model tokens (prompt + completion).
+# Calls made for a signed-in user draw from all three scopes; background work only from institute and global.
+DEFAULT_LIMITS = {
+    'user': {'requests': (10, 30), 'tokens': (20_000, 60_000)},
+    'institute': {'requests': (100, 600), 'tokens': (300_000, 1_500_000)},
+    'global': {'requests': (300, 2_000), 'tokens': (1_000_000, 5_000_000)}
+}
+
+# Rough token estimate: about four bytes of UTF-8 per token (Devanagari is three bytes per character)
+BYTES_PER_TOKEN = 4
+
+# Idle buckets are full again after their refill time; Redis keys expire a little later
+BUCKET_TTL_SECONDS = 2 * 3600
+
+# (bucket key, amount, capacity, refill per second)
+BucketRequest = Tuple[str, float, float, float]
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text.encode('utf-8')) / BYTES_PER_TOKEN)
+
+def _refill(tokens: float, updated: float, capacity: float, rate: float, now: float) -> float:
+    return min(capacity, tokens + max(now - updated, 0.0) * rate)
+
+def _plan(state: Dict[str, Tuple[float, float]], requests: List[BucketRequest],
+          now: float) -> Tuple[float, Dict[str, float]]:
+    """Seconds to wait (0 if every bucket has enough) and the balances after taking"""
+    wait, balances = 0.0, {}
+    for key, amount, capacity, rate in requests:
+        tokens, updated = state.get(key, (capacity, now))
+        tokens = _refill(tokens, updated, capacity, rate, now)
+        if tokens < min(amount, capacity):
+            # A request larger than the bucket only needs a full bucket, and leaves it in debt
+            wait = max(wait, (min(amount, capacity) - tokens) / rate if rate else math.inf)
+        balances[key] = tokens - amount
+    return wait, balances
+
+class MemoryBuckets:
+    """Token buckets for a single process"""
+    
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+    
+    def take(self, requests: List[BucketRequest], now: float) -> float:
+        """Take from every bucket or from none; returns 0 on success, else seconds until it would succeed"""
+        with self._lock:
+            wait, balances = _plan(self._buckets, requests, now)
+            if not wait:
+                self._buckets.update({key: (tokens, now) for key, tokens in balances.items()})
+            return wait
+    
+    def adjust(self, requests: List[BucketRequest], now: float):
+        """Charge (positive) or refund (negative) amounts without a limit check"""
+        with self._lock:
+            for key, amount, capacity, rate in requests:
+                tokens, updated = self._buckets.get(key, (capacity, now))
+                self._buckets[key] = (_refill(tokens, updated, capacity, rate, now) - amount, now)
+
+class SQLiteBuckets:
+    """Token buckets shared by the app processes and workers using one database file"""
+    
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        if db_path != ':memory:' and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit mode, so each take is one explicit BEGIN IMMEDIATE transaction across processes
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=10)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self._lock:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS ai_rate_buckets (
+                    key TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL
+                ) WITHOUT ROWID
+            """)
+    
+    def _load(self, keys: List[str]) -> Dict[str, Tuple[float, float]]:
+        rows = self.conn.execute(
+            f"SELECT key, tokens, updated FROM ai_rate_buckets WHERE key IN ({','.join('?' * len(keys))})", keys
+        ).fetchall()
+        return {key: (tokens, updated) for key, tokens, updated in rows}
+    
+    def _store(self, balances: Dict[str, float], now: float):
+        self.conn.executemany(
+            'INSERT INTO ai_rate_buckets (key, tokens, updated) VALUES (?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+            [(key, tokens, now) for key, tokens in balances.items()]
+        )
+    
+    def take(self, requests: List[BucketRequest], now: float) -> float:
+        with self._lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                wait, balances = _plan(self._load([r[0] for r in requests]), requests, now)
+                if not wait:
+                    self._store(balances, now)
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+            return wait
+    
+    def adjust(self, requests: List[BucketRequest], now: float):
+        with self._lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                state = self._load([r[0] for r in requests])
+                balances = {}
+                for key, amount, capacity, rate in requests:
+                    tokens, updated = state.get(key, (capacity, now))
+                    balances[key] = _refill(tokens, updated, capacity, rate, now) - amount
+                self._store(balances, now)
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+
+# KEYS: bucket keys. ARGV: now, ttl, check (1 = all-or-nothing take, 0 = adjust), then amount, capacity, rate per key.
+_REDIS_TAKE = """
+local now, ttl, check = tonumber(ARGV[1]), tonumber(ARGV[2]), ARGV[3] == '1'
+local wait, balances = 0, {}
+for i, key in ipairs(KEYS) do
+    local amount, capacity, rate = tonumber(ARGV[1 + 3 * i]), tonumber(ARGV[2 + 3 * i]), tonumber(ARGV[3 + 3 * i])
+    local state = redis.call('HMGET', key, 'tokens', 'updated')
+    local tokens, updated = tonumber(state[1]) or capacity, tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(now - updated, 0) * rate)
+    local needed = math.min(amount, capacity)
+    if check and tokens < needed then
+        wait = math.max(wait, rate > 0 and (needed - tokens) / rate or 1e18)
+    end
+    balances[i] = tokens - amount
+end
+if wait == 0 then
+    for i, key in ipairs(KEYS) do
+        redis.call('HSET', key, 'tokens', tostring(balances[i]), 'updated', tostring(now))
+        redis.call('EXPIRE', key, ttl)
+    end
+end
+return tostring(wait)
+"""
+
+class RedisBuckets:
+    """Token buckets in Redis, shared by workers on any number of hosts"""
+    
+    def __init__(self, redis_url: str):
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is set but the redis package is not installed")
+        self.client = redis.Redis.from_url(redis_url)
+        self._script = self.client.register_script(_REDIS_TAKE)
+    
+    def _run(self, requests: List[BucketRequest], now: float, check: bool) -> float:
+        args: List[Any] = [now, BUCKET_TTL_SECONDS, 1 if check else 0]
+        for _, amount, capacity, rate in requests:
+            args.extend([amount, capacity, rate])
+        return float(self._script(keys=['ai_rate:' + r[0] for r in requests], args=args))
+    
+    def take(self, requests: List[BucketRequest], now: float) -> float:
+        return self._run(requests, now, check=True)
+    
+    def adjust(self, requests: List[BucketRequest], now: float):
+        self._run(requests, now, check=False)
+
+class RateLimitExceeded(Exception):
+    """An AI call was refused because a budget is used up"""
+    
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"AI usage limit reached; try again in {math.ceil(retry_after / 60)} min")
+
+class RateLimiter:
+    """Request and token budgets per user, per institute and globally, in front of every model call"""
+    
+    def __init__(self, backend=None, limits: Optional[Dict[str, Dict[str, Tuple[float, float]]]] = None,
+                 institute: str = 'default'):
+        self.backend = backend or MemoryBuckets()
+        self.limits = limits or DEFAULT_LIMITS
+        self.institute = institute
+    
+    def _requests(self, user_id: Optional[str], amounts: Dict[str, float]) -> List[BucketRequest]:
+        scopes = {'user': user_id, 'institute': self.institute, 'global': ''}
+        requests = []
+        for scope, owner in scopes.items():
+            if owner is None or scope not in self.limits:
+                continue
+            for measure, amount in amounts.items():
+                burst, per_hour = self.limits[scope][measure]
+                requests.append((f"{scope}:{owner}:{measure}", amount, burst, per_hour / 3600))
+        return requests
+    
+    def acquire(self, user_id: Optional[str], estimated_tokens: int) -> int:
+        """Reserve one request and the estimated tokens, or raise RateLimitExceeded; returns the reservation"""
+        wait = self.backend.take(self._requests(user_id, {'requests': 1, 'tokens': estimated_tokens}), time.time())
+        if wait:
+            raise RateLimitExceeded(wait)
+        return estimated_tokens
+    
+    def settle(self, user_id: Optional[str], reserved_tokens: int, used_tokens: Optional[int]):
+        """Correct a reservation to the tokens the model reports having used"""
+        if used_tokens is not None and used_tokens != reserved_tokens:
+            self.backend.adjust(self._requests(user_id, {'tokens': used_tokens - reserved_tokens}), time.time())
+
+_default_limiter = None
+_default_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter: Redis when RATE_LIMIT_REDIS_URL is set, in-process when RATE_LIMIT_BACKEND=memory,
+    otherwise the app database (shared with news_worker.py and other app processes)"""
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            if os.getenv('RATE_LIMIT_REDIS_URL'):
+                backend = RedisBuckets(os.environ['RATE_LIMIT_REDIS_URL'])
+            elif os.getenv('RATE_LIMIT_BACKEND') == 'memory':
+                backend = MemoryBuckets()
+            else:
+                backend = SQLiteBuckets()
+            _default_limiter = RateLimiter(backend, institute=os.getenv('INSTITUTE_ID', 'default'))
+        return _default_limiter
@@ -0,0 +1,178 @@
+import streamlit as st
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+import heapq
+
+from utils.adaptive_engine import AdaptiveEngine
+from utils.data_manager import DataManager
+from utils.review_store import ReviewStore, get_review_store
+
+class ReviewScheduler:
+    """SM-2 style spaced-repetition scheduler for missed quiz questions"""
+    
+    DEFAULT_EASE = 2.5
+    MIN_EASE = 1.3
+    # First review of a missed question comes back after 10 minutes
+    RELEARN_INTERVAL = timedelta(minutes=10)
+    # Superseded heap entries are compacted away once the heap is this many times the number of cards
+    MAX_HEAP_FACTOR = 2
+    
+    def __init__(self, data_manager: Optional[DataManager] = None, store: Optional[ReviewStore] = None):
+        # The data manager resolves the user; cards are saved in the store and cached in session state
+        self.data_manager = data_manager or DataManager()
+        self.store = store or get_review_store()
+        self.initialize_session_state()
+    
+    @property
+    def user_id(self) -> str:
+        return st.session_state.user_id
+    
+    def initialize_session_state(self):
+        """Load the user's review cards and build the due-time heap if they aren't in the session"""
+        if 'review_items' not in st.session_state:
+            st.session_state.review_items = self.store.cards(self.user_id)
+            st.session_state.pop('review_queue', None)
+        
+        if 'review_queue' not in st.session_state:
+            self._rebuild_queue()
+    
+    def _rebuild_queue(self):
+        """Heap of (due, question id), one entry per card"""
+        now_key = datetime.now().isoformat()
+        for card in st.session_state.review_items.values():
+            # Imported cards may carry no due time; they are due now
+            card['due'] = card.get('due') or now_key
+        queue = [(card['due'], qid) for qid, card in st.session_state.review_items.items()]
+        heapq.heapify(queue)
+        st.session_state.review_queue = queue
+    
+    def _queue(self) -> List:
+        """Due-time heap; rebuilt from the cards when an import has dropped it"""
+        if 'review_items' not in st.session_state or 'review_queue' not in st.session_state:
+            self.initialize_session_state()
+        return st.session_state.review_queue
+    
+    @staticmethod
+    def _is_current(entry, items: Dict[str, Dict]) -> bool:
+        """Whether a heap entry is its card's current due time (rescheduling leaves the old entry behind)"""
+        card = items.get(entry[1])
+        return card is not None and card['due'] == entry[0]
+    
+    def _drop_stale_top(self, queue: List, items: Dict[str, Dict]):
+        while queue and not self._is_current(queue[0], items):
+            heapq.heappop(queue)
+    
+    def add_missed(self, question: Dict, topic: str, language: str):
+        """Store a missed question (or lapse an existing card) and schedule it for review"""
+        qid = question.get('id') or AdaptiveEngine.question_id(question)
+        self._queue()
+        card = st.session_state.review_items.get(qid)
+        
+        if card is None:
+            card = {
+                'question': {**question, 'id': qid, 'topic': topic},
+                'topic': topic,
+                'language': language,
+                'ease': self.DEFAULT_EASE,
+                'interval_days': 0,
+                'repetitions': 0,
+                'lapses': 0,
+                'due': None
+            }
+            st.session_state.review_items[qid] = card
+        
+        self._lapse(card)
+        self._push(qid, card)
+    
+    def record_review(self, qid: str, is_correct: bool):
+        """Update a card after it was answered in a review session"""
+        self._queue()
+        card = st.session_state.review_items.get(qid)
+        if card is None:
+            return
+        
+        if is_correct:
+            quality = 4
+            card['repetitions'] += 1
+            if card['repetitions'] == 1:
+                card['interval_days'] = 1
+            elif card['repetitions'] == 2:
+                card['interval_days'] = 6
+            else:
+                card['interval_days'] = round(card['interval_days'] * card['ease'])
+            card['ease'] = max(self.MIN_EASE, card['ease'] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+            card['due'] = (datetime.now() + timedelta(days=card['interval_days'])).isoformat()
+        else:
+            self._lapse(card)
+        
+        self._push(qid, card)
+    
+    def get_due_items(self, limit: int, now: datetime = None) -> List[Dict]:
+        """Pop up to `limit` due questions off the heap, oldest due first"""
+        queue = self._queue()
+        now_key = (now or datetime.now()).isoformat()
+        items = st.session_state.review_items
+        due = []
+        seen = set()
+        
+        while queue and len(due) < limit and queue[0][0] <= now_key:
+            entry = heapq.heappop(queue)
+            # Stale entries left behind by rescheduling are dropped here
+            if not self._is_current(entry, items) or entry[1] in seen:
+                continue
+            seen.add(entry[1])
+            due.append(dict(items[entry[1]]['question']))
+        
+        # Items stay scheduled until they are answered; put them back on the heap
+        for question in due:
+            heapq.heappush(queue, (items[question['id']]['due'], question['id']))
+        
+        return due
+    
+    def count_due(self, now: datetime = None) -> int:
+        """Number of cards currently due for review, read off the heap without looking at cards due later"""
+        queue = self._queue()
+        now_key = (now or datetime.now()).isoformat()
+        items = st.session_state.review_items
+        self._drop_stale_top(queue, items)
+        
+        # Entries due by now form a subtree at the top of the heap; children of a later entry are later too
+        due, stack = set(), [0] if queue else []
+        while stack:
+            i = stack.pop()
+            if i < len(queue) and queue[i][0] <= now_key:
+                if self._is_current(queue[i], items):
+                    due.add(queue[i][1])
+                stack.extend((2 * i + 1, 2 * i + 2))
+        return len(due)
+    
+    def get_review_stats(self) -> Dict[str, Any]:
+        """Summary of the review queue"""
+        queue = self._queue()
+        cards = st.session_state.review_items.values()
+        self._drop_stale_top(queue, st.session_state.review_items)
+        next_due = queue[0][0] if queue else None
+        
+        return {
+            'total_items': len(st.session_state.review_items),
+            'due_now': self.count_due(),
+            'next_due': next_due,
+            'mastered': sum(1 for card in cards if card['interval_days'] >= 21)
+        }
+    
+    def _lapse(self, card: Dict):
+        """Reset a card to relearning after a wrong answer"""
+        card['repetitions'] = 0
+        card['interval_days'] = 0
+        card['lapses'] += 1
+        card['ease'] = max(self.MIN_EASE, card['ease'] - 0.2)
+        card['due'] = (datetime.now() + self.RELEARN_INTERVAL).isoformat()
+    
+    def _push(self, qid: str, card: Dict):
+        """Save the card and push its current due time onto the heap"""
+        self.store.save(self.user_id, [(qid, card)])
+        queue = self._queue()
+        heapq.heappush(queue, (card['due'], qid))
+        if len(queue) > self.MAX_HEAP_FACTOR * len(st.session_state.review_items):
+            # Too many superseded entries: keep only each card's current one
+            self._rebuild_queue()
@@ -0,0 +1,65 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Any, Iterable, Tuple
+
+from utils.event_store import DEFAULT_DB_PATH
+
+class ReviewStore:
+    """Spaced-review cards per user, backed by SQLite, so the schedule outlives the browser session"""
+    
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        if db_path != ':memory:' and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS review_cards (
+                    user_id TEXT NOT NULL,
+                    question_id TEXT NOT NULL,
+                    card TEXT NOT NULL,
+                    PRIMARY KEY (user_id, question_id)
+                ) WITHOUT ROWID
+            """)
+    
+    @staticmethod
+    def _rows(user_id: str, cards: Iterable[Tuple[str, Dict[str, Any]]]):
+        return [(user_id, qid, json.dumps(card, ensure_ascii=False, default=str)) for qid, card in cards]
+    
+    def cards(self, user_id: str) -> Dict[str, Dict[str, Any]]:
+        """A user's cards by question id"""
+        with self._lock:
+            rows = self.conn.execute('SELECT question_id, card FROM review_cards WHERE user_id = ?', (user_id,)).fetchall()
+        return {qid: json.loads(card) for qid, card in rows}
+    
+    def save(self, user_id: str, cards: Iterable[Tuple[str, Dict[str, Any]]]):
+        """Insert or overwrite cards given as (question id, card) pairs"""
+        with self._lock, self.conn:
+            self.conn.executemany(
+                'INSERT INTO review_cards (user_id, question_id, card) VALUES (?, ?, ?) '
+                'ON CONFLICT (user_id, question_id) DO UPDATE SET card = excluded.card',
+                self._rows(user_id, cards)
+            )
+    
+    def replace_user(self, user_id: str, cards: Dict[str, Dict[str, Any]]):
+        """Replace all of a user's cards (full-state imports)"""
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM review_cards WHERE user_id = ?', (user_id,))
+            self.conn.executemany('INSERT INTO review_cards (user_id, question_id, card) VALUES (?, ?, ?)',
+                                  self._rows(user_id, cards.items()))
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def get_review_store() -> ReviewStore:
+    """Process-wide review card store"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ReviewStore()
+        return _default_store
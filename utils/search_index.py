@@ -0,0 +1,247 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from datetime import date
+from typing import Dict, List, Any, Iterable, Optional
+
+from utils.event_store import DEFAULT_DB_PATH
+
+ARTICLE = 'article'
+QUESTION = 'question'
+
+# Devanagari vowel signs, viramas and other combining marks. unicode61 treats them as separators,
+# which would split every Hindi word at its matras, so they are declared token characters.
+_DEVANAGARI_MARKS = ''.join(
+    chr(c) for c in [*range(0x0900, 0x0904), *range(0x093A, 0x0950), *range(0x0951, 0x0958), 0x0962, 0x0963]
+)
+TOKENIZER = f"porter unicode61 remove_diacritics 2 tokenchars '{_DEVANAGARI_MARKS}'"
+
+# Shorter prefixes expand to too many terms to answer quickly
+MIN_PREFIX_LENGTH = 3
+
+# BM25 column weights for (title, body, tags): title hits count double
+RANK_FUNCTION = 'bm25(2.0, 1.0, 0.0)'
+
+# Inflectional suffixes for light Hindi stemming (Ramanathan & Rao), longest first.
+# Chandrabindu forms are covered because normalization maps chandrabindu to anusvara first.
+HINDI_SUFFIXES = sorted([
+    'ो', 'े', 'ू', 'ु', 'ी', 'ि', 'ा',
+    'कर', 'ाओ', 'िए', 'ाई', 'ाए', 'ने', 'नी', 'ना', 'ते', 'ीं', 'ती', 'ता', 'ां', 'ों', 'ें',
+    'ाकर', 'ाइए', 'ाईं', 'ाया', 'ेगी', 'ेगा', 'ोगी', 'ोगे', 'ाने', 'ाना', 'ाते', 'ाती', 'ाता', 'तीं',
+    'ाओं', 'ाएं', 'ुओं', 'ुएं', 'ुआं',
+    'ाएगी', 'ाएगा', 'ाओगी', 'ाओगे', 'एंगी', 'ेंगी', 'एंगे', 'ेंगे', 'ूंगी', 'ूंगा', 'ातीं', 'नाओं', 'नाएं',
+    'ताओं', 'ताएं', 'ियां', 'ियों',
+    'ाएंगी', 'ाएंगे', 'ाऊंगी', 'ाऊंगा', 'ाइयां', 'ाइयों'
+], key=len, reverse=True)
+
+# Function words that carry no search meaning; dropped from documents and queries alike
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'by', 'for', 'from', 'in', 'is', 'of', 'on', 'or', 'the', 'to', 'was',
+    'were', 'what', 'which', 'who', 'with',
+    'और', 'का', 'कि', 'की', 'के', 'को', 'तो', 'था', 'थी', 'थे', 'ने', 'पर', 'भी', 'में', 'यह', 'लिए', 'वह',
+    'से', 'है', 'हैं'
+}
+
+_WORD_RE = re.compile(r'[\w' + _DEVANAGARI_MARKS + r']+')
+_DEVANAGARI_RE = re.compile(r'[ऀ-ॿ]')
+_NUKTA = '़'
+
+def normalize_text(text: str) -> str:
+    """Fold spelling variants that should match: nukta letters, chandrabindu, zero-width joiners"""
+    text = unicodedata.normalize('NFD', text or '')
+    text = text.replace(_NUKTA, '').replace('ँ', 'ं').replace('‌', '').replace('‍', '')
+    return unicodedata.normalize('NFC', text).lower()
+
+def stem_hindi(word: str) -> str:
+    """Strip the longest inflectional suffix, keeping at least two characters of stem"""
+    for suffix in HINDI_SUFFIXES:
+        if word.endswith(suffix) and len(word) > len(suffix) + 1:
+            return word[:-len(suffix)]
+    return word
+
+def analyze(text: str) -> List[str]:
+    """Index terms for a text; English stemming is left to the FTS porter tokenizer"""
+    return [stem_hindi(word) if _DEVANAGARI_RE.search(word) else word
+            for word in _WORD_RE.findall(normalize_text(text)) if word not in STOPWORDS]
+
+def build_match_query(query: str, any_term: bool = False, kind: Optional[str] = None,
+                      language: Optional[str] = None) -> Optional[str]:
+    """FTS5 MATCH expression for free text; the last term is a prefix since it may still be being typed"""
+    terms = analyze(query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    if len(terms[-1]) >= MIN_PREFIX_LENGTH:
+        quoted[-1] += '*'
+    match = f"{{title body}} : ({(' OR ' if any_term else ' ').join(quoted)})"
+    for tag in _tags(kind, language):
+        match += f' AND tags : "{tag}"'
+    return match
+
+def _tags(kind: Optional[str], language: Optional[str]) -> List[str]:
+    # Kind and language are indexed as tokens so filters run inside the FTS query
+    return [tag for tag in (kind and f'kind{kind}', language and f'lang{language}') if tag]
+
+def question_ref(question: str) -> str:
+    """Stable id for a question, so regenerated copies are indexed once"""
+    return hashlib.sha1(' '.join(analyze(question)).encode('utf-8')).hexdigest()
+
+class SearchIndex:
+    """Full-text index (SQLite FTS5, BM25 ranking) over current affairs articles and generated questions"""
+    
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        if db_path != ':memory:' and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_docs (
+                    id INTEGER PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    ref TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    topic TEXT NOT NULL,
+                    doc_date TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    UNIQUE (kind, ref)
+                )
+            """)
+            self.conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_search_docs_topic ON search_docs (kind, topic, language)'
+            )
+            # Holds the analyzed (normalized, Hindi-stemmed) text; rowid matches search_docs.id
+            self.conn.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS search_fts
+                USING fts5(title, body, tags, tokenize="{TOKENIZER}", prefix='{MIN_PREFIX_LENGTH}')
+            """)
+    
+    def _add(self, docs: List[Dict[str, Any]]) -> int:
+        added = 0
+        with self._lock, self.conn:
+            for doc in docs:
+                cursor = self.conn.execute(
+                    'INSERT OR IGNORE INTO search_docs (kind, ref, language, title, body, topic, doc_date, payload) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (doc['kind'], doc['ref'], doc['language'], doc['title'], doc['body'], doc['topic'], doc['date'],
+                     json.dumps(doc.get('payload', {}), ensure_ascii=False))
+                )
+                if cursor.rowcount:
+                    self.conn.execute(
+                        'INSERT INTO search_fts (rowid, title, body, tags) VALUES (?, ?, ?, ?)',
+                        (cursor.lastrowid, ' '.join(analyze(doc['title'])), ' '.join(analyze(doc['body'])),
+                         ' '.join(_tags(doc['kind'], doc['language'])))
+                    )
+                    added += 1
+        return added
+    
+    def add_articles(self, articles: Iterable[Dict[str, Any]]) -> int:
+        """Index news articles (as stored by NewsStore); already indexed ones are skipped"""
+        return self._add([{
+            'kind': ARTICLE,
+            'ref': article['id'],
+            'language': article['language'],
+            'title': article['title'],
+            'body': article.get('summary', ''),
+            'topic': article.get('category', ''),
+            'date': article.get('published_date') or article.get('date', ''),
+            'payload': {'url': article.get('url', ''), 'source': article.get('source', '')}
+        } for article in articles])
+    
+    def add_questions(self, questions: Iterable[Dict[str, Any]], topic: str, language: str) -> int:
+        """Index generated quiz questions; repeats of an indexed question are skipped"""
+        today = date.today().isoformat()
+        docs = []
+        for question in questions:
+            text = question.get('question')
+            if not text:
+                continue
+            options = question.get('options', [])
+            docs.append({
+                'kind': QUESTION,
+                'ref': question_ref(text),
+                'language': language,
+                'title': text,
+                'body': ' '.join([*map(str, options), question.get('explanation', '')]),
+                'topic': question.get('topic') or topic,
+                'date': today,
+                'payload': {'options': options, 'correct_answer': question.get('correct_answer'),
+                            'explanation': question.get('explanation', '')}
+            })
+        return self._add(docs)
+    
+    def search(self, query: str, kind: Optional[str] = None, language: Optional[str] = None,
+               limit: int = 20) -> List[Dict[str, Any]]:
+        """Best matches for a free-text query, by BM25 with title hits weighted double"""
+        results = self._search(build_match_query(query, kind=kind, language=language), limit)
+        if not results:
+            # Nothing has every term; fall back to documents with any of them
+            results = self._search(build_match_query(query, any_term=True, kind=kind, language=language), limit)
+        return results
+    
+    def _search(self, match: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        if not match:
+            return []
+        with self._lock:
+            # Every match is scored and sorted inside FTS5 (ORDER BY rank), so older documents compete too
+            rows = self.conn.execute("""
+                SELECT d.kind, d.ref, d.language, d.title, d.body, d.topic, d.doc_date, d.payload, m.score
+                FROM (
+                    SELECT rowid, rank AS score FROM search_fts
+                    WHERE search_fts MATCH ? AND rank MATCH ? ORDER BY rank LIMIT ?
+                ) m JOIN search_docs d ON d.id = m.rowid
+                ORDER BY m.score
+            """, (match, RANK_FUNCTION, limit)).fetchall()
+        
+        keys = ['kind', 'ref', 'language', 'title', 'body', 'topic', 'date', 'payload', 'score']
+        results = []
+        for row in rows:
+            result = dict(zip(keys, row))
+            result['payload'] = json.loads(result['payload'])
+            results.append(result)
+        return results
+    
+    def question_pool(self, topic: str, language: str, limit: int, exclude: Iterable[str] = ()) -> List[Dict[str, Any]]:
+        """Random indexed questions for a topic, in the shape the quiz pages use"""
+        exclude = list(exclude)
+        clauses, params = ['kind = ?', 'topic = ?', 'language = ?'], [QUESTION, topic, language]
+        if exclude:
+            clauses.append(f"ref NOT IN ({','.join('?' * len(exclude))})")
+            params.extend(exclude)
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT ref, title, payload FROM search_docs WHERE {' AND '.join(clauses)} ORDER BY RANDOM() LIMIT ?",
+                params + [limit]
+            ).fetchall()
+        return [{**json.loads(payload), 'question': title, 'ref': ref, 'topic': topic} for ref, title, payload in rows]
+    
+    def count(self, kind: Optional[str] = None) -> int:
+        with self._lock:
+            if kind:
+                return self.conn.execute('SELECT COUNT(*) FROM search_docs WHERE kind = ?', (kind,)).fetchone()[0]
+            return self.conn.execute('SELECT COUNT(*) FROM search_docs').fetchone()[0]
+    
+    def optimize(self):
+        """Merge FTS segments after large bulk loads"""
+        with self._lock, self.conn:
+            self.conn.execute("INSERT INTO search_fts (search_fts) VALUES ('optimize')")
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+def get_search_index() -> SearchIndex:
+    """Process-wide search index"""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = SearchIndex()
+        return _default_index
@@ -0,0 +1,61 @@
+import streamlit as st
+from typing import Any, Callable, Dict
+
+from utils.adaptive_engine import AdaptiveEngine
+from utils.ai_services import AIServices
+from utils.data_manager import DataManager
+from utils.language_manager import LanguageManager
+from utils.review_scheduler import ReviewScheduler
+
+# Session state entry holding this session's facades
+SESSION_SERVICES_KEY = 'services'
+
+def _close_ai_services(ai_services: AIServices):
+    if ai_services.client:
+        ai_services.client.close()
+
+@st.cache_resource(show_spinner=False)
+def get_language_manager() -> LanguageManager:
+    """Process-wide translation tables (read-only, so shared by every session)"""
+    return LanguageManager()
+
+@st.cache_resource(show_spinner=False, on_release=_close_ai_services)
+def get_ai_services() -> AIServices:
+    """Process-wide OpenAI client; its HTTP connections are closed when the resource is released"""
+    return AIServices()
+
+# Facades over one user's session state, created on first use in a session. Their constructors are
+# the start hook: each runs initialize_session_state once for the session.
+SESSION_SERVICES: Dict[str, Callable[[], Any]] = {
+    'data_manager': DataManager,
+    'adaptive_engine': lambda: AdaptiveEngine(get_data_manager()),
+    'review_scheduler': lambda: ReviewScheduler(get_data_manager())
+}
+
+def session_service(name: str) -> Any:
+    """This session's instance of a facade, created on first use"""
+    services = st.session_state.get(SESSION_SERVICES_KEY)
+    if services is None:
+        services = st.session_state[SESSION_SERVICES_KEY] = {}
+    service = services.get(name)
+    if service is None:
+        service = services[name] = SESSION_SERVICES[name]()
+    return service
+
+def reset_session_services():
+    """End hook: drop this session's facades so the next use starts them again"""
+    st.session_state.pop(SESSION_SERVICES_KEY, None)
+
+def get_data_manager() -> DataManager:
+    return session_service('data_manager')
+
+def get_adaptive_engine() -> AdaptiveEngine:
+    return session_service('adaptive_engine')
+
+def get_review_scheduler() -> ReviewScheduler:
+    return session_service('review_scheduler')
+
+def release_process_services():
+    """End hook for process-wide services (e.g. after the API key changes); they are rebuilt on next use"""
+    get_ai_services.clear()
+    get_language_manager.clear()
@@ -0,0 +1,208 @@
+import io
+import os
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+try:
+    from faster_whisper import WhisperModel, decode_audio
+except ImportError:
+    WhisperModel = None
+    decode_audio = None
+
+# Sample rate the speech model expects
+SAMPLE_RATE = 16000
+
+# Audio is transcribed in chunks of about this length so partial text shows up before the whole answer is done
+CHUNK_SECONDS = 10.0
+
+# Chunks are cut at the quietest frame within this many seconds of the chunk end, so words are not split
+CUT_SEARCH_SECONDS = 2.0
+FRAME_SECONDS = 0.03
+
+# Longest spoken answer accepted
+MAX_AUDIO_SECONDS = 600
+
+DEFAULT_MODEL = 'base'
+DEFAULT_WORKERS = 2
+
+# Trailing transcript passed to the next chunk so names and terms stay consistent across cuts
+PROMPT_CHARS = 200
+
+def speech_available() -> bool:
+    return WhisperModel is not None
+
+def resample(samples: np.ndarray, rate: int, target: int = SAMPLE_RATE) -> np.ndarray:
+    """Linear resampling; adequate for speech recognition input"""
+    if rate == target or not len(samples):
+        return samples.astype(np.float32, copy=False)
+    length = int(round(len(samples) * target / rate))
+    positions = np.arange(length) * (rate / target)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+def read_wav(data: bytes) -> np.ndarray:
+    """Decode PCM WAV bytes to mono float32 samples at SAMPLE_RATE"""
+    with wave.open(io.BytesIO(data)) as wav:
+        channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width in (2, 4):
+        dtype = np.int16 if width == 2 else np.int32
+        samples = np.frombuffer(frames, dtype=dtype).astype(np.float32) / np.iinfo(dtype).max
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width * 8} bits")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return resample(samples, rate)
+
+def load_audio(data: bytes) -> np.ndarray:
+    """Decode recorded or uploaded audio; formats other than WAV need faster-whisper's decoder"""
+    if data[:4] == b'RIFF':
+        return read_wav(data)
+    if decode_audio is None:
+        raise ValueError("Only WAV audio can be read without faster-whisper installed")
+    return decode_audio(io.BytesIO(data), sampling_rate=SAMPLE_RATE)
+
+def split_chunks(samples: np.ndarray, chunk_seconds: float = CHUNK_SECONDS) -> List[np.ndarray]:
+    """Split audio into chunks of about chunk_seconds, cutting each at the quietest nearby frame"""
+    chunk = int(chunk_seconds * SAMPLE_RATE)
+    search = int(CUT_SEARCH_SECONDS * SAMPLE_RATE)
+    frame = int(FRAME_SECONDS * SAMPLE_RATE)
+    chunks, start = [], 0
+    while len(samples) - start > chunk + search:
+        window = samples[start + chunk - search:start + chunk]
+        usable = len(window) // frame * frame
+        energy = np.square(window[:usable]).reshape(-1, frame).mean(axis=1)
+        cut = start + chunk - search + int(np.argmin(energy)) * frame + frame // 2
+        chunks.append(samples[start:cut])
+        start = cut
+    chunks.append(samples[start:])
+    return chunks
+
+class TranscriptionJob:
+    """One spoken answer being transcribed; text grows chunk by chunk"""
+    
+    def __init__(self, language: str):
+        self.language = language
+        self.parts: List[str] = []
+        self.total_chunks = 0
+        self.audio_seconds = 0.0
+        self.error: Optional[str] = None
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self._done = threading.Event()
+    
+    @property
+    def text(self) -> str:
+        return ' '.join(part for part in self.parts if part)
+    
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+    
+    @property
+    def progress(self) -> float:
+        return len(self.parts) / self.total_chunks if self.total_chunks else 0.0
+    
+    @property
+    def real_time_factor(self) -> Optional[float]:
+        """Processing time over audio length; below 1 is faster than real time"""
+        if self.finished is None or not self.audio_seconds:
+            return None
+        return (self.finished - self.started) / self.audio_seconds
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+class SpeechTranscriber:
+    """Local CPU speech-to-text; transcription runs in a worker pool, off the Streamlit script thread"""
+    
+    def __init__(self, model_size: str = DEFAULT_MODEL, compute_type: str = 'int8', workers: int = DEFAULT_WORKERS,
+                 cpu_threads: int = 0, chunk_seconds: float = CHUNK_SECONDS):
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.workers = workers
+        self.cpu_threads = cpu_threads
+        self.chunk_seconds = chunk_seconds
+        self._model = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='speech')
+    
+    def model(self):
+        """The speech model, loaded on first use"""
+        if WhisperModel is None:
+            raise RuntimeError("Speech-to-text needs the faster-whisper package")
+        with self._lock:
+            if self._model is None:
+                # num_workers lets the pool threads run the model concurrently
+                self._model = WhisperModel(self.model_size, device='cpu', compute_type=self.compute_type,
+                                           cpu_threads=self.cpu_threads, num_workers=self.workers)
+            return self._model
+    
+    def submit(self, data: bytes, language: str = 'en') -> TranscriptionJob:
+        """Start transcribing audio bytes; returns at once with a job that fills in as chunks finish"""
+        job = TranscriptionJob('hi' if language == 'hi' else 'en')
+        self._executor.submit(self._run, job, data)
+        return job
+    
+    def transcribe_chunk(self, samples: np.ndarray, language: str, prompt: str = '') -> str:
+        segments, _ = self.model().transcribe(
+            samples, language=language, beam_size=1, vad_filter=True,
+            initial_prompt=prompt or None, condition_on_previous_text=False
+        )
+        return ' '.join(segment.text.strip() for segment in segments).strip()
+    
+    def _run(self, job: TranscriptionJob, data: bytes):
+        # Time spent queued behind other answers does not count towards the real-time factor
+        job.started = time.perf_counter()
+        try:
+            samples = load_audio(data)
+            job.audio_seconds = len(samples) / SAMPLE_RATE
+            if job.audio_seconds > MAX_AUDIO_SECONDS:
+                raise ValueError(f"Audio is longer than {MAX_AUDIO_SECONDS // 60} minutes")
+            chunks = split_chunks(samples, self.chunk_seconds)
+            job.total_chunks = len(chunks)
+            for chunk in chunks:
+                job.parts.append(self.transcribe_chunk(chunk, job.language, job.text[-PROMPT_CHARS:]))
+        except Exception as e:
+            job.error = str(e)
+        finally:
+            job.finished = time.perf_counter()
+            job._done.set()
+
+def benchmark(transcriber: SpeechTranscriber, clips: List[bytes], language: str = 'en') -> Dict[str, Any]:
+    """Transcribe clips concurrently and report the real-time factor per clip and overall"""
+    transcriber.model()
+    started = time.perf_counter()
+    jobs = [transcriber.submit(clip, language) for clip in clips]
+    for job in jobs:
+        job.wait()
+    elapsed = time.perf_counter() - started
+    audio_seconds = sum(job.audio_seconds for job in jobs)
+    return {
+        'clips': [{'audio_seconds': job.audio_seconds, 'chunks': job.total_chunks,
+                   'real_time_factor': job.real_time_factor, 'error': job.error} for job in jobs],
+        'audio_seconds': audio_seconds,
+        'seconds': elapsed,
+        # Wall time over total audio: with several workers, throughput beyond a single clip's factor
+        'real_time_factor': elapsed / audio_seconds if audio_seconds else None
+    }
+
+_default_transcriber = None
+_default_transcriber_lock = threading.Lock()
+
+def get_transcriber() -> SpeechTranscriber:
+    """Process-wide transcriber configured from SPEECH_MODEL and SPEECH_WORKERS"""
+    global _default_transcriber
+    with _default_transcriber_lock:
+        if _default_transcriber is None:
+            _default_transcriber = SpeechTranscriber(
+                model_size=os.getenv('SPEECH_MODEL', DEFAULT_MODEL),
+                workers=int(os.getenv('SPEECH_WORKERS', DEFAULT_WORKERS))
+            )
+        return _default_transcriber
@@ -0,0 +1,290 @@
+import hashlib
+import heapq
+import json
+import math
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+SLOT_MINUTES = 30
+
+# Horizon when no exam date is set, and the longest plan we build
+DEFAULT_HORIZON_DAYS = 30
+MAX_HORIZON_DAYS = 365
+
+# Days after studying a topic when it comes back for revision
+REVISION_OFFSETS = (1, 7)
+
+# Share of each normal day's slots kept for revision, and the minimum days between revisions of a topic
+REVISION_SHARE = 0.2
+REVISION_GAP = 3
+
+# Relative syllabus weight of each quiz topic per exam type
+SYLLABUS_WEIGHTS = {
+    'UPSC Civil Services': {
+        'Indian History': 14, 'Geography': 12, 'Indian Polity': 14, 'Economics': 12, 'Current Affairs': 14,
+        'Science & Technology': 8, 'Environment': 10, 'General Knowledge': 8, 'Reasoning': 4, 'English': 4
+    },
+    'SSC CGL': {
+        'Mathematics': 22, 'Reasoning': 22, 'English': 22, 'General Knowledge': 10, 'Indian History': 5,
+        'Geography': 5, 'Indian Polity': 5, 'Economics': 3, 'Science & Technology': 4, 'Current Affairs': 2
+    },
+    'SSC CHSL': {
+        'Mathematics': 22, 'Reasoning': 22, 'English': 22, 'General Knowledge': 14, 'Current Affairs': 6,
+        'Science & Technology': 6, 'Computer Knowledge': 8
+    },
+    'Banking (IBPS/SBI)': {
+        'Mathematics': 25, 'Reasoning': 25, 'English': 20, 'Economics': 10, 'Current Affairs': 10,
+        'Computer Knowledge': 6, 'General Knowledge': 4
+    },
+    'Railway (RRB)': {
+        'Mathematics': 25, 'Reasoning': 25, 'Science & Technology': 20, 'General Knowledge': 15,
+        'Current Affairs': 10, 'Computer Knowledge': 5
+    },
+    'State PSC': {
+        'Indian History': 15, 'Geography': 14, 'Indian Polity': 15, 'Economics': 12, 'Current Affairs': 14,
+        'General Knowledge': 12, 'Environment': 8, 'Science & Technology': 6, 'Reasoning': 4
+    },
+    'Teaching (CTET/TET)': {
+        'English': 20, 'Mathematics': 20, 'Environment': 20, 'General Knowledge': 15, 'Reasoning': 10,
+        'Science & Technology': 15
+    },
+    'Defense (CDS/NDA)': {
+        'Mathematics': 30, 'English': 25, 'General Knowledge': 15, 'Science & Technology': 10,
+        'Indian History': 7, 'Geography': 7, 'Current Affairs': 6
+    },
+    'Police/Constable': {
+        'General Knowledge': 25, 'Reasoning': 25, 'Mathematics': 25, 'Current Affairs': 10, 'English': 5,
+        'Indian Polity': 5, 'Computer Knowledge': 5
+    }
+}
+
+# Used for 'Other' and any exam type without its own table
+DEFAULT_WEIGHTS = {
+    'General Knowledge': 12, 'Mathematics': 14, 'Reasoning': 14, 'English': 12, 'Current Affairs': 10,
+    'Indian History': 8, 'Geography': 8, 'Indian Polity': 8, 'Economics': 6, 'Science & Technology': 8
+}
+
+LABELS = {
+    'en': {
+        'study': 'Concept study + practice questions', 'revision': 'Revision from notes',
+        'practice_test': 'Sectional practice test', 'mock_test': 'Full-length mock test',
+        'slots': ['Morning', 'Afternoon', 'Evening'], 'minutes': 'minutes', 'all_topics': 'All topics',
+        'priority': {'weak': 'High', 'normal': 'Medium', 'strong': 'Low'},
+        'goal': "Spend {hours:g} hours on {topic}",
+        'tips': ["Study your weakest topic first, while you are fresh",
+                 "Use revision slots to recall from memory before rereading notes",
+                 "Review every wrong answer from practice tests the same day"]
+    },
+    'hi': {
+        'study': 'अवधारणा अध्ययन + अभ्यास प्रश्न', 'revision': 'नोट्स से रिवीजन',
+        'practice_test': 'विषयवार अभ्यास टेस्ट', 'mock_test': 'पूर्ण मॉक टेस्ट',
+        'slots': ['सुबह', 'दोपहर', 'शाम'], 'minutes': 'मिनट', 'all_topics': 'सभी विषय',
+        'priority': {'weak': 'उच्च', 'normal': 'मध्यम', 'strong': 'निम्न'},
+        'goal': "{topic} पर {hours:g} घंटे लगाएं",
+        'tips': ["ताज़ा दिमाग से सबसे कमज़ोर विषय पहले पढ़ें",
+                 "रिवीजन में नोट्स दोबारा पढ़ने से पहले याद करके देखें",
+                 "अभ्यास टेस्ट के हर गलत उत्तर को उसी दिन दोहराएं"]
+    }
+}
+
+def syllabus_weights(exam_type: str) -> Dict[str, float]:
+    """Syllabus weights for an exam type"""
+    return dict(SYLLABUS_WEIGHTS.get(exam_type, DEFAULT_WEIGHTS))
+
+def topic_priorities(weights: Dict[str, float], topic_scores: Dict[str, List[float]],
+                     weak_topics: Iterable[str], strong_topics: Iterable[str]) -> Dict[str, float]:
+    """Syllabus weight scaled by how much the user still needs each topic"""
+    weak, strong = set(weak_topics), set(strong_topics)
+    priorities = {}
+    for topic, weight in weights.items():
+        scores = topic_scores.get(topic)
+        if topic in weak:
+            factor = 1.6
+        elif topic in strong:
+            factor = 0.6
+        elif not scores:
+            factor = 1.2  # not attempted yet
+        else:
+            average = sum(scores) / len(scores)
+            factor = min(max(1 + (70 - average) / 100, 0.7), 1.4)
+        priorities[topic] = weight * factor
+    return priorities
+
+def schedule_key(exam_type: str, target_date: Optional[date], hours_per_day: float, language: str,
+                 weak_topics: Iterable[str], strong_topics: Iterable[str]) -> str:
+    """Fingerprint of the scheduler inputs, used to tell when a saved plan is outdated"""
+    inputs = [exam_type, target_date.isoformat() if target_date else None, hours_per_day, language,
+              sorted(weak_topics), sorted(strong_topics)]
+    return hashlib.sha1(json.dumps(inputs).encode('utf-8')).hexdigest()
+
+class _ShareAllocator:
+    """Stride scheduling: each pick goes to the topic furthest behind its share of the slots"""
+    
+    def __init__(self, priorities: Dict[str, float]):
+        total = sum(priorities.values())
+        self.stride = {topic: total / p for topic, p in priorities.items() if p > 0}
+        # (pass value, topic); the lowest pass value is the most under-served topic
+        self.heap = [(stride / 2, topic) for topic, stride in self.stride.items()]
+        heapq.heapify(self.heap)
+    
+    def pick(self, day_counts: Dict[str, int], cap: int) -> Optional[str]:
+        """Next topic with fewer than `cap` slots today"""
+        skipped = []
+        chosen = None
+        while self.heap:
+            pass_value, topic = heapq.heappop(self.heap)
+            if day_counts.get(topic, 0) < cap:
+                chosen = topic
+                heapq.heappush(self.heap, (pass_value + self.stride[topic], topic))
+                break
+            skipped.append((pass_value, topic))
+        for item in skipped:
+            heapq.heappush(self.heap, item)
+        return chosen
+
+def _merge_sessions(slots: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """Group (topic, activity) slots into sessions, one per topic and activity, in first-seen order"""
+    sessions = {}
+    for topic, activity in slots:
+        key = (topic, activity)
+        if key not in sessions:
+            sessions[key] = {'topic': topic, 'activity': activity, 'minutes': 0}
+        sessions[key]['minutes'] += SLOT_MINUTES
+    return list(sessions.values())
+
+def build_study_schedule(exam_type: str, target_date: Optional[date], hours_per_day: float,
+                         topic_scores: Dict[str, List[float]], weak_topics: Iterable[str] = (),
+                         strong_topics: Iterable[str] = (), language: str = 'en',
+                         start: Optional[date] = None) -> Dict[str, Any]:
+    """Day-by-day study calendar up to the exam date.
+
+    Normal days split their slots between new study (shared out by priority) and revision of
+    topics studied 1 and 7 days earlier. Every seventh day is a test and revision day, and the
+    final stretch before the exam is revision and mock tests only.
+    """
+    start = start or datetime.now().date()
+    weak_topics, strong_topics = list(weak_topics), list(strong_topics)
+    labels = LABELS.get(language, LABELS['en'])
+    
+    if target_date and target_date > start:
+        num_days = min((target_date - start).days, MAX_HORIZON_DAYS)
+    else:
+        num_days = DEFAULT_HORIZON_DAYS
+    slots_per_day = max(int(hours_per_day * 60) // SLOT_MINUTES, 1)
+    # Final revision phase: about a tenth of the plan, 1-14 days (none for very short plans)
+    final_days = min(max(round(num_days * 0.1), 1), 14) if target_date and num_days >= 7 else 0
+    
+    priorities = topic_priorities(syllabus_weights(exam_type), topic_scores, weak_topics, strong_topics)
+    study = _ShareAllocator(priorities)
+    # Revisions drawn in the final phase favour weak topics more strongly
+    final = _ShareAllocator({topic: p * (2 if topic in weak_topics else 1) for topic, p in priorities.items()})
+    cap = max(2, math.ceil(slots_per_day / 3))
+    revision_slots = round(slots_per_day * REVISION_SHARE) if slots_per_day >= 3 else 0
+    
+    due = []  # (due day index, topic) revision queue
+    last_revised = {}
+    week_minutes = {}
+    topic_minutes = {}
+    days = []
+    
+    for index in range(num_days):
+        day = start + timedelta(days=index)
+        counts = {}
+        slots = []
+        
+        if index >= num_days - final_days:
+            day_type = 'final_revision'
+            # A full mock every other day, the rest revision
+            mocks = min(slots_per_day, 4) if (num_days - index) % 2 == 0 else 0
+            slots += [(labels['all_topics'], 'mock_test')] * mocks
+            while len(slots) < slots_per_day:
+                topic = final.pick(counts, cap)
+                if topic is None:
+                    break
+                counts[topic] = counts.get(topic, 0) + 1
+                slots.append((topic, 'revision'))
+        elif index % 7 == 6:
+            day_type = 'weekly_review'
+            tests = min(2, slots_per_day)
+            slots += [(labels['all_topics'], 'practice_test')] * tests
+            # Revise this week's topics in proportion to the time spent on them
+            review = _ShareAllocator(week_minutes or priorities)
+            while len(slots) < slots_per_day:
+                topic = review.pick(counts, cap)
+                if topic is None:
+                    break
+                counts[topic] = counts.get(topic, 0) + 1
+                slots.append((topic, 'revision'))
+            week_minutes = {}
+        else:
+            day_type = 'study'
+            while due and due[0][0] <= index and len(slots) < revision_slots:
+                due_index, topic = heapq.heappop(due)
+                # Revision slots are scarce: skip long-overdue entries and topics revised in the last few days
+                if index - due_index > 7 or index - last_revised.get(topic, -REVISION_GAP) < REVISION_GAP:
+                    continue
+                if counts.get(topic, 0) < cap:
+                    counts[topic] = counts.get(topic, 0) + 1
+                    slots.append((topic, 'revision'))
+                    last_revised[topic] = index
+            studied = []
+            while len(slots) < slots_per_day:
+                topic = study.pick(counts, cap)
+                if topic is None:
+                    break
+                counts[topic] = counts.get(topic, 0) + 1
+                slots.append((topic, 'study'))
+                week_minutes[topic] = week_minutes.get(topic, 0) + SLOT_MINUTES
+                studied.append(topic)
+            for topic in dict.fromkeys(studied):
+                for offset in REVISION_OFFSETS:
+                    heapq.heappush(due, (index + offset, topic))
+        
+        sessions = _merge_sessions(slots)
+        for session in sessions:
+            session['level'] = 'weak' if session['topic'] in weak_topics else \
+                'strong' if session['topic'] in strong_topics else 'normal'
+            topic_minutes[session['topic']] = topic_minutes.get(session['topic'], 0) + session['minutes']
+        days.append({'date': day.isoformat(), 'type': day_type, 'sessions': sessions})
+    
+    return {
+        'generator': 'local',
+        'generated_at': datetime.now().isoformat(),
+        'schedule_key': schedule_key(exam_type, target_date, hours_per_day, language, weak_topics, strong_topics),
+        'start_date': start.isoformat(),
+        'days': days,
+        'topic_minutes': topic_minutes,
+        'daily_schedule': daily_schedule(days[0], language) if days else [],
+        'weekly_goals': _weekly_goals(days[:7], labels),
+        'recommended_topics': sorted(priorities, key=priorities.get, reverse=True)[:3],
+        'study_tips': list(labels['tips'])
+    }
+
+def daily_schedule(day: Dict[str, Any], language: str = 'en') -> List[Dict[str, str]]:
+    """One calendar day's sessions in the daily_schedule row format the study plan page displays"""
+    labels = LABELS.get(language, LABELS['en'])
+    total = sum(session['minutes'] for session in day['sessions']) or 1
+    rows = []
+    elapsed = 0
+    for session in day['sessions']:
+        # Spread the day's sessions over morning, afternoon and evening
+        slot = labels['slots'][min(elapsed * 3 // total, 2)]
+        elapsed += session['minutes']
+        rows.append({
+            'time_slot': slot,
+            'subject': session['topic'],
+            'duration': f"{session['minutes']} {labels['minutes']}",
+            'activity': labels[session['activity']],
+            'priority': labels['priority'][session.get('level', 'normal')]
+        })
+    return rows
+
+def _weekly_goals(week: List[Dict[str, Any]], labels: Dict[str, Any]) -> List[str]:
+    """Hours per topic for the coming week, largest first"""
+    minutes = {}
+    for day in week:
+        for session in day['sessions']:
+            if session['activity'] == 'study':
+                minutes[session['topic']] = minutes.get(session['topic'], 0) + session['minutes']
+    top = sorted(minutes.items(), key=lambda item: item[1], reverse=True)[:3]
+    return [labels['goal'].format(topic=topic, hours=mins / 60) for topic, mins in top]